@@ -1,18 +1,28 @@
 
 """Agent implementation for the chatbot.
 
-This module creates a movie-chat tool, initializes an agent with
-conversation memory (Neo4j-backed if available), and exposes
-`generate_response(user_input)` which the Streamlit UI calls.
+This module creates a movie-chat tool, registers lazy factories for the
+agent with conversation memory (Neo4j-backed if available) and its
+caches (see `resources`), and exposes
+`astream_response(user_input)` / `agenerate_response(user_input)`, which
+await the LLM, Neo4j and retrievers without holding a thread per turn.
+`stream_response(user_input)`, which the Streamlit UI iterates to render
+the answer as it is produced, and `generate_response(user_input)` are thin
+synchronous wrappers around them.
 
 The implementation is defensive: if optional packages (Neo4j
-history, LangChain hub prompt, etc.) are missing or a model is
+history, etc.) are missing or a model is
 unavailable, it will fall back to a simpler direct-LLM call and
 return helpful error messages.
 """
 
-from typing import Optional
+from collections import OrderedDict
+from typing import AsyncIterator, Iterator, Optional
+import asyncio
 import logging
+import re
+import threading
+import time
 
 from langchain_core.prompts import ChatPromptTemplate
 
@@ -25,32 +35,65 @@ except Exception:
     except Exception:
         # Fallback shim: minimal Tool replacement so module can import.
         class Tool:
-            def __init__(self, name, description, func):
+            def __init__(self, name, description, func, coroutine=None):
                 self.name = name
                 self.description = description
                 self.func = func
+                self.coroutine = coroutine
 
             @classmethod
-            def from_function(cls, name: str, description: str, func, return_direct: bool = False):
-                return cls(name=name, description=description, func=func)
+            def from_function(cls, name: str, description: str, func, return_direct: bool = False, coroutine=None):
+                return cls(name=name, description=description, func=func, coroutine=coroutine)
 
-from llm import llm, embeddings
-from graph import graph
+try:
+    from langchain_core.callbacks import BaseCallbackHandler
+except Exception:
+    BaseCallbackHandler = object
+
+from llm import get_llm, get_embeddings
+from graph import get_graph, neo4j_connections, NEO4J_CONFIGURED
 from utils import get_session_id
+from caching.semantic import SemanticCache, is_session_dependent
+from caching.answers import acached, cached
+from caching.keys import prompt_version
+from resources import resource
+from prompts import get_react_prompt, react_prompt_version, refresh_react_prompt_in_background
+from router import QuestionRouter, ROUTE_EXEMPLARS
+from history import PromptHistory, WindowedChatHistory, WriteBehindBuffer
 import streamlit as st
 
 logger = logging.getLogger(__name__)
 
 
+CHAT_SYSTEM_PROMPT = "You are a movie expert providing information about movies."
+
 # Build a movie chat prompt + chain
 chat_prompt = ChatPromptTemplate.from_messages(
     [
-        ("system", "You are a movie expert providing information about movies."),
+        ("system", CHAT_SYSTEM_PROMPT),
         ("human", "{input}"),
     ]
 )
 
-movie_chat = chat_prompt | llm
+
+@resource("movie_chat")
+def get_movie_chat():
+    return chat_prompt | get_llm()
+
+
+def _movie_chat(question: str) -> str:
+    response = get_movie_chat().invoke(question)
+    return response.content if hasattr(response, "content") else str(response)
+
+
+async def _amovie_chat(question: str) -> str:
+    movie_chat = await asyncio.to_thread(get_movie_chat)
+    response = await movie_chat.ainvoke(question)
+    return response.content if hasattr(response, "content") else str(response)
+
+
+run_movie_chat = cached("movie_chat", _movie_chat, prompt_version(CHAT_SYSTEM_PROMPT))
+arun_movie_chat = acached("movie_chat", _amovie_chat, prompt_version(CHAT_SYSTEM_PROMPT))
 
 
 # Expose as a Tool for the agent to call
@@ -58,128 +101,527 @@ tools = [
     Tool.from_function(
         name="General Chat",
         description="For general movie chat not covered by other tools",
-        func=movie_chat.invoke,
+        func=run_movie_chat,
+        coroutine=arun_movie_chat,
     )
 ]
 
+# Coroutines the router may call directly, keyed by route label
+ROUTES = {"movie_chat": arun_movie_chat}
+
+# Graph-backed tools are only offered when Neo4j is configured; their chains are built on first use
+if NEO4J_CONFIGURED:
+    try:
+        from tools.vector import run_kg_qa, arun_kg_qa
+
+        tools.append(
+            Tool.from_function(
+                name="Vector Search Index",
+                description="Provides information about movie plots using Vector Search",
+                func=run_kg_qa,
+                coroutine=arun_kg_qa,
+            )
+        )
+        ROUTES["kg_qa"] = arun_kg_qa
+    except Exception as e:
+        logger.info("Vector Search Index tool unavailable: %s", e)
+
+    try:
+        from tools.cypher import run_cypher_qa, arun_cypher_qa
+
+        tools.append(
+            Tool.from_function(
+                name="Graph Cypher QA Chain",
+                description="Provides information about Movies including their Actors, Directors and User reviews",
+                func=run_cypher_qa,
+                coroutine=arun_cypher_qa,
+            )
+        )
+        ROUTES["cypher_qa"] = arun_cypher_qa
+    except Exception as e:
+        logger.info("Graph Cypher QA Chain tool unavailable: %s", e)
+
+
+# Shared across all sessions in this process
+@resource("response_cache")
+def get_response_cache():
+    try:
+        return SemanticCache(
+            get_embeddings(),
+            threshold=float(st.secrets.get("SEMANTIC_CACHE_THRESHOLD", 0.92)),
+            max_entries=int(st.secrets.get("SEMANTIC_CACHE_MAX_ENTRIES", 1000)),
+            max_bytes=int(st.secrets.get("SEMANTIC_CACHE_MAX_BYTES", 32 * 1024 * 1024)),
+            ttl=float(st.secrets.get("SEMANTIC_CACHE_TTL", 3600)),
+        )
+    except Exception as e:
+        logger.info("Semantic response cache disabled: %s", e)
+        return None
+
+
+@resource("router")
+def get_router():
+    """Return the question router, or None if disabled with ROUTER_ENABLED = false."""
+    if not st.secrets.get("ROUTER_ENABLED", True):
+        return None
+    return QuestionRouter(
+        get_embeddings(),
+        exemplars={label: ROUTE_EXEMPLARS[label] for label in ROUTES},
+        threshold=float(st.secrets.get("ROUTER_THRESHOLD", 0.55)),
+        margin=float(st.secrets.get("ROUTER_MARGIN", 0.05)),
+    )
+
+
+@resource("history_buffer")
+def get_history_buffer():
+    """Return the write-behind buffer that persists chat messages off the request path."""
+    return WriteBehindBuffer(
+        neo4j_connections.driver,
+        flush_interval=float(st.secrets.get("HISTORY_FLUSH_INTERVAL", 1.0)),
+        flush_size=int(st.secrets.get("HISTORY_FLUSH_SIZE", 200)),
+        max_backoff=float(st.secrets.get("HISTORY_FLUSH_MAX_BACKOFF", 30.0)),
+        max_pending=int(st.secrets.get("HISTORY_MAX_PENDING", 10000)),
+    )
+
+
+# History objects of recent sessions; creating one costs a round trip (it MERGEs the session node)
+_MEMORY_SESSIONS = 512
+_memories: "OrderedDict[str, object]" = OrderedDict()
+_memories_lock = threading.Lock()
+
 
 def get_memory(session_id: str):
     """Return a conversation-memory object for the given session_id.
 
     Prefer Neo4j-backed history when available; otherwise return None.
-    The agent runner will handle None by not persisting history.
+    The agent runner will handle None by not persisting history. History
+    objects are reused across turns and all use the shared Neo4j driver;
+    see `history.WindowedChatHistory` for what the prompt gets to see.
     """
+    with _memories_lock:
+        memory = _memories.get(session_id)
+        if memory is not None:
+            _memories.move_to_end(session_id)
+            return memory
     try:
         from langchain_neo4j import Neo4jChatMessageHistory
 
-        return Neo4jChatMessageHistory(session_id=session_id, graph=graph)
+        history = neo4j_connections.adopt(Neo4jChatMessageHistory(session_id=session_id, graph=get_graph()))
+        # The prompt only ever sees the last HISTORY_WINDOW messages plus a summary of the rest
+        memory = WindowedChatHistory(
+            session_id,
+            history,
+            neo4j_connections.driver,
+            get_history_buffer(),
+            llm=get_llm(),
+            window=int(st.secrets.get("HISTORY_WINDOW", 10)),
+            max_tokens=int(st.secrets.get("HISTORY_MAX_TOKENS", 1500)),
+            summary_batch=int(st.secrets.get("HISTORY_SUMMARY_BATCH", 6)),
+        )
     except Exception as e:
         logger.info("Neo4jChatMessageHistory unavailable, continuing without persistent history: %s", e)
         return None
+    with _memories_lock:
+        _memories[session_id] = memory
+        while len(_memories) > _MEMORY_SESSIONS:
+            _memories.popitem(last=False)
+    return memory
 
 
 # Initialize agent and runnable with history when possible
-chat_agent = None
+@resource("chat_agent")
+def get_chat_agent():
+    """Return the ReAct agent wrapped with message history, or None if it can't be built."""
+    try:
+        # Vendored react-chat prompt; an optional hub refresh runs in the background
+        agent_prompt = get_react_prompt()
+        refresh_react_prompt_in_background()
 
-try:
-    # Pull a reusable agent prompt from the hub (optional)
+        # Create ReAct agent and executor
+        try:
+            from langchain.agents import AgentExecutor, create_react_agent
+            from langchain_core.runnables.history import RunnableWithMessageHistory
+
+            agent = create_react_agent(get_llm(), tools, agent_prompt)
+            agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True)
+
+            # Answers cached under another (e.g. hub-refreshed) prompt are stale
+            response_cache = get_response_cache()
+            if response_cache is not None:
+                response_cache.set_version(react_prompt_version(agent_prompt))
+
+            # Wrap with history if possible
+            return RunnableWithMessageHistory(
+                agent_executor,
+                get_memory,
+                input_messages_key="input",
+                history_messages_key="chat_history",
+            )
+        except Exception as e:
+            logger.info("Could not create full AgentExecutor+RunnableWithMessageHistory: %s", e)
+            # Fall back to using the LLM directly via the movie_chat tool
+            return None
+    except Exception as e:
+        logger.exception("Unexpected error initializing agent: %s", e)
+        return None
+
+
+class _FinalAnswerStreamer(BaseCallbackHandler):
+    """Callback handler that forwards the agent's final answer tokens to a queue.
+
+    A ReAct agent emits its reasoning ("Thought:", "Action:", ...) through the
+    same LLM stream as the answer, so tokens are buffered until the
+    "Final Answer:" marker appears and only what follows it is forwarded.
+    `final_answer` tells whether the run ended on such an answer, rather than
+    on the executor's iteration/time limit or a `return_direct` tool.
+    """
+
+    MARKER = "Final Answer:"
+
+    def __init__(self, token_queue):
+        self.queue = token_queue
+        self.final_answer = False
+        self._buffer = ""
+        self._streaming = False
+
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        self._buffer = ""
+        self._streaming = False
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self._buffer = ""
+        self._streaming = False
+
+    def on_llm_new_token(self, token: str, **kwargs):
+        if self._streaming:
+            self.queue.put(token)
+            return
+        self._buffer += token
+        idx = self._buffer.find(self.MARKER)
+        if idx != -1:
+            self._streaming = True
+            rest = self._buffer[idx + len(self.MARKER):].lstrip()
+            if rest:
+                self.queue.put(rest)
+
+    def on_agent_finish(self, finish, **kwargs):
+        # A stopped run finishes with an empty log and a canned "Agent stopped ..." output
+        self.final_answer = self.MARKER in (getattr(finish, "log", "") or "")
+
+
+class _LoopQueue:
+    """`put()` from any thread onto an asyncio queue read on `loop`.
+
+    Sync callback handlers may run in executor threads during `ainvoke`.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.queue: "asyncio.Queue" = asyncio.Queue()
+
+    def put(self, item) -> None:
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, item)
+
+
+_DONE = object()
+
+
+def _chunk_text(chunk) -> str:
+    """Return the text carried by a streamed chunk (message chunk or plain value)."""
+    if chunk is None:
+        return ""
+    if hasattr(chunk, "content"):
+        return chunk.content or ""
+    return str(chunk)
+
+
+def _error_message(e: Exception) -> str:
+    err = str(e)
+    if "model_decommissioned" in err or "model_not_found" in err:
+        return (
+            "The configured Groq model is not available (decommissioned or no access). "
+            "Please update `GROQ_MODEL` in `.streamlit/secrets.toml` to a supported model and restart.\n\n"
+            f"Error details: {err}"
+        )
+    return f"Agent error: {err}"
+
+
+async def _astream_agent(
+    chat_agent, user_input: str, session_id: str, outcome: Optional[dict] = None
+) -> AsyncIterator[str]:
+    """Run the agent with `ainvoke` and yield its final answer as it streams.
+
+    If the final answer never passed through the LLM stream (e.g. a tool with
+    `return_direct=True` produced it), the complete output is yielded once the
+    run finishes. `outcome["final_answer"]` is then set to whether the agent
+    ended on a "Final Answer:".
+    """
+    # RunnableWithMessageHistory calls get_memory synchronously on the loop; creating a
+    # session's history costs round trips, so do it here and let the agent hit `_memories`
+    await asyncio.to_thread(get_memory, session_id)
+
+    tokens = _LoopQueue(asyncio.get_running_loop())
+    streamer = _FinalAnswerStreamer(tokens)
+    task = asyncio.ensure_future(
+        chat_agent.ainvoke(
+            {"input": user_input},
+            {"configurable": {"session_id": session_id}, "callbacks": [streamer]},
+        )
+    )
+    task.add_done_callback(lambda _: tokens.put(_DONE))
+
+    streamed = False
     try:
-        from langchain import hub
-        agent_prompt = hub.pull("hwchase17/react-chat")
-    except Exception:
-        agent_prompt = None
+        while True:
+            token = await tokens.queue.get()
+            if token is _DONE:
+                break
+            streamed = True
+            yield token
+    finally:
+        # The consumer stopped early; don't leave the run going
+        if not task.done():
+            task.cancel()
+
+    response = task.result()
+    if outcome is not None:
+        outcome["final_answer"] = streamer.final_answer
+    if not streamed:
+        # AgentExecutor/RunnableWithMessageHistory returns a dict-like result
+        if isinstance(response, dict) and "output" in response:
+            yield response["output"]
+        else:
+            # Otherwise, string-ish
+            yield str(response)
+
 
-    # Create ReAct agent and executor
+# Answers that must not be served to anyone else from the response cache
+_NON_ANSWER = re.compile(
+    r"^\W*(?:agent stopped due to|i (?:do not|don't|dont) know|i'm not sure|i am not sure"
+    r"|i (?:could not|couldn't|cannot|can't) (?:find|answer|help))",
+    re.IGNORECASE,
+)
+
+
+def _cacheable(answer: str) -> bool:
+    return bool(answer.strip()) and not _NON_ANSWER.match(answer)
+
+
+async def _aremember(session_id: str, user_input: str, answer: str) -> None:
+    """Add an exchange the agent did not run to the session's history, as the agent would have."""
+    if not NEO4J_CONFIGURED:
+        return
+    # Creating a session's history object costs a round trip
+    memory = await asyncio.to_thread(get_memory, session_id)
+    if memory is None:
+        return
     try:
-        from langchain_core.agents import create_react_agent
-        from langchain.agents import AgentExecutor
-        from langchain_core.runnables.history import RunnableWithMessageHistory
-
-        if agent_prompt is None:
-            # If hub prompt not available, use a simple instruction prompt
-            agent_prompt = chat_prompt
-
-        agent = create_react_agent(llm, tools, agent_prompt)
-        agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True)
-
-        # Wrap with history if possible
-        chat_agent = RunnableWithMessageHistory(
-            agent_executor,
-            get_memory,
-            input_messages_key="input",
-            history_messages_key="chat_history",
-        )
+        from langchain_core.messages import AIMessage, HumanMessage
+
+        await memory.aadd_messages([HumanMessage(content=user_input), AIMessage(content=answer)])
     except Exception as e:
-        logger.info("Could not create full AgentExecutor+RunnableWithMessageHistory: %s", e)
-        # Fall back to using the LLM directly via the movie_chat tool
-        chat_agent = None
-except Exception as e:
-    logger.exception("Unexpected error initializing agent: %s", e)
-    chat_agent = None
+        logger.info("Could not save exchange to history: %s", e)
 
 
-def generate_response(user_input: str) -> str:
-    """Handler called by Streamlit UI to get a response for `user_input`.
+async def _aanswer_directly(user_input: str, vector, session_id: str) -> Optional[str]:
+    """Answer with the tool the router picks, or return None to leave it to the agent.
 
-    This will invoke the chat_agent with conversation history when
-    available. If chat_agent couldn't be initialized, it falls back
-    to calling the `movie_chat` chain directly.
+    The tools get no chat history, so this is only for a session's first
+    question. The exchange is added to the session's history (see `_aremember`).
     """
-    session_id = get_session_id()
+    router = await asyncio.to_thread(get_router)
+    if router is None:
+        return None
+    start = time.perf_counter()
+    try:
+        # Embedding the question is CPU work; keep it off the event loop
+        route = await asyncio.to_thread(router.route, user_input, vector)
+        if route is None:
+            return None
+        answer = await ROUTES[route](user_input)
+    except Exception as e:
+        logger.warning("Routed answer failed, using the agent: %s", e)
+        return None
+    router.record("direct", time.perf_counter() - start)
+    await _aremember(session_id, user_input, answer)
+    return answer
 
-    # If we have a full agent runnable and Neo4j-backed memory is configured, call it with session_id.
-    # If Neo4j is not configured (graph is None) the RunnableWithMessageHistory won't persist, so
-    # we prefer to use a Streamlit session-backed history fallback below.
-    if chat_agent is not None and graph is not None:
+
+def _session_history(user_input: str) -> PromptHistory:
+    """Return this session's `PromptHistory`, caught up with session_state messages.
+
+    The UI appends the question being answered before calling us; it is left
+    out here because the fallback prompt adds it after the prefix.
+    """
+    history = st.session_state.get("prompt_history")
+    if history is None:
+        history = PromptHistory(int(st.secrets.get("FALLBACK_HISTORY_TOKENS", 1500)))
+        st.session_state["prompt_history"] = history
+    messages = st.session_state.get("messages", [])
+    if messages and messages[-1].get("role") == "user" and messages[-1].get("content") == user_input:
+        messages = messages[:-1]
+    return history.sync(messages)
+
+
+async def _astream_fallback(user_input: str, history: PromptHistory) -> AsyncIterator[str]:
+    """Stream from `movie_chat`, prefixing the question with the session's packed history."""
+    combined_input = f"{history.prefix}User: {user_input}" if history.prefix else user_input
+
+    formatted = chat_prompt.format(input=combined_input)
+    movie_chat = await asyncio.to_thread(get_movie_chat)
+    # movie_chat streams message chunks carrying `content`
+    async for chunk in movie_chat.astream(formatted):
+        text = _chunk_text(chunk)
+        if text:
+            yield text
+
+
+async def astream_response(
+    user_input: str, session_id: Optional[str] = None, history: Optional[PromptHistory] = None
+) -> AsyncIterator[str]:
+    """Yield the response to `user_input` in chunks without blocking the event loop.
+
+    Answers to previously seen (semantically similar) questions asked after
+    the same last exchange are served from `response_cache`. Questions the router is confident about are
+    answered by the matching tool directly. Otherwise this streams from the
+    chat_agent with conversation history when available, and falls back to
+    streaming from the `movie_chat` chain directly if chat_agent couldn't be
+    initialized.
+
+    `session_id` and `history` default to the current Streamlit session; they
+    are read before the first `await`, so call this from the script thread
+    or pass them explicitly.
+    """
+    if session_id is None:
+        session_id = get_session_id()
+    if history is None:
+        history = _session_history(user_input)
+
+    vector = None
+    # "Tell me more" means something else after every turn
+    context = history.last_turn()
+    response_cache = await asyncio.to_thread(get_response_cache)
+    use_cache = response_cache is not None and not response_cache.bypass(user_input)
+    if use_cache:
         try:
-            response = chat_agent.invoke(
-                {"input": user_input}, {"configurable": {"session_id": session_id}}
-            )
-            # AgentExecutor/RunnableWithMessageHistory returns a dict-like result
-            if isinstance(response, dict) and "output" in response:
-                return response["output"]
-            # Otherwise, string-ish
-            return str(response)
+            vector = await asyncio.to_thread(response_cache.embed, user_input)
+            cached = response_cache.get(user_input, vector, context)
         except Exception as e:
-            logger.exception("Agent invocation failed: %s", e)
-            err = str(e)
-            if "model_decommissioned" in err or "model_not_found" in err:
-                return (
-                    "The configured Groq model is not available (decommissioned or no access). "
-                    "Please update `GROQ_MODEL` in `.streamlit/secrets.toml` to a supported model and restart.\n\n"
-                    f"Error details: {err}"
-                )
-            return f"Agent error: {err}"
-
-    # Fallback: use Streamlit session_state as conversation memory and call the movie_chat chain.
+            logger.warning("Semantic cache lookup failed, continuing without cache: %s", e)
+            use_cache = False
+        else:
+            if cached is not None:
+                # Follow-up questions need this turn in the session's history
+                await _aremember(session_id, user_input, cached)
+                yield cached
+                return
+
+    # If we have a full agent runnable and Neo4j-backed memory is configured, call it with session_id.
+    # If Neo4j is not configured (graph is None) the RunnableWithMessageHistory won't persist, so
+    # we prefer to use a Streamlit session-backed history fallback.
+    graph = await asyncio.to_thread(get_graph)
+    chat_agent = await asyncio.to_thread(get_chat_agent) if graph is not None else None
+    use_agent = chat_agent is not None
+
+    # Obvious plot / graph-fact / small-talk questions skip the agent's tool-choice step.
+    # Routed tools see only the question, so later turns ("and the director?") go to the
+    # agent, which has the conversation history.
+    if use_agent and not len(history) and not is_session_dependent(user_input):
+        answer = await _aanswer_directly(user_input, vector, session_id)
+        if answer is not None:
+            yield answer
+            if use_cache and _cacheable(answer):
+                response_cache.put(user_input, answer, vector, context)
+            return
+
+    started = time.perf_counter()
+    parts = []
+    outcome = {}
     try:
-        # Build a conversation history string from recent messages in session state
-        history_lines = []
-        msgs = st.session_state.get("messages", [])
-        # Include up to the last 10 messages to keep prompt size reasonable
-        for m in msgs[-10:]:
-            role = m.get("role", "user")
-            content = m.get("content", "")
-            # Normalize role names
-            if role == "assistant":
-                speaker = "Assistant"
-            else:
-                speaker = "User"
-            history_lines.append(f"{speaker}: {content}")
-
-        history_text = "\n".join(history_lines)
-
-        if history_text:
-            combined_input = f"Conversation so far:\n{history_text}\n\nUser: {user_input}"
+        if use_agent:
+            chunks = _astream_agent(chat_agent, user_input, session_id, outcome)
         else:
-            combined_input = user_input
-
-        formatted = chat_prompt.format(input=combined_input)
-        response = movie_chat.invoke(formatted)
-        # movie_chat invocation usually returns a string or object with `content`
-        if hasattr(response, "content"):
-            return response.content
-        return str(response)
+            chunks = _astream_fallback(user_input, history)
+        async for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
     except Exception as e:
-        logger.exception("Fallback LLM call failed: %s", e)
-        return f"An error occurred while calling the language model: {e}"
\ No newline at end of file
+        if use_agent:
+            logger.exception("Agent invocation failed: %s", e)
+            message = _error_message(e)
+        else:
+            logger.exception("Fallback LLM call failed: %s", e)
+            message = f"An error occurred while calling the language model: {e}"
+        # Keep whatever was already shown and append the error below it
+        yield ("\n\n" if parts else "") + message
+        return
+
+    if use_agent and parts:
+        # The first call builds the router (embeds its exemplars); keep that off the loop
+        router = await asyncio.to_thread(get_router)
+        if router is not None:
+            router.record("agent", time.perf_counter() - started)
+    answer = "".join(parts)
+    # Iteration/time-limit stops and non-answers would be served for a whole TTL
+    if use_cache and _cacheable(answer) and (not use_agent or outcome.get("final_answer")):
+        response_cache.put(user_input, answer, vector, context)
+
+
+async def agenerate_response(
+    user_input: str, session_id: Optional[str] = None, history: Optional[PromptHistory] = None
+) -> str:
+    """Return the complete response to `user_input` (see `astream_response`)."""
+    return "".join([chunk async for chunk in astream_response(user_input, session_id, history)])
+
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _event_loop() -> asyncio.AbstractEventLoop:
+    """Return the process-wide event loop, started in a daemon thread on first use.
+
+    Shared clients (the ChatGroq async client, the history buffer) bind their
+    connection pools to the loop that first used them, so every turn has to
+    run on the same long-lived loop rather than one per call.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="agent-event-loop", daemon=True).start()
+            _loop = loop
+    return _loop
+
+
+def run_coroutine(coro):
+    """Run `coro` on the shared event loop from any other thread and return its result."""
+    return asyncio.run_coroutine_threadsafe(coro, _event_loop()).result()
+
+
+def stream_response(
+    user_input: str, session_id: Optional[str] = None, history: Optional[PromptHistory] = None
+) -> Iterator[str]:
+    """Handler called by Streamlit UI; yields the response to `user_input` in chunks.
+
+    A thin wrapper that drives `astream_response` on the shared event loop
+    (see `_event_loop`); concurrent sessions each submit their own turn.
+    """
+    if session_id is None:
+        session_id = get_session_id()
+    if history is None:
+        history = _session_history(user_input)
+
+    chunks = astream_response(user_input, session_id, history)
+    try:
+        while True:
+            try:
+                yield run_coroutine(chunks.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        run_coroutine(chunks.aclose())
+
+
+def generate_response(user_input: str) -> str:
+    """Return the complete response to `user_input` (see `stream_response`)."""
+    return "".join(stream_response(user_input))
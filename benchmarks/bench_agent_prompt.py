@@ -0,0 +1,50 @@
+"""Compare building the ReAct prompt from the hub with the vendored copy.
+
+Run from the repository root (the hub timing needs network access):
+
+    python benchmarks/bench_agent_prompt.py [--runs 5]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prompts import REACT_CHAT_HUB_NAME, get_react_prompt  # noqa: E402
+
+
+def hub_pull():
+    from langchain import hub
+
+    return hub.pull(REACT_CHAT_HUB_NAME)
+
+
+def timed(func, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    for name, func in (("hub.pull", hub_pull), ("vendored", get_react_prompt)):
+        try:
+            samples = timed(func, args.runs)
+        except Exception as e:
+            print(f"{name:<10} failed: {e}")
+            continue
+        print(f"{name:<10} median {statistics.median(samples) * 1000:8.2f} ms  "
+              f"max {max(samples) * 1000:8.2f} ms  ({args.runs} runs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Recall@10 and queries/sec of IVFIndex against exact search on synthetic data.
+
+Vectors are drawn around random cluster centres (plot embeddings are
+clustered by genre and topic, unlike uniform noise). Run from the
+repository root:
+
+    python benchmarks/bench_ann_index.py --sizes 100000 1000000 --nprobe 4 8 16 32
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from tools.ann_index import IVFIndex  # noqa: E402
+from tools.plot_index import PlotIndex, normalize_rows  # noqa: E402
+
+DIM = 384
+K = 10
+
+
+def synthetic(n, clusters, rng):
+    centres = normalize_rows(rng.normal(size=(clusters, DIM)))
+    out = np.empty((n, DIM), dtype=np.float32)
+    for start in range(0, n, 100000):
+        stop = min(n, start + 100000)
+        noise = rng.normal(0, 0.6 / np.sqrt(DIM), (stop - start, DIM)).astype(np.float32)
+        out[start:stop] = normalize_rows(centres[rng.integers(0, clusters, stop - start)] + noise)
+    return out
+
+
+def recall(found, truth):
+    return float(np.mean([len(set(f) & set(t)) / K for f, t in zip(found, truth)]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--nlist", type=int, default=0, help="default: 4 * sqrt(n)")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for n in args.sizes:
+        vectors = synthetic(n, clusters=max(50, n // 2000), rng=rng)
+        documents = [{}] * n
+        queries = normalize_rows(vectors[rng.integers(0, n, args.queries)] + rng.normal(0, 0.02, (args.queries, DIM)))
+
+        exact = PlotIndex(vectors, documents)
+        start = time.perf_counter()
+        _, truth = exact.search(queries, K)
+        exact_qps = args.queries / (time.perf_counter() - start)
+
+        nlist = args.nlist or int(4 * np.sqrt(n))
+        index = IVFIndex(DIM, nlist=nlist)
+        start = time.perf_counter()
+        index.train(vectors)
+        index.add(vectors, documents)
+        build = time.perf_counter() - start
+
+        print(f"n={n:,}  nlist={nlist}  build {build:.1f}s  exact {exact_qps:,.0f} q/s (batched)")
+        for nprobe in args.nprobe:
+            start = time.perf_counter()
+            _, found = index.search(queries, K, nprobe=nprobe)
+            qps = args.queries / (time.perf_counter() - start)
+            print(f"  nprobe={nprobe:<3} recall@{K} {recall(found, truth):.3f}  {qps:,.0f} q/s")
+
+
+if __name__ == "__main__":
+    main()
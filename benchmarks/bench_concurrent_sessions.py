@@ -0,0 +1,95 @@
+"""Concurrent sessions per process: blocking generate_response vs agenerate_response.
+
+"sync" serves each session on its own thread from a pool of `--threads`,
+the way a Streamlit worker holds a thread for the whole turn. "async"
+serves every session as a task on a single event loop. For each
+concurrency level the benchmark reports throughput and p50/p95 turn
+latency. Sessions are "supported" while p95 stays within `--slo` times the
+single-session p95.
+
+Needs the Groq and Neo4j credentials in `.streamlit/secrets.toml`.
+Disable the semantic and answer caches there for a fair run, or every
+repeated question is a cache hit. Run from the repository root:
+
+    python benchmarks/bench_concurrent_sessions.py [--levels 1 4 16 64] [--threads 8]
+"""
+
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from agent import agenerate_response, run_coroutine, stream_response  # noqa: E402
+from history import PromptHistory  # noqa: E402
+
+QUESTIONS = [
+    "Who directed The Matrix?",
+    "What is the plot of Heat?",
+    "Recommend a movie about time travel",
+    "Which actors starred in Toy Story?",
+]
+
+
+def sync_turn(i):
+    start = time.perf_counter()
+    "".join(stream_response(QUESTIONS[i % len(QUESTIONS)], session_id=f"load-{i}", history=PromptHistory()))
+    return time.perf_counter() - start
+
+
+async def async_turn(i):
+    start = time.perf_counter()
+    await agenerate_response(QUESTIONS[i % len(QUESTIONS)], session_id=f"load-{i}", history=PromptHistory())
+    return time.perf_counter() - start
+
+
+def run_sync(sessions, threads):
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(sync_turn, range(sessions)))
+
+
+def run_async(sessions):
+    async def main():
+        return await asyncio.gather(*(async_turn(i) for i in range(sessions)))
+
+    # The app's own loop; a fresh asyncio.run() loop per level would strand the shared LLM client
+    return run_coroutine(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--threads", type=int, default=8, help="worker threads for the sync path")
+    parser.add_argument("--slo", type=float, default=2.0, help="allowed p95 growth over one session")
+    args = parser.parse_args()
+
+    runs = {
+        "sync": lambda n: run_sync(n, args.threads),
+        "async": run_async,
+    }
+    supported = {}
+    for name, run in runs.items():
+        baseline = None
+        for sessions in args.levels:
+            start = time.perf_counter()
+            latencies = np.asarray(run(sessions))
+            wall = time.perf_counter() - start
+            p50, p95 = np.percentile(latencies, 50), np.percentile(latencies, 95)
+            baseline = baseline or p95
+            if p95 <= args.slo * baseline:
+                supported[name] = sessions
+            print(
+                f"{name:5} {sessions:4d} sessions  {sessions / wall:6.2f} turns/s  "
+                f"p50 {p50:6.2f} s  p95 {p95:6.2f} s"
+            )
+    for name, sessions in supported.items():
+        print(f"{name}: up to {sessions} concurrent sessions within {args.slo}x single-session p95")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Per-turn history read latency as a session grows: full chain vs window.
+
+Grows one throwaway session to each size in `--sizes`. At every size it
+times reading the whole chain (what replaying the full history costs) and
+`WindowedChatHistory.messages`, and reports the tokens each would paste
+into the prompt. The session is deleted afterwards. Needs the Neo4j
+credentials in `.streamlit/secrets.toml`; run from the repository root:
+
+    python benchmarks/bench_history_window.py [--sizes 10 100 500] [--window 10]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import AIMessage, HumanMessage  # noqa: E402
+from langchain_neo4j import Neo4jChatMessageHistory  # noqa: E402
+
+from graph import get_graph, neo4j_connections  # noqa: E402
+from history import WindowedChatHistory, WriteBehindBuffer  # noqa: E402
+from tokens import count_tokens  # noqa: E402
+
+FULL_QUERY = """
+MATCH (s:Session {id: $session_id})-[:LAST_MESSAGE]->(last)
+MATCH p = (last)<-[:NEXT*0..]-()
+WITH p ORDER BY length(p) DESC LIMIT 1
+RETURN [m IN nodes(p) | m.content] AS contents
+"""
+
+
+def timed(func, runs=5):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--window", type=int, default=10)
+    args = parser.parse_args()
+
+    graph = get_graph()
+    if graph is None:
+        sys.exit("Neo4j is not configured or not reachable; check .streamlit/secrets.toml")
+    driver = neo4j_connections.driver
+    session_id = f"bench-{uuid.uuid4()}"
+    history = neo4j_connections.adopt(Neo4jChatMessageHistory(session_id=session_id, graph=graph))
+    buffer = WriteBehindBuffer(driver)
+    windowed = WindowedChatHistory(session_id, history, driver, buffer, window=args.window, max_tokens=10**6)
+
+    answer = "An answer of typical length about a movie, its director and its cast. " * 4
+    size = 0
+    try:
+        for target in sorted(args.sizes):
+            while size < target:
+                windowed.add_messages([HumanMessage(content=f"Question {size}?"), AIMessage(content=answer)])
+                size += 2
+            buffer.flush()
+
+            def full():
+                records, _, _ = driver.execute_query(FULL_QUERY, {"session_id": session_id})
+                return records[0]["contents"]
+
+            full_ms, contents = timed(full)
+            window_ms, messages = timed(lambda: windowed.messages)
+            print(
+                f"{size:5d} messages  full {full_ms:7.2f} ms {sum(map(count_tokens, contents)):7d} tokens  "
+                f"window {window_ms:7.2f} ms {sum(count_tokens(m.content) for m in messages):6d} tokens"
+            )
+    finally:
+        windowed.clear()
+
+
+if __name__ == "__main__":
+    main()
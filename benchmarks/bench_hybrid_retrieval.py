@@ -0,0 +1,83 @@
+"""Latency and title hit rate: fused hybrid query vs two-step hybrid vs vector only.
+
+Asks "What is the plot of <title>?" for movies sampled from the graph and
+compares three ways of retrieving plots for `kg_qa`:
+
+    vector     the moviePlots vector index alone (today's default)
+    two-step   vector and full-text queries as separate round trips,
+               fused client-side, then a third query for the metadata
+    fused      `HybridRetriever`: both indexes and RRF in one Cypher call
+
+Embeddings are computed before timing and every read bypasses the result
+cache. "title hit" is the share of questions whose movie is in the top k.
+Needs the Neo4j credentials in `.streamlit/secrets.toml`; run from the
+repository root:
+
+    python benchmarks/bench_hybrid_retrieval.py --questions 100
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from graph import get_graph  # noqa: E402
+from llm import get_embeddings  # noqa: E402
+from tools.hybrid import HYBRID_QUERY, HybridRetriever, _to_documents, ensure_fulltext_index, two_step_search  # noqa: E402
+from tools.vector import RETRIEVAL_QUERY  # noqa: E402
+
+VECTOR_QUERY = """
+CALL db.index.vector.queryNodes($vector_index, $k, $embedding) YIELD node, score
+""" + RETRIEVAL_QUERY
+
+SAMPLE_TITLES = """
+MATCH (m:Movie) WHERE m.plot IS NOT NULL AND m.title IS NOT NULL
+RETURN m.title AS title ORDER BY rand() LIMIT $n
+"""
+
+
+def measure(func, cases):
+    samples, hits = [], 0
+    for title, params in cases:
+        start = time.perf_counter()
+        documents = func(params)
+        samples.append(time.perf_counter() - start)
+        hits += any(d.metadata.get("title") == title for d in documents)
+    ms = np.asarray(samples) * 1000
+    return np.percentile(ms, 50), np.percentile(ms, 99), hits / len(cases)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--questions", type=int, default=100)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--candidates", type=int, default=20)
+    args = parser.parse_args()
+
+    graph = get_graph()
+    if graph is None:
+        sys.exit("Neo4j is not configured or not reachable; check .streamlit/secrets.toml")
+    ensure_fulltext_index(graph)
+
+    retriever = HybridRetriever(graph=graph, embeddings=get_embeddings(), k=args.k, candidates=args.candidates)
+    titles = [row["title"] for row in graph.query_uncached(SAMPLE_TITLES, {"n": args.questions})]
+    cases = [(t, retriever._params(f"What is the plot of {t}?")) for t in titles]
+
+    runs = {
+        "vector": lambda p: _to_documents(graph.query_uncached(VECTOR_QUERY, p)),
+        "two-step": lambda p: two_step_search(graph, p),
+        "fused": lambda p: _to_documents(graph.query_uncached(HYBRID_QUERY, p)),
+    }
+    print(f"{len(cases)} questions, k={args.k}, {args.candidates} candidates per index")
+    for name, func in runs.items():
+        func(cases[0][1])  # warm up the driver and the query plan
+        p50, p99, hit_rate = measure(func, cases)
+        print(f"{name:9} p50 {p50:7.2f} ms  p99 {p99:7.2f} ms  title hit {hit_rate:6.1%}")
+
+
+if __name__ == "__main__":
+    main()
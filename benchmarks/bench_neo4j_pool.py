@@ -0,0 +1,66 @@
+"""Connections opened by a burst of sessions: driver per client vs the shared pool.
+
+Each simulated session reads its chat history and runs one graph query,
+like a chat turn. "per-client" gives every session its own driver (what a
+fresh `Neo4jChatMessageHistory` without a shared graph does); "shared"
+uses `graph.neo4j_connections`. Needs the Neo4j credentials in
+`.streamlit/secrets.toml`; run from the repository root:
+
+    python benchmarks/bench_neo4j_pool.py [--sessions 50] [--threads 16]
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from neo4j import GraphDatabase  # noqa: E402
+
+from graph import NEO4J_PASSWORD, NEO4J_URI, NEO4J_USERNAME, neo4j_connections  # noqa: E402
+
+HISTORY_QUERY = """
+MATCH (s:Session {id: $session_id})-[:LAST_MESSAGE]->(m)
+RETURN m.type AS type LIMIT 1
+"""
+
+
+def turn(driver, i):
+    driver.execute_query(HISTORY_QUERY, {"session_id": f"pool-bench-{i}"})
+    driver.execute_query("MATCH (m:Movie) RETURN count(m) AS movies")
+
+
+def per_client(i):
+    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USERNAME, NEO4J_PASSWORD))
+    try:
+        turn(driver, i)
+    finally:
+        driver.close()
+    return 1
+
+
+def shared(i):
+    turn(neo4j_connections.driver, i)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=16)
+    args = parser.parse_args()
+
+    neo4j_connections.driver  # connect outside the timing
+    for name, func in (("per-client", per_client), ("shared", shared)):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.threads) as pool:
+            drivers = sum(pool.map(func, range(args.sessions)))
+        elapsed = time.perf_counter() - start
+        print(f"{name:10} {args.sessions} sessions in {elapsed:6.2f}s, {drivers} extra drivers opened")
+    print("shared pool:", neo4j_connections.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""p50/p99 plot retrieval latency: local PlotIndex vs Neo4jVector.
+
+Query embeddings are precomputed (perturbed copies of indexed vectors), so
+only retrieval is timed. Run from the repository root:
+
+    python benchmarks/bench_plot_retrieval.py --synthetic 30000
+    python benchmarks/bench_plot_retrieval.py --index .cache/plot_index --neo4j
+
+`--neo4j` also times `Neo4jVector.similarity_search_by_vector` against the
+`moviePlots` index (needs the Neo4j credentials in `.streamlit/secrets.toml`).
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from tools.plot_index import PlotIndex, normalize_rows  # noqa: E402
+
+
+def percentiles(samples):
+    ms = np.asarray(samples) * 1000
+    return np.percentile(ms, 50), np.percentile(ms, 99)
+
+
+def make_queries(vectors, n, rng):
+    picks = np.asarray(vectors[rng.integers(0, len(vectors), n)])
+    return normalize_rows(picks + rng.normal(0, 0.05, picks.shape).astype(np.float32))
+
+
+def time_each(func, queries):
+    samples = []
+    for q in queries:
+        start = time.perf_counter()
+        func(q)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--index", help="directory written by scripts/export_plot_vectors.py")
+    parser.add_argument("--synthetic", type=int, help="use N random 384-dim vectors instead")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--neo4j", action="store_true")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    if args.synthetic:
+        vectors = normalize_rows(rng.normal(size=(args.synthetic, 384)))
+        index = PlotIndex(vectors, [{"text": "", "metadata": {}}] * len(vectors))
+    elif args.index:
+        index = PlotIndex.load(args.index)
+    else:
+        parser.error("pass --index or --synthetic")
+
+    queries = make_queries(index.vectors, args.queries, rng)
+    index.search(queries[:1], args.k)  # fault in the memory map
+
+    p50, p99 = percentiles(time_each(lambda q: index.search(q, args.k), queries))
+    print(f"{len(index)} vectors, k={args.k}, {args.queries} queries")
+    print(f"PlotIndex    single  p50 {p50:7.2f} ms  p99 {p99:7.2f} ms")
+
+    start = time.perf_counter()
+    index.search(queries, args.k)
+    batched = (time.perf_counter() - start) / len(queries)
+    print(f"PlotIndex    batched {batched * 1000:7.3f} ms/query")
+
+    if args.neo4j:
+        from tools.vector import get_neo4jvector
+
+        store = get_neo4jvector()
+        if store is None:
+            sys.exit("Neo4jVector is not available; check the Neo4j credentials")
+        store.similarity_search_by_vector(queries[0].tolist(), k=args.k)
+        samples = time_each(lambda q: store.similarity_search_by_vector(q.tolist(), k=args.k), queries)
+        p50, p99 = percentiles(samples)
+        print(f"Neo4jVector  single  p50 {p50:7.2f} ms  p99 {p99:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
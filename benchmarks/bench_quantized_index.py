@@ -0,0 +1,75 @@
+"""Memory, recall and latency of quantized plot search vs the float32 path.
+
+Compares `PlotIndex` (float32, what `kg_qa` uses by default) with
+`QuantizedPlotIndex` in int8 and float16, with and without exact
+re-ranking. Run from the repository root:
+
+    python benchmarks/bench_quantized_index.py --index .cache/plot_index
+    python benchmarks/bench_quantized_index.py --synthetic 30000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from tools.plot_index import PlotIndex, normalize_rows  # noqa: E402
+from tools.quantized_index import QuantizedPlotIndex  # noqa: E402
+
+
+def recall(found, truth, k):
+    return float(np.mean([len(set(f[:k]) & set(t[:k])) / k for f, t in zip(found, truth)]))
+
+
+def timed_search(index, queries, k):
+    samples = []
+    results = []
+    for q in queries:
+        start = time.perf_counter()
+        results.append(index.search(q, k)[1][0])
+        samples.append(time.perf_counter() - start)
+    return np.asarray(results), np.percentile(np.asarray(samples) * 1000, 50)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--index", help="directory written by scripts/export_plot_vectors.py")
+    parser.add_argument("--synthetic", type=int, help="use N clustered random 384-dim vectors instead")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    if args.synthetic:
+        centres = normalize_rows(rng.normal(size=(max(50, args.synthetic // 500), 384)))
+        picks = centres[rng.integers(0, len(centres), args.synthetic)]
+        vectors = normalize_rows(picks + rng.normal(0, 0.6 / np.sqrt(384), picks.shape))
+        exact = PlotIndex(vectors, [{}] * len(vectors))
+    elif args.index:
+        exact = PlotIndex.load(args.index, mmap=False)
+    else:
+        parser.error("pass --index or --synthetic")
+
+    picks = np.asarray(exact.vectors[rng.integers(0, len(exact), args.queries)])
+    queries = normalize_rows(picks + rng.normal(0, 0.02, picks.shape))
+    truth, p50 = timed_search(exact, queries, args.k)
+    base = np.asarray(exact.vectors).nbytes
+
+    print(f"{len(exact)} vectors, k={args.k}, {args.queries} queries")
+    print(f"{'variant':<26} {'MB':>7} {'saving':>7} {'recall':>7} {'p50 ms':>7}")
+    print(f"{'float32 (PlotIndex)':<26} {base / 1e6:7.1f} {'-':>7} {1.0:7.3f} {p50:7.2f}")
+    for dtype in ("int8", "float16"):
+        for factor in (1, 4):
+            index = QuantizedPlotIndex.from_plot_index(exact, dtype=dtype, rerank_factor=factor)
+            found, p50 = timed_search(index, queries, args.k)
+            label = f"{dtype} rerank x{factor}" if factor > 1 else f"{dtype} no rerank"
+            print(f"{label:<26} {index.nbytes / 1e6:7.1f} {base / index.nbytes:6.1f}x "
+                  f"{recall(found, truth, args.k):7.3f} {p50:7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Compare per-character re-rendering with `BubbleRenderer` on a 5k-char answer.
+
+Run from the repository root:
+
+    python benchmarks/bench_renderer.py
+
+A fake container records every `markdown()` call, and a simulated clock
+delivers one ~4-character token every 10 ms (roughly Groq's output rate).
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from renderer import BubbleRenderer  # noqa: E402
+
+ANSWER_CHARS = 5000
+TOKEN_CHARS = 4
+TOKEN_INTERVAL = 0.01
+
+
+class RecordingContainer:
+    def __init__(self):
+        self.updates = 0
+        self.bytes_sent = 0
+
+    def markdown(self, body, unsafe_allow_html=False):
+        self.updates += 1
+        self.bytes_sent += len(body.encode("utf-8"))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_answer(n: int) -> str:
+    words = "The film follows a reluctant hero across a galaxy far far away ".split()
+    out = []
+    while sum(len(w) + 1 for w in out) < n:
+        out.append(words[len(out) % len(words)])
+    return " ".join(out)[:n]
+
+
+def per_character(text: str) -> RecordingContainer:
+    """The previous typewriter: one full-bubble update per character."""
+    container = RecordingContainer()
+    message = ""
+    for char in text:
+        message += char
+        container.markdown(f'<div class="chat-bubble-assistant">{message}</div>', unsafe_allow_html=True)
+    return container
+
+
+def per_token(text: str) -> RecordingContainer:
+    """Naive streaming: one full-bubble update per token."""
+    container = RecordingContainer()
+    message = ""
+    for start in range(0, len(text), TOKEN_CHARS):
+        message += text[start:start + TOKEN_CHARS]
+        container.markdown(f'<div class="chat-bubble-assistant">{message}</div>', unsafe_allow_html=True)
+    return container
+
+
+def budgeted(text: str, max_fps: float) -> RecordingContainer:
+    container = RecordingContainer()
+    clock = FakeClock()
+    renderer = BubbleRenderer(container, max_fps=max_fps, clock=clock)
+    for start in range(0, len(text), TOKEN_CHARS):
+        renderer.feed(text[start:start + TOKEN_CHARS])
+        clock.now += TOKEN_INTERVAL
+    renderer.close()
+    return container
+
+
+def main():
+    text = make_answer(ANSWER_CHARS)
+    rows = [
+        ("per character (old typewriter)", per_character(text)),
+        ("per token", per_token(text)),
+        ("BubbleRenderer 30 fps", budgeted(text, 30)),
+        ("BubbleRenderer 15 fps", budgeted(text, 15)),
+        ("BubbleRenderer 5 fps", budgeted(text, 5)),
+    ]
+    print(f"{len(text)}-char answer, {TOKEN_CHARS}-char tokens every {TOKEN_INTERVAL * 1000:.0f} ms")
+    print(f"{'strategy':<32} {'updates':>8} {'bytes sent':>12}")
+    for name, container in rows:
+        print(f"{name:<32} {container.updates:>8} {container.bytes_sent:>12,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""DB hits, latency and payload of the kg_qa retrieval metadata, before/after.
+
+"before" is the original `retrieval_query`, which expands DIRECTED and
+ACTED_IN for every hit. "after" is the current `RETRIEVAL_QUERY`, which reads
+the projection written by `scripts/refresh_movie_metadata.py` (run it
+first). Both are run over the same movies, the largest casts by default,
+since that is where the expansion hurts. Needs the Neo4j credentials in
+`.streamlit/secrets.toml`; run from the repository root:
+
+    python benchmarks/bench_retrieval_metadata.py [--movies 200] [--hits 4]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from graph import get_graph  # noqa: E402
+from tools.vector import RETRIEVAL_QUERY  # noqa: E402
+
+BEFORE_QUERY = """
+RETURN
+    node.plot AS text,
+    score,
+    {
+        title: node.title,
+        directors: [ (person)-[:DIRECTED]->(node) | person.name ],
+        actors: [ (person)-[r:ACTED_IN]->(node) | [person.name, r.role] ],
+        tmdbId: node.tmdbId,
+        source: 'https://www.themoviedb.org/movie/'+ node.tmdbId
+    } AS metadata
+"""
+
+# Stands in for the index call: the same number of hits, without the vector search
+HITS = """
+UNWIND $ids AS id
+MATCH (node:Movie) WHERE elementId(node) = id
+WITH node, 1.0 AS score
+"""
+
+LARGEST_CASTS = """
+MATCH (m:Movie) WHERE m.plot IS NOT NULL
+RETURN elementId(m) AS id ORDER BY size([ (p)-[:ACTED_IN]->(m) | 1 ]) DESC LIMIT $n
+"""
+
+
+def db_hits(plan) -> int:
+    return plan.get("dbHits", 0) + sum(db_hits(child) for child in plan.get("children", []))
+
+
+def profile(driver, query, groups):
+    hits, samples, payload = 0, [], 0
+    with driver.session() as session:
+        for ids in groups:
+            summary = session.run("PROFILE " + query, {"ids": ids}).consume()
+            hits += db_hits(summary.profile)
+            start = time.perf_counter()
+            rows = session.run(query, {"ids": ids}).data()
+            samples.append(time.perf_counter() - start)
+            payload += len(json.dumps(rows, default=str))
+    ms = np.asarray(samples) * 1000
+    return hits / len(groups), np.percentile(ms, 50), np.percentile(ms, 99), payload / len(groups)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--movies", type=int, default=200)
+    parser.add_argument("--hits", type=int, default=4, help="documents per retrieval, as in kg_qa")
+    args = parser.parse_args()
+
+    graph = get_graph()
+    if graph is None:
+        sys.exit("Neo4j is not configured or not reachable; check .streamlit/secrets.toml")
+    ids = [row["id"] for row in graph.query_uncached(LARGEST_CASTS, {"n": args.movies})]
+    groups = [ids[i:i + args.hits] for i in range(0, len(ids), args.hits)]
+
+    print(f"{len(groups)} retrievals of {args.hits} movies (largest casts first)")
+    for name, query in (("before", BEFORE_QUERY), ("after", RETRIEVAL_QUERY)):
+        hits, p50, p99, payload = profile(graph._driver, HITS + query, groups)
+        print(f"{name:6} db hits {hits:9.0f}  p50 {p50:7.2f} ms  p99 {p99:7.2f} ms  payload {payload:8.0f} B")
+
+
+if __name__ == "__main__":
+    main()
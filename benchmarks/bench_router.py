@@ -0,0 +1,90 @@
+"""Routing accuracy and coverage of the embedding router on held-out questions.
+
+None of the questions below are router exemplars. For each threshold the
+benchmark reports coverage (share routed directly instead of through the
+agent) and accuracy of the routed ones; agent fallbacks are never wrong,
+only slower. Run from the repository root:
+
+    python benchmarks/bench_router.py [--thresholds 0.45 0.5 0.55 0.6] [--margin 0.05]
+
+Latency saved in production is in `get_router().stats()`.
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_community.embeddings import HuggingFaceEmbeddings  # noqa: E402
+
+from llm import EMBEDDING_MODEL  # noqa: E402
+from router import QuestionRouter  # noqa: E402
+
+HELD_OUT = [
+    ("Hey!", "movie_chat"),
+    ("Good morning", "movie_chat"),
+    ("Thank you so much", "movie_chat"),
+    ("What kind of questions can I ask you?", "movie_chat"),
+    ("Do you like horror films?", "movie_chat"),
+    ("What's the difference between a director and a producer?", "movie_chat"),
+    ("Why are sequels usually worse?", "movie_chat"),
+    ("See you later", "movie_chat"),
+    ("What is Pulp Fiction about?", "kg_qa"),
+    ("Give me the plot summary of Titanic", "kg_qa"),
+    ("A movie about a boy who befriends an alien", "kg_qa"),
+    ("Films where the main character loses their memory", "kg_qa"),
+    ("What happens at the end of Se7en?", "kg_qa"),
+    ("Is there a movie about a talking pig on a farm?", "kg_qa"),
+    ("Find me a film about a bank robbery in Los Angeles", "kg_qa"),
+    ("Movies about space exploration and survival", "kg_qa"),
+    ("Who starred in Pulp Fiction?", "cypher_qa"),
+    ("Who is the director of Titanic?", "cypher_qa"),
+    ("Which movies did Meg Ryan appear in?", "cypher_qa"),
+    ("How many films has Clint Eastwood directed?", "cypher_qa"),
+    ("What character did Harrison Ford play in Blade Runner?", "cypher_qa"),
+    ("What is the average rating of Fargo?", "cypher_qa"),
+    ("When was Casablanca released?", "cypher_qa"),
+    ("Which actors worked with Quentin Tarantino more than once?", "cypher_qa"),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.45, 0.5, 0.55, 0.6, 0.65])
+    parser.add_argument("--margin", type=float, default=0.05)
+    args = parser.parse_args()
+
+    embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+    vectors = embeddings.embed_documents([q for q, _ in HELD_OUT])
+
+    print(f"{len(HELD_OUT)} held-out questions, margin {args.margin}")
+    for threshold in args.thresholds:
+        router = QuestionRouter(embeddings, threshold=threshold, margin=args.margin)
+        router.route(HELD_OUT[0][0], vectors[0])  # embed the exemplars outside the timing
+
+        start = time.perf_counter()
+        routed, correct, mistakes = 0, 0, Counter()
+        for (question, expected), vector in zip(HELD_OUT, vectors):
+            route = router.route(question, vector)
+            if route is None:
+                continue
+            routed += 1
+            if route == expected:
+                correct += 1
+            else:
+                mistakes[f"{expected}->{route}"] += 1
+        per_question = (time.perf_counter() - start) * 1000 / len(HELD_OUT)
+
+        accuracy = correct / routed if routed else 0.0
+        print(
+            f"threshold {threshold:.2f}  coverage {routed / len(HELD_OUT):6.1%}  "
+            f"accuracy {accuracy:6.1%}  routing {per_question:.3f} ms/question  "
+            f"errors {dict(mistakes) or '-'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Prompt tokens and Cypher accuracy with the full vs the pruned schema.
+
+For each question below, reports the schema tokens the Cypher prompt gets
+with and without `SchemaSelector`, and whether the pruned schema still
+contains every label and relationship type the reference query uses.
+The schema comes from the snapshot `graph.py` saves, or from the sample
+recommendations schema in this file if there is none. Run from the
+repository root:
+
+    python benchmarks/bench_schema_pruning.py [--snapshot .cache/neo4j_schema.json] [--threshold 0.4]
+
+With `--generate` (needs the Neo4j and Groq credentials in
+`.streamlit/secrets.toml`) it also generates Cypher for every question
+with both schemas, runs it, and counts a query as correct when it
+returns the same rows as the reference query.
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_community.embeddings import HuggingFaceEmbeddings  # noqa: E402
+
+from llm import EMBEDDING_MODEL  # noqa: E402
+from tokens import count_tokens  # noqa: E402
+from tools.schema import SchemaSelector, render  # noqa: E402
+
+
+def _props(**props):
+    return [{"property": name, "type": kind} for name, kind in props.items()]
+
+
+# The recommendations dataset the app is built on
+SAMPLE_SCHEMA = {
+    "node_props": {
+        "Movie": _props(
+            url="STRING", runtime="INTEGER", revenue="INTEGER", imdbRating="FLOAT", released="STRING",
+            countries="LIST", languages="LIST", plot="STRING", imdbVotes="INTEGER", imdbId="STRING",
+            year="INTEGER", poster="STRING", movieId="STRING", tmdbId="STRING", title="STRING", budget="INTEGER",
+        ),
+        "Person": _props(
+            url="STRING", name="STRING", tmdbId="STRING", bornIn="STRING", bio="STRING",
+            died="DATE", born="DATE", imdbId="STRING", poster="STRING",
+        ),
+        "Actor": _props(url="STRING", name="STRING", tmdbId="STRING", bornIn="STRING", born="DATE", imdbId="STRING"),
+        "Director": _props(url="STRING", name="STRING", tmdbId="STRING", bornIn="STRING", born="DATE", imdbId="STRING"),
+        "User": _props(userId="STRING", name="STRING"),
+        "Genre": _props(name="STRING"),
+    },
+    "rel_props": {
+        "RATED": _props(rating="FLOAT", timestamp="INTEGER"),
+        "ACTED_IN": _props(role="STRING"),
+        "DIRECTED": _props(role="STRING"),
+    },
+    "relationships": [
+        {"start": "Movie", "type": "IN_GENRE", "end": "Genre"},
+        {"start": "User", "type": "RATED", "end": "Movie"},
+        {"start": "Actor", "type": "ACTED_IN", "end": "Movie"},
+        {"start": "Actor", "type": "DIRECTED", "end": "Movie"},
+        {"start": "Director", "type": "DIRECTED", "end": "Movie"},
+        {"start": "Director", "type": "ACTED_IN", "end": "Movie"},
+        {"start": "Person", "type": "ACTED_IN", "end": "Movie"},
+        {"start": "Person", "type": "DIRECTED", "end": "Movie"},
+    ],
+}
+
+# (question, reference Cypher)
+QUESTIONS = [
+    ("Who directed Casino?",
+     "MATCH (p:Person)-[:DIRECTED]->(m:Movie {title: 'Casino'}) RETURN p.name"),
+    ("Which actors starred in Heat?",
+     "MATCH (p:Person)-[:ACTED_IN]->(m:Movie {title: 'Heat'}) RETURN p.name"),
+    ("What role did Tom Hanks play in Toy Story?",
+     "MATCH (p:Person {name: 'Tom Hanks'})-[r:ACTED_IN]->(m:Movie {title: 'Toy Story'}) RETURN r.role"),
+    ("What is the IMDb rating of Jumanji?",
+     "MATCH (m:Movie {title: 'Jumanji'}) RETURN m.imdbRating"),
+    ("What year was Goodfellas released?",
+     "MATCH (m:Movie {title: 'Goodfellas'}) RETURN m.year"),
+    ("Which genres is Toy Story in?",
+     "MATCH (m:Movie {title: 'Toy Story'})-[:IN_GENRE]->(g:Genre) RETURN g.name"),
+    ("How many users rated Forrest Gump?",
+     "MATCH (u:User)-[:RATED]->(m:Movie {title: 'Forrest Gump'}) RETURN count(u)"),
+    ("What is the average user rating of Fargo?",
+     "MATCH (:User)-[r:RATED]->(m:Movie {title: 'Fargo'}) RETURN avg(r.rating)"),
+    ("How many movies did Steven Spielberg direct?",
+     "MATCH (p:Person {name: 'Steven Spielberg'})-[:DIRECTED]->(m:Movie) RETURN count(m)"),
+    ("Which movies did Al Pacino and Robert De Niro both act in?",
+     "MATCH (:Person {name: 'Al Pacino'})-[:ACTED_IN]->(m:Movie)<-[:ACTED_IN]-(:Person {name: 'Robert De Niro'}) RETURN m.title"),
+    ("What was the budget of Titanic?",
+     "MATCH (m:Movie {title: 'Titanic'}) RETURN m.budget"),
+    ("Where was Clint Eastwood born?",
+     "MATCH (p:Person {name: 'Clint Eastwood'}) RETURN p.bornIn"),
+    ("Which comedy movies have an IMDb rating above 8?",
+     "MATCH (m:Movie)-[:IN_GENRE]->(:Genre {name: 'Comedy'}) WHERE m.imdbRating > 8 RETURN m.title"),
+    ("Which directors also acted in their own movies?",
+     "MATCH (p:Person)-[:DIRECTED]->(m:Movie)<-[:ACTED_IN]-(p) RETURN DISTINCT p.name"),
+]
+
+_NAMES = re.compile(r":\s*([A-Za-z_][A-Za-z0-9_]*)")
+_FENCED = re.compile(r"```(?:cypher)?(.*?)```", re.DOTALL | re.IGNORECASE)
+
+
+def covered(cypher: str, structured_schema: dict) -> bool:
+    """Whether every label and relationship type `cypher` uses is in the schema."""
+    known = set(structured_schema.get("node_props", {})) | {r["type"] for r in structured_schema.get("relationships", [])}
+    known |= {r[end] for r in structured_schema.get("relationships", []) for end in ("start", "end")}
+    return all(name in known for name in _NAMES.findall(re.sub(r"\{[^}]*\}", "", cypher)))
+
+
+def load_schema(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)["structured_schema"]
+    except (OSError, ValueError, KeyError):
+        print(f"No schema snapshot at {path}; using the sample recommendations schema")
+        return SAMPLE_SCHEMA
+
+
+def rows(graph, cypher: str):
+    try:
+        return sorted(json.dumps(row, sort_keys=True, default=str) for row in graph.query(cypher))
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--snapshot", default=".cache/neo4j_schema.json")
+    parser.add_argument("--threshold", type=float, default=0.4)
+    parser.add_argument("--property-threshold", type=float, default=0.45)
+    parser.add_argument("--generate", action="store_true", help="generate and run Cypher with both schemas")
+    args = parser.parse_args()
+
+    structured_schema = load_schema(args.snapshot)
+    embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+    selector = SchemaSelector(
+        embeddings, structured_schema, threshold=args.threshold, property_threshold=args.property_threshold
+    )
+    full = render(structured_schema)
+    full_tokens = count_tokens(full)
+
+    pruned_tokens, misses, schemas = [], [], {}
+    print(f"{'tokens':>7}  {'covers':>6}  question")
+    for question, reference in QUESTIONS:
+        selected = selector.select(question)
+        schemas[question] = render(selected)
+        pruned_tokens.append(count_tokens(schemas[question]))
+        ok = covered(reference, selected)
+        if not ok:
+            misses.append(question)
+        print(f"{pruned_tokens[-1]:>7}  {'yes' if ok else 'NO':>6}  {question}")
+
+    mean = statistics.mean(pruned_tokens)
+    print(f"\nfull schema: {full_tokens} tokens; pruned: {mean:.0f} mean, {max(pruned_tokens)} max "
+          f"({100 * (1 - mean / full_tokens):.0f}% fewer)")
+    print(f"schema coverage of reference queries: {len(QUESTIONS) - len(misses)}/{len(QUESTIONS)}")
+
+    if not args.generate:
+        return
+
+    from graph import get_graph
+    from tools.cypher import cypher_prompt
+    from llm import get_llm
+    from langchain_core.output_parsers import StrOutputParser
+
+    graph = get_graph()
+    if graph is None:
+        sys.exit("Neo4j is not configured; --generate needs a graph")
+    generate = cypher_prompt | get_llm() | StrOutputParser()
+    correct = {"full": 0, "pruned": 0}
+    for question, reference in QUESTIONS:
+        expected = rows(graph, reference)
+        for name, schema in (("full", full), ("pruned", schemas[question])):
+            text = generate.invoke({"schema": schema, "question": question})
+            fenced = _FENCED.search(text)
+            cypher = (fenced.group(1) if fenced else text).strip()
+            correct[name] += rows(graph, cypher) == expected
+    for name, n in correct.items():
+        print(f"{name:>6} schema: {n}/{len(QUESTIONS)} queries return the reference rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Measure graph start-up time with and without the persisted schema snapshot.
+
+Needs the Neo4j credentials in `.streamlit/secrets.toml`. Run from the
+repository root:
+
+    python benchmarks/bench_schema_startup.py [--runs 5]
+
+"before" constructs `Neo4jGraph` with the default schema introspection.
+"after" constructs it with `refresh_schema=False` and loads the snapshot,
+which is what `graph.py` does; the fingerprint check and any refresh run
+in a background thread and are not on the start-up path.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import streamlit as st  # noqa: E402
+from langchain_community.graphs import Neo4jGraph  # noqa: E402
+
+from caching.schema import SchemaSnapshot  # noqa: E402
+
+
+def connect(**kwargs):
+    return Neo4jGraph(
+        url=st.secrets["NEO4J_URI"],
+        username=st.secrets["NEO4J_USERNAME"],
+        password=st.secrets["NEO4J_PASSWORD"],
+        **kwargs,
+    )
+
+
+def timed(func, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "schema.json")
+    snapshot = SchemaSnapshot(path)
+    seed = connect()
+    snapshot.fingerprint = snapshot.compute_fingerprint(seed)
+    snapshot.save(seed)
+
+    def before():
+        connect()
+
+    def after():
+        graph = connect(refresh_schema=False)
+        assert SchemaSnapshot(path).load(graph)
+
+    for name, func in (("before (introspect)", before), ("after (snapshot)", after)):
+        samples = timed(func, args.runs)
+        print(f"{name:<22} median {statistics.median(samples) * 1000:8.1f} ms  "
+              f"min {min(samples) * 1000:8.1f} ms  ({args.runs} runs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
 import streamlit as st
-import time
 import random
 from utils import write_message
-from agent import generate_response
+from agent import stream_response
+from renderer import BubbleRenderer
+from resources import registry
 
 # -------------------------------------------------
 # PAGE CONFIG
@@ -115,17 +116,6 @@ if "messages" not in st.session_state:
         {"role": "assistant", "content": "Hi, I'm your Movie Expert! How can I help you today?"}
     ]
 
-# -------------------------------------------------
-# TYPEWRITER EFFECT
-# -------------------------------------------------
-def typewriter(text: str):
-    message = ""
-    container = st.empty()
-    for char in text:
-        message += char
-        container.markdown(f'<div class="chat-bubble-assistant">{message}</div>', unsafe_allow_html=True)
-        time.sleep(0.01)
-
 # -------------------------------------------------
 # ENHANCED MESSAGE WRITER
 # -------------------------------------------------
@@ -137,10 +127,15 @@ def write_ui_message(role: str, content: str):
 # SUBMIT HANDLER
 # -------------------------------------------------
 def handle_submit(message: str):
+    stream = stream_response(message)
+    # Only wait behind the spinner until the first chunk arrives
     with st.spinner("Thinking..."):
-        response = generate_response(message)
+        response = next(stream, "")
+
+    renderer = BubbleRenderer(st.empty(), max_fps=float(st.secrets.get("RENDER_MAX_FPS", 15)))
+    renderer.feed(response)
+    response = renderer.stream(stream)
 
-    typewriter(response)
     st.session_state.messages.append({"role": "assistant", "content": response})
 
 # -------------------------------------------------
@@ -189,4 +184,9 @@ st.markdown(
     </div>
     """,
     unsafe_allow_html=True,
-)
\ No newline at end of file
+)
+
+# -------------------------------------------------
+# BACKGROUND WARM-UP (once per process, after the first paint)
+# -------------------------------------------------
+registry.warm_up()
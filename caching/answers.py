@@ -0,0 +1,289 @@
+"""Persistent exact-match answer cache backed by SQLite.
+
+Answers survive Streamlit reruns and process restarts and are shared by
+every server process on the host. Keys combine a cache namespace (which
+chain produced the answer), the normalized question, the Groq model name
+and a prompt version, so changing the model or a prompt template never
+serves stale answers.
+
+SQLite runs in WAL mode with a busy timeout, so several processes can read
+concurrently while writes are serialized. Eviction is least-recently-used
+and bounded by entry count and total answer bytes. The most recently used
+entries are loaded into memory at startup, so hot answers never touch the
+disk.
+"""
+
+import asyncio
+from collections import OrderedDict
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Awaitable, Callable, Optional
+
+import streamlit as st
+
+from caching.keys import normalize_question
+from resources import resource
+
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between last-access updates for the same key
+_TOUCH_INTERVAL = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    key TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    question TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS answers_last_access ON answers (last_access);
+"""
+
+
+class AnswerCache:
+    """SQLite key/value cache of answers with an in-memory hot tier."""
+
+    def __init__(
+        self,
+        path: str,
+        model: str = "",
+        max_entries: int = 10000,
+        max_bytes: int = 64 * 1024 * 1024,
+        warm_entries: int = 500,
+    ):
+        self.path = path
+        self.model = model
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.warm_entries = warm_entries
+
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._touched = {}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connect().executescript(_SCHEMA)
+        self._warm_load()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+        return conn
+
+    def _warm_load(self) -> None:
+        rows = self._connect().execute(
+            "SELECT key, answer FROM answers ORDER BY last_access DESC LIMIT ?",
+            (self.warm_entries,),
+        ).fetchall()
+        with self._lock:
+            # Oldest first so the most recent end up at the MRU end
+            for key, answer in reversed(rows):
+                self._memory[key] = answer
+        logger.info("Answer cache warm-loaded %d entries from %s", len(rows), self.path)
+
+    def key(self, namespace: str, question: str, version: str = "") -> str:
+        raw = "\x1f".join((namespace, normalize_question(question), self.model, version))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, answer: str) -> None:
+        with self._lock:
+            self._memory[key] = answer
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.warm_entries:
+                self._memory.popitem(last=False)
+
+    def _touch(self, key: str, now: float) -> None:
+        if now - self._touched.get(key, 0.0) < _TOUCH_INTERVAL:
+            return
+        if len(self._touched) > self.max_entries:
+            self._touched.clear()
+        self._touched[key] = now
+        try:
+            self._connect().execute("UPDATE answers SET last_access = ? WHERE key = ?", (now, key))
+        except sqlite3.OperationalError as e:
+            # A busy database only costs us LRU precision
+            logger.debug("Could not update answer cache access time: %s", e)
+
+    def get(self, namespace: str, question: str, version: str = "") -> Optional[str]:
+        key = self.key(namespace, question, version)
+        now = time.time()
+
+        with self._lock:
+            answer = self._memory.get(key)
+            if answer is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                self.memory_hits += 1
+        if answer is not None:
+            self._touch(key, now)
+            return answer
+
+        row = self._connect().execute("SELECT answer FROM answers WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        self._remember(key, row[0])
+        self._touch(key, now)
+        return row[0]
+
+    def put(self, namespace: str, question: str, answer: str, version: str = "") -> None:
+        if not answer:
+            return
+        key = self.key(namespace, question, version)
+        now = time.time()
+        size = len(answer.encode("utf-8"))
+
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT OR REPLACE INTO answers (key, namespace, question, answer, size, created, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, namespace, normalize_question(question), answer, size, now, now),
+            )
+            self._evict(conn)
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            logger.warning("Could not write to answer cache: %s", e)
+            return
+
+        self._touched[key] = now
+        self._remember(key, answer)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Delete least-recently-used rows until both bounds hold (inside a write transaction)."""
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM answers").fetchone()
+        while count > self.max_entries or total > self.max_bytes:
+            excess = max(count - self.max_entries, 1)
+            rows = conn.execute(
+                "SELECT key, size FROM answers ORDER BY last_access LIMIT ?", (excess,)
+            ).fetchall()
+            if not rows:
+                break
+            conn.executemany("DELETE FROM answers WHERE key = ?", [(k,) for k, _ in rows])
+            with self._lock:
+                for k, _ in rows:
+                    self._memory.pop(k, None)
+            count -= len(rows)
+            total -= sum(size for _, size in rows)
+
+    def cached(self, namespace: str, func: Callable[[str], str], version: str = "") -> Callable[[str], str]:
+        """Wrap `func(question) -> answer` so answers are served from and stored in the cache."""
+
+        def wrapper(question: str) -> str:
+            try:
+                answer = self.get(namespace, question, version)
+            except sqlite3.Error as e:
+                logger.warning("Answer cache lookup failed: %s", e)
+                answer = None
+            if answer is not None:
+                return answer
+            answer = func(question)
+            try:
+                self.put(namespace, question, answer, version)
+            except sqlite3.Error as e:
+                logger.warning("Answer cache write failed: %s", e)
+            return answer
+
+        return wrapper
+
+    def acached(
+        self, namespace: str, func: Callable[[str], Awaitable[str]], version: str = ""
+    ) -> Callable[[str], Awaitable[str]]:
+        """Async `cached`: SQLite access runs in a worker thread, off the event loop."""
+
+        async def wrapper(question: str) -> str:
+            try:
+                answer = await asyncio.to_thread(self.get, namespace, question, version)
+            except sqlite3.Error as e:
+                logger.warning("Answer cache lookup failed: %s", e)
+                answer = None
+            if answer is not None:
+                return answer
+            answer = await func(question)
+            try:
+                await asyncio.to_thread(self.put, namespace, question, answer, version)
+            except sqlite3.Error as e:
+                logger.warning("Answer cache write failed: %s", e)
+            return answer
+
+        return wrapper
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+            }
+
+
+# Shared by every chain in this process; the database is opened on first use
+@resource("answer_cache")
+def get_answer_cache():
+    try:
+        return AnswerCache(
+            path=st.secrets.get("ANSWER_CACHE_PATH", ".cache/answers.sqlite3"),
+            model=st.secrets.get("GROQ_MODEL", ""),
+            max_entries=int(st.secrets.get("ANSWER_CACHE_MAX_ENTRIES", 10000)),
+            max_bytes=int(st.secrets.get("ANSWER_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+            warm_entries=int(st.secrets.get("ANSWER_CACHE_WARM_ENTRIES", 500)),
+        )
+    except Exception as e:
+        logger.info("Persistent answer cache disabled: %s", e)
+        return None
+
+
+def cached(namespace: str, func: Callable[[str], str], version: str = "") -> Callable[[str], str]:
+    """`AnswerCache.cached` on the shared cache; `func` runs uncached while there is none."""
+
+    def wrapper(question: str) -> str:
+        answer_cache = get_answer_cache()
+        if answer_cache is None:
+            return func(question)
+        return answer_cache.cached(namespace, func, version)(question)
+
+    return wrapper
+
+
+def acached(
+    namespace: str, func: Callable[[str], Awaitable[str]], version: str = ""
+) -> Callable[[str], Awaitable[str]]:
+    """`AnswerCache.acached` on the shared cache, which is opened off the event loop."""
+
+    async def wrapper(question: str) -> str:
+        answer_cache = await asyncio.to_thread(get_answer_cache)
+        if answer_cache is None:
+            return await func(question)
+        return await answer_cache.acached(namespace, func, version)(question)
+
+    return wrapper
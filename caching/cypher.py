@@ -0,0 +1,109 @@
+"""Memoized question → Cypher generation for GraphCypherQAChain.
+
+Writing Cypher is the slowest step of a graph answer, and the same
+questions get translated over and over. `CypherCache.wrap(chain)` replaces
+the chain's `cypher_generation_chain` with a caching runnable. Keys combine
+the normalized question, a hash of the schema text the chain passes to the
+prompt, and a hash of the generation template, so any schema or prompt
+change misses the cache automatically and regenerates.
+"""
+
+from collections import OrderedDict
+import hashlib
+import logging
+import threading
+import time
+from typing import Optional
+
+from langchain_core.runnables import RunnableLambda
+
+from caching.keys import normalize_question
+
+logger = logging.getLogger(__name__)
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class CypherCache:
+    """Thread-safe LRU cache of generated Cypher, with hit-rate and time-saved stats."""
+
+    def __init__(self, max_entries: int = 2000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.llm_seconds = 0.0
+        self.llm_seconds_saved = 0.0
+        # key -> (generated cypher, seconds it took to generate)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, question: str, schema: str, template: str) -> str:
+        return _digest("\x1f".join((normalize_question(question), _digest(schema), _digest(template))))
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.llm_seconds_saved += entry[1]
+            return entry[0]
+
+    def put(self, key: str, cypher: str, seconds: float) -> None:
+        with self._lock:
+            self._entries[key] = (cypher, seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def wrap(self, chain, template: str):
+        """Route `chain`'s Cypher generation through this cache and return the chain.
+
+        `template` is the Cypher generation prompt text; it is part of the key.
+        If the chain does not expose a runnable `cypher_generation_chain`
+        (older langchain versions), it is returned unchanged.
+        """
+        generation = getattr(chain, "cypher_generation_chain", None)
+        if generation is None or not hasattr(generation, "invoke"):
+            logger.info("Chain has no runnable cypher_generation_chain; Cypher caching disabled")
+            return chain
+
+        # GraphCypherQAChain calls `invoke(args, callbacks=...)`; RunnableLambda passes such kwargs on
+        def generate(inputs: dict, config=None, **kwargs) -> str:
+            key = self.key(inputs.get("question", ""), str(inputs.get("schema", "")), template)
+            cypher = self.get(key)
+            if cypher is not None:
+                return cypher
+            start = time.perf_counter()
+            cypher = generation.invoke(inputs, config, **kwargs)
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.llm_seconds += elapsed
+            self.put(key, cypher, elapsed)
+            return cypher
+
+        try:
+            chain.cypher_generation_chain = RunnableLambda(generate)
+        except Exception as e:
+            logger.info("Could not wrap cypher_generation_chain; Cypher caching disabled: %s", e)
+        return chain
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "llm_seconds": self.llm_seconds,
+                "llm_seconds_saved": self.llm_seconds_saved,
+            }
+
+
+# Shared by every GraphCypherQAChain in this process
+cypher_cache = CypherCache()
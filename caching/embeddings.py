@@ -0,0 +1,179 @@
+"""Caching wrapper for LangChain embeddings.
+
+Every retrieval re-encodes the user's question on CPU, and the same short
+questions recur constantly. `CachedEmbeddings` wraps any `Embeddings`
+object and can be passed wherever the original is (Neo4jVector, the plot
+index retriever, the semantic response cache):
+
+- keys are the text with whitespace normalized,
+- an in-memory LRU bounded by the bytes of the stored vectors,
+- an optional SQLite tier shared across processes and restarts,
+- `embed_documents` only computes the texts that missed, in one batch.
+"""
+
+from collections import OrderedDict
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+# Rough per-entry bookkeeping cost on top of the key and the vector
+_ENTRY_OVERHEAD = 120
+
+
+def normalize_text(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class CachedEmbeddings(Embeddings):
+    """LRU (+ optional on-disk) cache in front of another `Embeddings`."""
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        namespace: str = "",
+        max_bytes: int = 16 * 1024 * 1024,
+        disk_path: Optional[str] = None,
+    ):
+        self.embeddings = embeddings
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.disk_path = disk_path
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        if disk_path:
+            directory = os.path.dirname(disk_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._connect().execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.disk_path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+        return conn
+
+    def _key(self, text: str, kind: str) -> str:
+        # Queries and documents are kept apart: some models embed them differently
+        raw = f"{self.namespace}\x1f{kind}\x1f{normalize_text(text)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        size = vector.nbytes + len(key) + _ENTRY_OVERHEAD
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+            self._entries[key] = vector
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                old_key, old = self._entries.popitem(last=False)
+                self._bytes -= old.nbytes + len(old_key) + _ENTRY_OVERHEAD
+
+    def _lookup(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        found: List[Optional[np.ndarray]] = [None] * len(keys)
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._entries.get(key)
+                if vector is not None:
+                    self._entries.move_to_end(key)
+                    found[i] = vector
+                    self.hits += 1
+
+        missing = [i for i, v in enumerate(found) if v is None]
+        if missing and self.disk_path:
+            rows = []
+            try:
+                # Stay under SQLite's bound-parameter limit
+                for start in range(0, len(missing), 500):
+                    chunk = [keys[i] for i in missing[start:start + 500]]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows += self._connect().execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                    ).fetchall()
+            except sqlite3.Error as e:
+                logger.warning("Embedding disk cache lookup failed: %s", e)
+                rows = []
+            on_disk = {key: np.frombuffer(blob, dtype=np.float32) for key, blob in rows}
+            for i in missing:
+                vector = on_disk.get(keys[i])
+                if vector is not None:
+                    found[i] = vector
+                    self._remember(keys[i], vector)
+                    with self._lock:
+                        self.hits += 1
+                        self.disk_hits += 1
+        return found
+
+    def _store(self, keys: List[str], vectors: List[np.ndarray]) -> None:
+        for key, vector in zip(keys, vectors):
+            self._remember(key, vector)
+        if self.disk_path:
+            try:
+                self._connect().executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(key, vector.tobytes()) for key, vector in zip(keys, vectors)],
+                )
+            except sqlite3.Error as e:
+                logger.warning("Embedding disk cache write failed: %s", e)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(t, "document") for t in texts]
+        found = self._lookup(keys)
+
+        # Compute each distinct missing text once, in a single batch
+        missing = {}
+        for i, vector in enumerate(found):
+            if vector is None:
+                missing.setdefault(keys[i], texts[i])
+        if missing:
+            with self._lock:
+                self.misses += len(missing)
+            computed = self.embeddings.embed_documents(list(missing.values()))
+            vectors = [np.asarray(v, dtype=np.float32) for v in computed]
+            self._store(list(missing.keys()), vectors)
+            by_key = dict(zip(missing.keys(), vectors))
+            found = [v if v is not None else by_key[k] for k, v in zip(keys, found)]
+        return [v.tolist() for v in found]
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key(text, "query")
+        vector = self._lookup([key])[0]
+        if vector is None:
+            with self._lock:
+                self.misses += 1
+            vector = np.asarray(self.embeddings.embed_query(text), dtype=np.float32)
+            self._store([key], [vector])
+        return vector.tolist()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
@@ -0,0 +1,19 @@
+"""Cache-key helpers shared by the caches and the modules that version them.
+
+Kept apart from `caching.answers` so that importing them (e.g. from
+`prompts`) never opens a cache.
+"""
+
+import hashlib
+import re
+
+
+def normalize_question(question: str) -> str:
+    """Lower-case `question`, collapse whitespace and drop trailing punctuation."""
+    text = re.sub(r"\s+", " ", question.strip().lower())
+    return text.rstrip(" ?!.")
+
+
+def prompt_version(template: str) -> str:
+    """Return a short, stable version tag for a prompt template's text."""
+    return hashlib.sha1(template.encode("utf-8")).hexdigest()[:12]
@@ -0,0 +1,203 @@
+"""TTL result cache for read-only Cypher queries.
+
+The movie recommendations dataset is effectively read-only for the
+chatbot, so repeated lookups (cast lists, genres, directors) can be
+answered from memory. `ResultCachingMixin` is mixed into `Neo4jGraph` in
+`graph.py`, so the cached graph is still a `Neo4jGraph` everywhere it is
+passed (chains, vector store, chat history).
+
+Queries are keyed by their canonical text (whitespace collapsed outside
+string literals, trailing semicolon dropped) plus their parameters.
+Anything that could write is never cached; that includes every CALLed
+procedure not on an explicit read-only allowlist.
+"""
+
+from collections import OrderedDict
+import copy
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|`[^`]*`")
+
+_WRITE_CLAUSES = re.compile(
+    r"\b(CREATE|MERGE|DELETE|DETACH|SET|REMOVE|DROP|FOREACH|LOAD\s+CSV|IN\s+TRANSACTIONS)\b"
+    r"|\bapoc\.(create|merge|refactor|periodic|do|cypher\.(run)?write|nodes\.delete|atomic|trigger|schema\.assert)",
+    re.IGNORECASE,
+)
+
+# Procedures that only read; any other CALLed procedure may write (db.create.*,
+# db.index.fulltext.createNodeIndex, gds.*.write/.mutate, dbms.*, ...)
+_READ_ONLY_PROCEDURES = frozenset(name.lower() for name in (
+    "db.labels",
+    "db.relationshipTypes",
+    "db.propertyKeys",
+    "db.index.vector.queryNodes",
+    "db.index.vector.queryRelationships",
+    "db.index.fulltext.queryNodes",
+    "db.index.fulltext.queryRelationships",
+    "db.schema.visualization",
+    "db.schema.nodeTypeProperties",
+    "db.schema.relTypeProperties",
+    "apoc.meta.data",
+    "apoc.meta.schema",
+))
+
+# The procedure name after CALL; subqueries (`CALL {`, `CALL (x) {`) are checked clause by clause
+_PROCEDURE_CALL = re.compile(r"\bCALL\b(?!\s*[{(])\s*([\w.]*)", re.IGNORECASE)
+
+_MISSING = object()
+
+# Set while a graph refreshes its schema, so introspection always hits the database
+_bypass = threading.local()
+
+
+def _code_parts(query: str):
+    """Split `query` into alternating (code, literal) parts."""
+    parts = []
+    pos = 0
+    for match in _LITERAL.finditer(query):
+        parts.append((query[pos:match.start()], False))
+        parts.append((match.group(0), True))
+        pos = match.end()
+    parts.append((query[pos:], False))
+    return parts
+
+
+def canonicalize(query: str) -> str:
+    """Collapse whitespace outside string literals and drop a trailing semicolon."""
+    out = []
+    for text, literal in _code_parts(query):
+        out.append(text if literal else re.sub(r"\s+", " ", text))
+    return "".join(out).strip().rstrip(";").strip()
+
+
+def is_read_only(query: str) -> bool:
+    """Return True if `query` contains no clause that could write and calls only allowlisted procedures."""
+    code = " ".join(text for text, literal in _code_parts(query) if not literal)
+    if _WRITE_CLAUSES.search(code):
+        return False
+    return all(name.lower() in _READ_ONLY_PROCEDURES for name in _PROCEDURE_CALL.findall(code))
+
+
+class ResultCache:
+    """Thread-safe LRU cache of query results bounded by total bytes, with per-entry TTL."""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl: float = 600.0):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.uncacheable = 0
+        self.evictions = 0
+        # key -> (result, expires_at, size)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(query: str, params: Optional[dict]) -> str:
+        raw = canonicalize(query) + "\x1f" + json.dumps(params or {}, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Any:
+        """Return the cached result for `key`, or `_MISSING`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] < time.monotonic():
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, result: Any, ttl: Optional[float] = None) -> None:
+        try:
+            size = len(json.dumps(result, default=str).encode("utf-8"))
+        except (TypeError, ValueError):
+            return
+        if size > self.max_bytes:
+            return
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (result, expires, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _drop(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "uncacheable": self.uncacheable,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+
+class ResultCachingMixin:
+    """Mixin for `Neo4jGraph` that serves read-only `query()` calls from `result_cache`."""
+
+    result_cache: Optional[ResultCache] = None
+
+    def query(self, query: str, params: Optional[dict] = None, *args, **kwargs):
+        cache = self.result_cache
+        params = params or {}
+        if cache is None or getattr(_bypass, "active", False):
+            return super().query(query, params, *args, **kwargs)
+        if not is_read_only(query):
+            with cache._lock:
+                cache.uncacheable += 1
+            return super().query(query, params, *args, **kwargs)
+
+        key = cache.key(query, params)
+        result = cache.get(key)
+        if result is _MISSING:
+            result = super().query(query, params, *args, **kwargs)
+            cache.put(key, result)
+        # Callers may mutate the returned rows; never hand out the cached object
+        return copy.deepcopy(result)
+
+    def query_uncached(self, query: str, params: Optional[dict] = None, *args, **kwargs):
+        return super().query(query, params or {}, *args, **kwargs)
+
+    def refresh_schema(self, *args, **kwargs):
+        _bypass.active = True
+        try:
+            return super().refresh_schema(*args, **kwargs)
+        finally:
+            _bypass.active = False
+
+
+def with_result_cache(graph_class, cache: ResultCache):
+    """Return a subclass of `graph_class` whose instances cache reads in `cache`."""
+    return type(
+        f"Cached{graph_class.__name__}",
+        (ResultCachingMixin, graph_class),
+        {"result_cache": cache},
+    )
@@ -0,0 +1,136 @@
+"""Persisted Neo4j schema snapshot.
+
+`Neo4jGraph` normally introspects the database (APOC meta queries) when it
+is constructed, and every process repeats that work before the first page
+can render. Instead, `graph.py` builds the graph with `refresh_schema=False`
+and calls `SchemaSnapshot.attach()`, which:
+
+1. loads the schema saved by a previous run, if any, and
+2. starts a background thread that runs a cheap fingerprint query (label,
+   relationship type and property key names) and only re-introspects and
+   re-saves the schema when the fingerprint changed.
+
+Chains that copy the schema at construction time (GraphCypherQAChain keeps
+it in `graph_schema`) register with `on_refresh()` to pick up new versions.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_QUERY = """
+CALL db.labels() YIELD label
+WITH collect(label) AS labels
+CALL db.relationshipTypes() YIELD relationshipType
+WITH labels, collect(relationshipType) AS types
+CALL db.propertyKeys() YIELD propertyKey
+RETURN labels, types, collect(propertyKey) AS keys
+"""
+
+
+class SchemaSnapshot:
+    """Load, save and lazily refresh a graph's schema from a JSON file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.fingerprint: Optional[str] = None
+        self.loaded_at: Optional[float] = None
+        self.refreshed_at: Optional[float] = None
+        self._graph = None
+        self._listeners: List[Callable] = []
+        self._lock = threading.Lock()
+
+    def _apply(self, graph, schema: str, structured_schema: dict) -> None:
+        graph.schema = schema
+        graph.structured_schema = structured_schema
+
+    def load(self, graph) -> bool:
+        """Apply the saved schema to `graph`; return False if there is no usable snapshot."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            self._apply(graph, data["schema"], data["structured_schema"])
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Ignoring unreadable schema snapshot %s: %s", self.path, e)
+            return False
+        self.fingerprint = data.get("fingerprint")
+        self.loaded_at = time.time()
+        return True
+
+    def save(self, graph) -> None:
+        data = {
+            "fingerprint": self.fingerprint,
+            "saved_at": time.time(),
+            "schema": graph.schema,
+            "structured_schema": graph.structured_schema,
+        }
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Write then rename so concurrent readers never see a partial file
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, default=str)
+        os.replace(tmp, self.path)
+
+    @staticmethod
+    def compute_fingerprint(graph) -> str:
+        # Skip the result cache (see caching.results) so a change is seen immediately
+        query = getattr(graph, "query_uncached", graph.query)
+        rows = query(FINGERPRINT_QUERY)
+        row = rows[0] if rows else {}
+        parts = [sorted(row.get(k) or []) for k in ("labels", "types", "keys")]
+        return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+    def refresh_if_changed(self, graph, force: bool = False) -> bool:
+        """Re-introspect the schema if the database fingerprint changed.
+
+        Returns True when the schema was refreshed.
+        """
+        fingerprint = self.compute_fingerprint(graph)
+        if not force and fingerprint == self.fingerprint:
+            return False
+
+        start = time.perf_counter()
+        graph.refresh_schema()
+        logger.info("Refreshed Neo4j schema in %.2fs", time.perf_counter() - start)
+        with self._lock:
+            self.fingerprint = fingerprint
+            self.refreshed_at = time.time()
+            listeners = list(self._listeners)
+        try:
+            self.save(graph)
+        except OSError as e:
+            logger.warning("Could not save schema snapshot %s: %s", self.path, e)
+        for callback in listeners:
+            callback(graph)
+        return True
+
+    def attach(self, graph) -> None:
+        """Load the snapshot into `graph` and refresh it in a background thread."""
+        self._graph = graph
+        if self.load(graph):
+            logger.info("Loaded Neo4j schema snapshot from %s", self.path)
+
+        def refresh():
+            try:
+                self.refresh_if_changed(graph)
+            except Exception as e:
+                logger.warning("Background schema refresh failed: %s", e)
+
+        threading.Thread(target=refresh, name="schema-refresh", daemon=True).start()
+
+    def on_refresh(self, callback: Callable) -> None:
+        """Call `callback(graph)` now and after every schema refresh."""
+        with self._lock:
+            self._listeners.append(callback)
+        if self._graph is not None:
+            callback(self._graph)
@@ -0,0 +1,237 @@
+"""Semantic response cache keyed by question embeddings.
+
+Near-identical questions ("who directed the matrix", "director of The
+Matrix?") embed to nearby vectors, so the answer to one can be served for
+the other without running the agent again. Cached questions are kept as a
+normalized float32 matrix and looked up with a single matrix-vector
+product; entries are evicted by TTL, LRU order, an entry count and a byte
+budget.
+
+The cache is shared by every session in the process, but an answer also
+depends on the conversation it was given in: "tell me more" means
+something different after every turn. Entries are therefore keyed by a
+`context` (the session's last exchange, or "" on a session's first
+question) and only served to a question asked in the same context.
+Questions that obviously refer back to the conversation ("what else did
+he direct?") skip the cache altogether; see `is_session_dependent`.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import hashlib
+import logging
+import re
+import threading
+import time
+from typing import Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_PRONOUNS = r"it|its|he|him|his|she|her|hers|they|them|their|theirs"
+_DEMONSTRATIVES = r"this|that|these|those"
+
+# Phrasings that only make sense relative to earlier turns. Demonstratives
+# count only when they stand alone, lead the question, or point at an
+# unqualified noun ("who directed that movie?"); "that movie with Keanu" is
+# self-contained.
+_SESSION_PATTERNS = re.compile(
+    r"|".join([
+        rf"\b(?:{_PRONOUNS})\b",
+        rf"^\W*(?:(?:and|but|so|ok|okay)\W+)?(?:{_DEMONSTRATIVES})\b",
+        rf"\b(?:{_DEMONSTRATIVES})\s*(?:[?.!,;]|$)",
+        rf"\b(?:{_DEMONSTRATIVES})\s+(?:one|ones)\b",
+        rf"\b(?:{_DEMONSTRATIVES})\s+(?:movie|movies|film|films|actor|actress|director|guy|character)\b"
+        r"(?!\s+(?:with|where|about|in|from|starring|featuring|directed|called|named|titled|that|who|which|set|released|by|of)\b)",
+        r"\b(?:the same|the other one|another one|else|again|more like (?:this|that)"
+        r"|you (?:said|say|mentioned|suggested|recommended)|(?:i|we) (?:asked|said|mentioned)"
+        r"|(?:the|your|my) (?:previous|last|first) (?:answer|one|question|suggestion|recommendation|movie|film)"
+        r"|mentioned (?:earlier|before|above))\b",
+    ]),
+    re.IGNORECASE,
+)
+
+# Rough per-entry bookkeeping cost on top of the vector and the strings.
+_ENTRY_OVERHEAD = 200
+
+
+def is_session_dependent(question: str) -> bool:
+    """Return True if `question` appears to reference earlier conversation turns."""
+    return bool(_SESSION_PATTERNS.search(question))
+
+
+@dataclass
+class _Entry:
+    question: str
+    answer: str
+    vector: np.ndarray
+    created: float
+    size: int = field(default=0)
+    context: str = ""
+
+
+class SemanticCache:
+    """In-process LRU+TTL cache of answers, looked up by embedding similarity.
+
+    `embeddings` is any LangChain embeddings object (only `embed_query` is
+    used). A cached answer is returned when the cosine similarity between
+    the new question and a cached question is at least `threshold` and
+    both were asked in the same `context`.
+    """
+
+    def __init__(
+        self,
+        embeddings,
+        threshold: float = 0.92,
+        max_entries: int = 1000,
+        max_bytes: int = 32 * 1024 * 1024,
+        ttl: Optional[float] = 3600.0,
+        version: str = "",
+    ):
+        self.embeddings = embeddings
+        self.version = version
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.evictions = 0
+
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._next_id = 0
+        self._lock = threading.Lock()
+        # Stacked vectors for lookup, rebuilt lazily after inserts/evictions
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_ids: Sequence[int] = ()
+        self._matrix_contexts: Optional[np.ndarray] = None
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        v = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(v)
+        return v / norm if norm else v
+
+    def embed(self, question: str) -> np.ndarray:
+        """Return the normalized embedding of `question`."""
+        return self._normalize(self.embeddings.embed_query(question.strip()))
+
+    @staticmethod
+    def _context_key(context: str) -> str:
+        """Digest of the conversation a question was asked in; "" for none."""
+        return hashlib.sha1(context.encode("utf-8")).hexdigest() if context else ""
+
+    def _expired(self, entry: _Entry, now: float) -> bool:
+        return self.ttl is not None and now - entry.created > self.ttl
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        self._bytes -= entry.size
+        self._matrix = None
+
+    def _purge_expired(self, now: float) -> None:
+        expired = [i for i, e in self._entries.items() if self._expired(e, now)]
+        for entry_id in expired:
+            self._remove(entry_id)
+            self.evictions += 1
+
+    def _ensure_matrix(self) -> None:
+        if self._matrix is None and self._entries:
+            self._matrix_ids = list(self._entries.keys())
+            self._matrix = np.stack([self._entries[i].vector for i in self._matrix_ids])
+            self._matrix_contexts = np.array([self._entries[i].context for i in self._matrix_ids])
+
+    def bypass(self, question: str) -> bool:
+        """Return True, and count it, if `question` must not be looked up or cached.
+
+        Callers check this once per question before `get`/`put`.
+        """
+        if not is_session_dependent(question):
+            return False
+        with self._lock:
+            self.bypasses += 1
+        return True
+
+    def get(self, question: str, vector: Optional[np.ndarray] = None, context: str = "") -> Optional[str]:
+        """Return the cached answer for the closest question asked in `context`, or None."""
+        if vector is None:
+            vector = self.embed(question)
+        context = self._context_key(context)
+
+        with self._lock:
+            self._purge_expired(time.time())
+            self._ensure_matrix()
+            if self._matrix is None:
+                self.misses += 1
+                return None
+
+            scores = np.where(self._matrix_contexts == context, self._matrix @ vector, -np.inf)
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                self.misses += 1
+                return None
+
+            entry_id = self._matrix_ids[best]
+            self._entries.move_to_end(entry_id)
+            self.hits += 1
+            logger.debug("Semantic cache hit (%.3f): %r ~ %r", scores[best], question, self._entries[entry_id].question)
+            return self._entries[entry_id].answer
+
+    def put(self, question: str, answer: str, vector: Optional[np.ndarray] = None, context: str = "") -> None:
+        """Cache `answer` for `question` asked in `context`, unless the question is session-dependent."""
+        if not answer or is_session_dependent(question):
+            return
+        if vector is None:
+            vector = self.embed(question)
+
+        size = vector.nbytes + len(question.encode("utf-8")) + len(answer.encode("utf-8")) + _ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = _Entry(question, answer, vector, time.time(), size, self._context_key(context))
+            self._bytes += size
+            self._matrix = None
+
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def set_version(self, version: str) -> None:
+        """Tag answers with the version of the prompt producing them; a new version drops the old answers."""
+        with self._lock:
+            if version == self.version:
+                return
+            if self._entries:
+                logger.info("Prompt version %s -> %s; dropping %d cached answers", self.version, version, len(self._entries))
+            self.version = version
+            self._entries.clear()
+            self._bytes = 0
+            self._matrix = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._matrix = None
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypasses": self.bypasses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "version": self.version,
+                "bytes": self._bytes,
+            }
@@ -0,0 +1,175 @@
+"""One pooled Neo4j driver per process, shared by every Neo4j client.
+
+`Neo4jGraph`, `Neo4jVector` and `Neo4jChatMessageHistory` each open their
+own driver, and with it their own connection pool, TCP connections and TLS
+handshakes. `Neo4jConnectionManager` owns a single driver configured with
+the pool settings below and points every client at it (`adopt`), so a
+burst of sessions borrows from one pool instead of opening new ones:
+
+    max_pool_size            connections kept per server
+    acquisition_timeout      seconds a query may wait for a free connection
+    liveness_check_timeout   idle seconds after which a connection is
+                             pinged before reuse (dead ones are replaced)
+    connection_timeout       seconds to establish a new connection
+
+The clients get a proxy whose `close()` does nothing, so a client being
+closed or garbage-collected cannot close the shared pool; only
+`Neo4jConnectionManager.close()` does (registered with `atexit`).
+
+`stats()` reports pool metrics: connections open and in use, how many
+acquisitions had to wait for a free connection, and acquire latency. The
+neo4j driver exposes none of these publicly, so they are read from its
+pool object on a best-effort basis and are empty if its internals change.
+"""
+
+import atexit
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class _SharedDriver:
+    """Driver proxy handed to clients; everything but `close()` is delegated."""
+
+    def __init__(self, driver):
+        self._shared = driver
+
+    def close(self) -> None:
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._shared, name)
+
+
+class Neo4jConnectionManager:
+    """Create the process-wide Neo4j driver on first use and share it."""
+
+    def __init__(
+        self,
+        uri: str,
+        username: str,
+        password: str,
+        max_pool_size: int = 50,
+        acquisition_timeout: float = 30.0,
+        liveness_check_timeout: float = 30.0,
+        connection_timeout: float = 10.0,
+    ):
+        self.uri = uri
+        self.auth = (username, password)
+        self.max_pool_size = max_pool_size
+        self.acquisition_timeout = acquisition_timeout
+        self.liveness_check_timeout = liveness_check_timeout
+        self.connection_timeout = connection_timeout
+
+        self.acquisitions = 0
+        self.waits = 0
+        self.failures = 0
+        self.acquire_seconds = 0.0
+        self.max_acquire_seconds = 0.0
+
+        self._driver = None
+        self._proxy = None
+        self._lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+
+    @property
+    def driver(self):
+        """The shared driver (as a proxy), created and verified on first access."""
+        if self._proxy is None:
+            with self._lock:
+                if self._proxy is None:
+                    from neo4j import GraphDatabase
+
+                    driver = GraphDatabase.driver(
+                        self.uri,
+                        auth=self.auth,
+                        max_connection_pool_size=self.max_pool_size,
+                        connection_acquisition_timeout=self.acquisition_timeout,
+                        liveness_check_timeout=self.liveness_check_timeout,
+                        connection_timeout=self.connection_timeout,
+                    )
+                    driver.verify_connectivity()
+                    self._instrument(driver)
+                    atexit.register(self.close)
+                    self._driver = driver
+                    self._proxy = _SharedDriver(driver)
+        return self._proxy
+
+    def stream(self, query: str, parameters=None, fetch_size: int = 1000):
+        """Yield the records of a read query as dicts, pulled `fetch_size` at a time.
+
+        For full scans: one cursor reads every row once, where keyset paging on
+        an unindexed key would re-scan and re-sort the label for every page.
+        """
+        with self.driver.session(default_access_mode="READ", fetch_size=fetch_size) as session:
+            for record in session.run(query, parameters or {}):
+                yield record.data()
+
+    def adopt(self, client):
+        """Point a LangChain Neo4j client at the shared driver, closing the one it opened."""
+        shared = self.driver
+        own = getattr(client, "_driver", None)
+        if own is not shared:
+            client._driver = shared
+            if own is not None:
+                try:
+                    own.close()
+                except Exception as e:
+                    logger.debug("Closing the replaced driver failed: %s", e)
+        return client
+
+    def _connections(self):
+        pool = getattr(self._driver, "_pool", None)
+        for connections in getattr(pool, "connections", {}).values():
+            yield from list(connections)
+
+    def _instrument(self, driver) -> None:
+        pool = getattr(driver, "_pool", None)
+        acquire = getattr(pool, "acquire", None)
+        if acquire is None:
+            logger.info("Neo4j pool metrics unavailable for this driver version")
+            return
+
+        def timed_acquire(*args, **kwargs):
+            # A wait is an acquisition that started with every pooled connection busy
+            busy = sum(1 for c in self._connections() if getattr(c, "in_use", False))
+            start = time.perf_counter()
+            try:
+                return acquire(*args, **kwargs)
+            except Exception:
+                with self._metrics_lock:
+                    self.failures += 1
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                with self._metrics_lock:
+                    self.acquisitions += 1
+                    self.waits += busy >= self.max_pool_size
+                    self.acquire_seconds += elapsed
+                    self.max_acquire_seconds = max(self.max_acquire_seconds, elapsed)
+
+        pool.acquire = timed_acquire
+
+    def stats(self) -> dict:
+        """Return pool size, usage and acquire-latency counters."""
+        connections = list(self._connections()) if self._driver is not None else []
+        with self._metrics_lock:
+            return {
+                "max_pool_size": self.max_pool_size,
+                "open": len(connections),
+                "in_use": sum(1 for c in connections if getattr(c, "in_use", False)),
+                "acquisitions": self.acquisitions,
+                "waits": self.waits,
+                "failures": self.failures,
+                "acquire_ms_mean": self.acquire_seconds * 1000 / self.acquisitions if self.acquisitions else 0.0,
+                "acquire_ms_max": self.max_acquire_seconds * 1000,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._driver is not None:
+                self._driver.close()
+                self._driver = None
+                self._proxy = None
@@ -2,6 +2,11 @@
 import streamlit as st
 import logging
 
+from caching.results import ResultCache, with_result_cache
+from caching.schema import SchemaSnapshot
+from connections import Neo4jConnectionManager
+from resources import resource
+
 logger = logging.getLogger(__name__)
 
 try:
@@ -25,20 +30,58 @@ def _looks_placeholder(value: str) -> bool:
         return True
     return False
 
+# Read-only query results are shared by every session in this process
+result_cache = ResultCache(
+    max_bytes=int(st.secrets.get("RESULT_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+    ttl=float(st.secrets.get("RESULT_CACHE_TTL", 600)),
+)
+
+# The schema is loaded from this snapshot and refreshed in the background
+schema_snapshot = SchemaSnapshot(st.secrets.get("SCHEMA_SNAPSHOT_PATH", ".cache/neo4j_schema.json"))
+
+# The one driver and connection pool every Neo4j client in this process uses
+neo4j_connections = Neo4jConnectionManager(
+    NEO4J_URI,
+    NEO4J_USERNAME,
+    NEO4J_PASSWORD,
+    max_pool_size=int(st.secrets.get("NEO4J_MAX_POOL_SIZE", 50)),
+    acquisition_timeout=float(st.secrets.get("NEO4J_ACQUISITION_TIMEOUT", 30)),
+    liveness_check_timeout=float(st.secrets.get("NEO4J_LIVENESS_CHECK_TIMEOUT", 30)),
+    connection_timeout=float(st.secrets.get("NEO4J_CONNECTION_TIMEOUT", 10)),
+)
+
+# Whether a graph can be built at all; checked without touching the network.
+NEO4J_CONFIGURED = False
 if _looks_placeholder(NEO4J_URI) or _looks_placeholder(NEO4J_USERNAME) or _looks_placeholder(NEO4J_PASSWORD):
     logger.info("Neo4j credentials appear to be placeholders or missing; Neo4j graph will be disabled.")
-    graph = None
+elif Neo4jGraph is None:
+    logger.info("langchain_community.graphs.Neo4jGraph not available; Neo4j graph will be disabled.")
 else:
-    if Neo4jGraph is None:
-        logger.info("langchain_community.graphs.Neo4jGraph not available; Neo4j graph will be disabled.")
-        graph = None
-    else:
-        try:
-            graph = Neo4jGraph(
-                url=NEO4J_URI,
-                username=NEO4J_USERNAME,
-                password=NEO4J_PASSWORD,
-            )
-        except Exception as e:
-            logger.warning("Could not initialize Neo4jGraph (will continue without graph): %s", e)
-            graph = None
\ No newline at end of file
+    NEO4J_CONFIGURED = True
+
+
+@resource("graph")
+def get_graph():
+    """Return the shared Neo4jGraph, or None if Neo4j is disabled or unreachable."""
+    if not NEO4J_CONFIGURED:
+        return None
+    try:
+        graph = with_result_cache(Neo4jGraph, result_cache)(
+            url=NEO4J_URI,
+            username=NEO4J_USERNAME,
+            password=NEO4J_PASSWORD,
+            refresh_schema=False,
+        )
+        neo4j_connections.adopt(graph)
+        schema_snapshot.attach(graph)
+        return graph
+    except Exception as e:
+        logger.warning("Could not initialize Neo4jGraph (will continue without graph): %s", e)
+        return None
+
+
+def __getattr__(name):
+    # `from graph import graph` still works, but connects on the spot
+    if name == "graph":
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
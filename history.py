@@ -0,0 +1,540 @@
+"""Windowed chat history with a rolling summary, stored in Neo4j.
+
+`RunnableWithMessageHistory` reads the session's history on every turn and
+pastes it into the agent prompt, so long sessions get slower and more
+expensive with each message. `WindowedChatHistory` keeps what the prompt
+sees bounded:
+
+- only the last `window` messages are read, with one query that walks back
+  from the session's `LAST_MESSAGE` (the `Session.id` index finds the
+  session, the walk touches at most `window` messages),
+- messages that fall out of the window are folded into a rolling summary
+  by the LLM in a background thread, stored on the Session node and
+  returned as a leading system message,
+- the oldest windowed messages are dropped until summary + messages fit
+  `max_tokens`.
+
+New messages are not written on the request path: they go to a
+`WriteBehindBuffer`, are visible to reads straight away, and a background
+thread appends them to Neo4j in batched transactions, retrying with backoff
+while Neo4j is unreachable. If the window cannot be read either, the last
+window read for the session is served with the buffered messages. The graph layout (Session, Message,
+LAST_MESSAGE, NEXT) is the one `Neo4jChatMessageHistory` uses.
+"""
+
+import atexit
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import BaseMessage, SystemMessage, get_buffer_string, messages_from_dict
+
+from tokens import count_tokens
+
+try:
+    from neo4j.exceptions import ClientError
+except Exception:
+    ClientError = None
+
+logger = logging.getLogger(__name__)
+
+SESSION_INDEX = "CREATE INDEX session_id IF NOT EXISTS FOR (s:Session) ON (s.id)"
+
+# Newest message first; the window size is an int formatted into the pattern
+WINDOW_QUERY = """
+MATCH (s:Session {{id: $session_id}})-[:LAST_MESSAGE]->(last)
+MATCH p = (last)<-[:NEXT*0..{depth}]-()
+WITH s, p ORDER BY length(p) DESC LIMIT 1
+RETURN s.summary AS summary, s.flushedSeq AS flushed_seq,
+       s.messageCount AS total, coalesce(s.summarizedCount, 0) AS summarized,
+       [m IN nodes(p) | {{type: m.type, content: m.content}}] AS messages
+"""
+
+# Appends each session's buffered messages to its chain, in order, in one transaction
+FLUSH_QUERY = """
+UNWIND $batches AS batch
+MERGE (s:Session {id: batch.session_id})
+WITH s, batch
+OPTIONAL MATCH (s)-[lm:LAST_MESSAGE]->(previous)
+// Sessions written before messageCount existed are counted once, by walking their chain
+WITH s, batch, lm, previous,
+     CASE WHEN s.messageCount IS NOT NULL THEN s.messageCount
+          WHEN previous IS NULL THEN 0
+          ELSE size([(previous)<-[:NEXT*0..]-(m) | m]) END AS existing
+CALL {
+    WITH batch
+    UNWIND range(0, size(batch.messages) - 1) AS i
+    CREATE (m:Message {type: batch.messages[i].type, content: batch.messages[i].content})
+    RETURN collect(m) AS created
+}
+FOREACH (i IN range(0, size(created) - 2) |
+    FOREACH (a IN [created[i]] | FOREACH (b IN [created[i + 1]] | CREATE (a)-[:NEXT]->(b))))
+FOREACH (p IN CASE WHEN previous IS NULL THEN [] ELSE [previous] END |
+    FOREACH (first IN [head(created)] | CREATE (p)-[:NEXT]->(first)))
+DELETE lm
+WITH s, batch, existing, created[size(created) - 1] AS newest
+CREATE (s)-[:LAST_MESSAGE]->(newest)
+SET s.flushedSeq = batch.seq,
+    s.messageCount = existing + size(batch.messages)
+RETURN batch.session_id AS session_id, s.messageCount AS total, coalesce(s.summarizedCount, 0) AS summarized
+"""
+
+# Only if no other summarizer got there first since the window was read
+SAVE_SUMMARY_QUERY = """
+MATCH (s:Session {id: $session_id})
+WHERE coalesce(s.summarizedCount, 0) = $previous
+SET s.summary = $summary, s.summarizedCount = $summarized
+"""
+
+CLEAR_SUMMARY_QUERY = """
+MATCH (s:Session {id: $session_id})
+REMOVE s.summary, s.summarizedCount, s.messageCount
+"""
+
+SUMMARY_PROMPT = """Progressively summarize the conversation between a user and a movie expert assistant.
+Extend the current summary with the new lines and return only the new summary.
+Keep the names of movies, people and the user's preferences; drop small talk.
+
+Current summary:
+{summary}
+
+New lines:
+{lines}
+
+New summary:"""
+
+# Most messages folded into the summary by one LLM call
+_MAX_SUMMARY_MESSAGES = 50
+
+# One summarizer thread per process; summaries are not on any request's path
+_summarizer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history-summary")
+_pending = set()
+_pending_lock = threading.Lock()
+_indexed = set()
+
+
+def _is_rejection(error: Exception) -> bool:
+    """Whether Neo4j refused the statement itself (bad payload), as opposed to being unreachable."""
+    return ClientError is not None and isinstance(error, ClientError)
+
+
+def _to_messages(rows: Sequence[dict]) -> List[BaseMessage]:
+    return messages_from_dict([{"type": row["type"], "data": {"content": row["content"]}} for row in rows])
+
+
+class WriteBehindBuffer:
+    """Per-session in-memory message buffers flushed to Neo4j by a background thread.
+
+    Every buffered message gets a per-session sequence number; a flush stores
+    the last one it wrote on the Session node (`flushedSeq`) in the same
+    transaction, so readers can tell exactly which buffered messages are
+    already in the graph. Buffers are flushed every `flush_interval`
+    seconds, sooner once `flush_size` messages are waiting, and at exit.
+
+    All sessions are written in one transaction. If that fails, each session
+    is retried in its own, so one bad payload cannot hold up the rest; a
+    session whose messages Neo4j rejects `max_attempts` times in a row is
+    dropped. At most `max_pending` messages are held (e.g. during an outage);
+    beyond that the oldest are dropped. A session's state is forgotten once
+    its buffer drains.
+    """
+
+    def __init__(
+        self,
+        driver,
+        flush_interval: float = 1.0,
+        flush_size: int = 200,
+        max_backoff: float = 30.0,
+        max_pending: int = 10000,
+        max_attempts: int = 3,
+    ):
+        self.driver = driver
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.max_backoff = max_backoff
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+
+        self.flushed = 0
+        self.flushes = 0
+        self.failures = 0
+        self.dropped = 0
+
+        self._pending: Dict[str, "deque[Tuple[int, dict]]"] = {}
+        self._waiting = 0
+        self._last_seq: Dict[str, int] = {}
+        self._listeners: Dict[str, Callable[[int, int], None]] = {}
+        self._rejections: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="history-flush", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _next_seq(self, session_id: str) -> int:
+        # Nanosecond clock, so sequence numbers keep growing across process restarts
+        seq = max(time.time_ns(), self._last_seq.get(session_id, 0) + 1)
+        self._last_seq[session_id] = seq
+        return seq
+
+    def _forget(self, session_id: str) -> None:
+        # Caller holds self._lock; the listener keeps its whole WindowedChatHistory alive
+        buffer = self._pending.pop(session_id, None)
+        self._waiting -= len(buffer) if buffer else 0
+        self._last_seq.pop(session_id, None)
+        self._listeners.pop(session_id, None)
+        self._rejections.pop(session_id, None)
+
+    def _drop_oldest(self) -> None:
+        # Caller holds self._lock
+        while self._waiting > self.max_pending:
+            session_id = min(self._pending, key=lambda sid: self._pending[sid][0][0])
+            buffer = self._pending[session_id]
+            buffer.popleft()
+            self._waiting -= 1
+            self.dropped += 1
+            if not buffer:
+                self._forget(session_id)
+
+    def append(
+        self,
+        session_id: str,
+        messages: Sequence[BaseMessage],
+        on_flushed: Optional[Callable[[int, int], None]] = None,
+    ) -> None:
+        """Buffer `messages`; `on_flushed(total, summarized)` runs after they reach Neo4j."""
+        if not messages:
+            return
+        with self._lock:
+            buffer = self._pending.setdefault(session_id, deque())
+            for message in messages:
+                content = message.content if isinstance(message.content, str) else str(message.content)
+                buffer.append((self._next_seq(session_id), {"type": message.type, "content": content}))
+            self._waiting += len(messages)
+            if on_flushed is not None:
+                self._listeners[session_id] = on_flushed
+            if self._waiting > self.max_pending:
+                dropped = self.dropped
+                self._drop_oldest()
+                logger.warning("History buffer full, dropped %d oldest unflushed messages", self.dropped - dropped)
+            waiting = self._waiting
+        if waiting >= self.flush_size:
+            self._wake.set()
+
+    def pending(self, session_id: str) -> List[Tuple[int, dict]]:
+        """Return the (sequence number, message) pairs buffered for `session_id`."""
+        with self._lock:
+            return list(self._pending.get(session_id, ()))
+
+    def discard(self, session_id: str) -> None:
+        with self._lock:
+            self._forget(session_id)
+
+    def _write(self, batches: List[dict]) -> list:
+        records, _, _ = self.driver.execute_query(FLUSH_QUERY, {"batches": batches})
+        return records
+
+    def _write_each(self, batches: List[dict], error: Exception) -> Tuple[list, List[dict]]:
+        """Retry `batches` one session per transaction; return (records, written batches)."""
+        logger.warning("Batched history flush failed, retrying %d sessions separately: %s", len(batches), error)
+        records, written, rejected = [], [], []
+        for batch in batches:
+            try:
+                records += self._write([batch])
+                written.append(batch)
+            except Exception as e:
+                if _is_rejection(e):
+                    rejected.append((batch["session_id"], e))
+                error = e
+        if not written and not rejected:
+            # Nothing got through: Neo4j is unreachable, back off
+            raise error
+
+        with self._lock:
+            for session_id, e in rejected:
+                self._rejections[session_id] = self._rejections.get(session_id, 0) + 1
+                if self._rejections[session_id] >= self.max_attempts:
+                    dropped = len(self._pending.get(session_id, ()))
+                    self.dropped += dropped
+                    self._forget(session_id)
+                    logger.error("Dropping %d chat messages of session %s that Neo4j rejects: %s", dropped, session_id, e)
+        return records, written
+
+    def flush(self) -> int:
+        """Write every buffered message to Neo4j; return how many were written."""
+        with self._flush_lock:
+            with self._lock:
+                batches = [
+                    {"session_id": session_id, "seq": buffer[-1][0], "messages": [row for _, row in buffer]}
+                    for session_id, buffer in self._pending.items()
+                    if buffer
+                ]
+            if not batches:
+                return 0
+
+            try:
+                records = self._write(batches)
+            except Exception as e:
+                if len(batches) == 1 and not _is_rejection(e):
+                    raise
+                records, batches = self._write_each(batches, e)
+
+            written = 0
+            with self._lock:
+                listeners = {batch["session_id"]: self._listeners.get(batch["session_id"]) for batch in batches}
+                for batch in batches:
+                    session_id = batch["session_id"]
+                    buffer = self._pending.get(session_id)
+                    self._rejections.pop(session_id, None)
+                    # Messages appended during the write stay for the next flush
+                    while buffer and buffer[0][0] <= batch["seq"]:
+                        buffer.popleft()
+                        self._waiting -= 1
+                    if buffer is not None and not buffer:
+                        self._forget(session_id)
+                    written += len(batch["messages"])
+                self.flushed += written
+                self.flushes += 1
+
+            for record in records:
+                listener = listeners.get(record["session_id"])
+                if listener is not None:
+                    try:
+                        listener(record["total"], record["summarized"])
+                    except Exception as e:
+                        logger.warning("History flush callback failed: %s", e)
+            return written
+
+    def _run(self) -> None:
+        backoff = 0.0
+        while not self._stopped.is_set():
+            self._wake.wait(backoff or self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+                backoff = 0.0
+            except Exception as e:
+                with self._lock:
+                    self.failures += 1
+                    waiting = self._waiting
+                backoff = min(self.max_backoff, max(self.flush_interval, backoff * 2))
+                logger.warning("History flush failed (%d messages waiting), retrying in %.1fs: %s", waiting, backoff, e)
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Stop the worker and flush what is left, retrying until `timeout`."""
+        self._stopped.set()
+        self._wake.set()
+        deadline = time.monotonic() + timeout
+        delay = 0.5
+        while True:
+            try:
+                self.flush()
+                return
+            except Exception as e:
+                if time.monotonic() + delay > deadline:
+                    logger.error("Dropping unflushed chat history at shutdown: %s", e)
+                    return
+                time.sleep(delay)
+                delay *= 2
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "waiting": self._waiting,
+                "sessions_waiting": len(self._pending),
+                "sessions_tracked": len(self._listeners),
+                "flushed": self.flushed,
+                "flushes": self.flushes,
+                "failures": self.failures,
+                "dropped": self.dropped,
+            }
+
+
+class WindowedChatHistory(BaseChatMessageHistory):
+    """Last-`window` view of a Neo4j chat history plus a rolling summary of the rest."""
+
+    def __init__(
+        self,
+        session_id: str,
+        history,
+        driver,
+        buffer: WriteBehindBuffer,
+        llm=None,
+        window: int = 10,
+        max_tokens: int = 1500,
+        summary_batch: int = 6,
+    ):
+        self.history = history
+        self.session_id = session_id
+        self.driver = driver
+        self.buffer = buffer
+        self.llm = llm
+        self.window = window
+        self.max_tokens = max_tokens
+        self.summary_batch = summary_batch
+        # Last window read from Neo4j, served while it is unreachable
+        self._last_read: Tuple[Optional[str], Optional[int], List[dict]] = (None, None, [])
+        if id(driver) not in _indexed:
+            try:
+                driver.execute_query(SESSION_INDEX)
+                _indexed.add(id(driver))
+            except Exception as e:
+                logger.warning("Could not create the Session index, retrying with the next session: %s", e)
+
+    def _read_record(self, depth: int):
+        records, _, _ = self.driver.execute_query(
+            WINDOW_QUERY.format(depth=max(0, int(depth))), {"session_id": self.session_id}
+        )
+        return records[0] if records else None
+
+    def _read(self, depth: int):
+        record = self._read_record(depth)
+        if record is None:
+            return None, None, []
+        # Stored newest first; return oldest first
+        return record["summary"], record["flushed_seq"], list(reversed(record["messages"]))
+
+    @property
+    def messages(self) -> List[BaseMessage]:
+        # Snapshot the buffer before reading: a flush that commits in between is then in the
+        # graph (and filtered out by flushedSeq) instead of in neither
+        buffered = self.buffer.pending(self.session_id)
+        try:
+            summary, flushed_seq, rows = self._last_read = self._read(self.window - 1)
+        except Exception as e:
+            logger.warning("Could not read history for session %s, using the last window read: %s", self.session_id, e)
+            summary, flushed_seq, rows = self._last_read
+        rows = list(rows)
+        # Messages still waiting in the write-behind buffer come after the stored ones
+        rows += [row for seq, row in buffered if flushed_seq is None or seq > flushed_seq]
+        rows = rows[-self.window:]
+        messages = _to_messages(rows)
+        prefix = [SystemMessage(content=f"Summary of the earlier conversation: {summary}")] if summary else []
+
+        budget = self.max_tokens - sum(count_tokens(m.content) for m in prefix)
+        tokens = [count_tokens(m.content) for m in messages]
+        while messages and sum(tokens) > budget:
+            messages.pop(0)
+            tokens.pop(0)
+        return prefix + messages
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        self.buffer.append(self.session_id, messages, self._on_flushed)
+
+    def _on_flushed(self, total: int, summarized: int) -> None:
+        if self.llm is not None and total - self.window - summarized >= self.summary_batch:
+            self._schedule_summary()
+
+    def _schedule_summary(self) -> None:
+        with _pending_lock:
+            if self.session_id in _pending:
+                return
+            _pending.add(self.session_id)
+        _summarizer.submit(self._summarize)
+
+    def _summarize(self) -> None:
+        try:
+            # The counts come from the same read as the messages, so later flushes can't shift
+            # the overflow; a long session seen for the first time only gets its most recent
+            # overflow summarized
+            record = self._read_record(self.window + _MAX_SUMMARY_MESSAGES - 1)
+            if record is None or record["total"] is None:
+                return
+            total, summarized = record["total"], record["summarized"]
+            rows = list(reversed(record["messages"]))
+            # Position of rows[0] in the session is total - len(rows)
+            start = max(0, summarized - (total - len(rows)))
+            overflow = _to_messages(rows[start: len(rows) - self.window])
+            if not overflow:
+                return
+            summary = record["summary"]
+            prompt = SUMMARY_PROMPT.format(summary=summary or "(none)", lines=get_buffer_string(overflow))
+            response = self.llm.invoke(prompt)
+            new_summary = response.content if hasattr(response, "content") else str(response)
+            self.driver.execute_query(
+                SAVE_SUMMARY_QUERY,
+                {
+                    "session_id": self.session_id,
+                    "summary": new_summary.strip(),
+                    "summarized": total - self.window,
+                    "previous": summarized,
+                },
+            )
+        except Exception as e:
+            logger.warning("Could not update the history summary for session %s: %s", self.session_id, e)
+        finally:
+            with _pending_lock:
+                _pending.discard(self.session_id)
+
+    def clear(self) -> None:
+        self.buffer.discard(self.session_id)
+        self.history.clear()
+        self.driver.execute_query(CLEAR_SUMMARY_QUERY, {"session_id": self.session_id})
+
+
+class PromptHistory:
+    """Token-bounded conversation prefix for the direct-LLM fallback.
+
+    Lives in Streamlit session_state. New turns are appended in O(1) with
+    their token count, the oldest turns are evicted once the running total
+    exceeds `max_tokens`, and the packed prompt prefix is cached until the
+    next change, so a request never rebuilds it from the message list.
+    """
+
+    def __init__(self, max_tokens: int = 1500):
+        self.max_tokens = max_tokens
+        self.tokens = 0
+        self.evicted = 0
+        self.synced = 0
+        self._lines: "deque[Tuple[str, int]]" = deque()
+        self._prefix: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def append(self, role: str, content: str) -> None:
+        speaker = "Assistant" if role == "assistant" else "User"
+        line = f"{speaker}: {content}"
+        tokens = count_tokens(line)
+        if tokens > self.max_tokens:
+            # A single oversized turn keeps its beginning rather than vanishing
+            line = line[: len(line) * self.max_tokens // tokens]
+            tokens = count_tokens(line)
+        self._lines.append((line, tokens))
+        self.tokens += tokens
+        while self.tokens > self.max_tokens and len(self._lines) > 1:
+            _, old = self._lines.popleft()
+            self.tokens -= old
+            self.evicted += 1
+        self._prefix = None
+
+    def sync(self, messages: Sequence[dict]) -> "PromptHistory":
+        """Append the `messages` (session_state format) not seen yet."""
+        if len(messages) < self.synced:
+            # The message list was reset; start over
+            self.__init__(self.max_tokens)
+        for message in messages[self.synced:]:
+            self.append(message.get("role", "user"), message.get("content", ""))
+        self.synced = len(messages)
+        return self
+
+    def last_turn(self) -> str:
+        """The latest exchange as packed lines, or "" for an empty history."""
+        return "\n".join(line for line, _ in list(self._lines)[-2:])
+
+    @property
+    def prefix(self) -> str:
+        """The packed "Conversation so far" block, or "" for an empty history."""
+        if self._prefix is None:
+            if not self._lines:
+                self._prefix = ""
+            else:
+                omitted = f"({self.evicted} earlier messages omitted)\n" if self.evicted else ""
+                self._prefix = "Conversation so far:\n" + omitted + "\n".join(line for line, _ in self._lines) + "\n\n"
+        return self._prefix
@@ -1,14 +1,43 @@
 import streamlit as st
-from langchain_groq import ChatGroq
-from langchain_community.embeddings import HuggingFaceEmbeddings
 
-llm = ChatGroq(
-    groq_api_key=st.secrets["GROQ_API_KEY"],
-    model_name=st.secrets["GROQ_MODEL"],
-    temperature=0.7
-)
+from resources import resource
+
+# Sentence-transformers model used for questions and for Movie.plotEmbedding
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+
+@resource("llm")
+def get_llm():
+    from langchain_groq import ChatGroq
+
+    return ChatGroq(
+        groq_api_key=st.secrets["GROQ_API_KEY"],
+        model_name=st.secrets["GROQ_MODEL"],
+        temperature=0.7
+    )
+
 
 # Using HuggingFace embeddings as a free alternative
-embeddings = HuggingFaceEmbeddings(
-    model_name="all-MiniLM-L6-v2"
-)
\ No newline at end of file
+@resource("embeddings")
+def get_embeddings():
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+    from caching.embeddings import CachedEmbeddings
+
+    # Repeated questions skip the CPU encode; set EMBEDDING_CACHE_PATH to also keep them on disk
+    return CachedEmbeddings(
+        HuggingFaceEmbeddings(
+            model_name=EMBEDDING_MODEL
+        ),
+        namespace=EMBEDDING_MODEL,
+        max_bytes=int(st.secrets.get("EMBEDDING_CACHE_MAX_BYTES", 16 * 1024 * 1024)),
+        disk_path=st.secrets.get("EMBEDDING_CACHE_PATH") or None,
+    )
+
+
+def __getattr__(name):
+    # `from llm import llm, embeddings` still works, but creates the object on the spot
+    if name == "llm":
+        return get_llm()
+    if name == "embeddings":
+        return get_embeddings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
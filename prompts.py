@@ -0,0 +1,131 @@
+"""Prompts shipped with the app.
+
+The ReAct chat prompt used to be fetched with `hub.pull("hwchase17/react-chat")`
+while the agent was built, which put a network round trip (and a failure
+path) on every cold start and broke in air-gapped environments. It is now
+vendored here and versioned. When `REACT_PROMPT_HUB_REFRESH` is enabled, a
+background thread compares the hub copy with the local one and stores a
+changed template under `.cache/` for the next agent build; nothing ever
+waits for it. `react_prompt_version` tags answers with the template that
+produced them, so a refreshed template never serves answers cached under
+the old one.
+"""
+
+import logging
+import os
+import threading
+
+import streamlit as st
+from langchain_core.prompts import PromptTemplate
+
+from caching.keys import prompt_version
+
+logger = logging.getLogger(__name__)
+
+REACT_CHAT_HUB_NAME = "hwchase17/react-chat"
+REACT_CHAT_VERSION = "react-chat-1"
+
+REACT_CHAT_TEMPLATE = """Assistant is a large language model trained by OpenAI.
+
+Assistant is designed to be able to assist with a wide range of tasks, from answering simple questions to providing in-depth explanations and discussions on a wide range of topics. As a language model, Assistant is able to generate human-like text based on the input it receives, allowing it to engage in natural-sounding conversations and provide responses that are coherent and relevant to the topic at hand.
+
+Assistant is constantly learning and improving, and its capabilities are constantly evolving. It is able to process and understand large amounts of text, and can use this knowledge to provide accurate and informative responses to a wide range of questions. Additionally, Assistant is able to generate its own text based on the input it receives, allowing it to engage in discussions and provide explanations and descriptions on a wide range of topics.
+
+Overall, Assistant is a powerful tool that can help with a wide range of tasks and provide valuable insights and information on a wide range of topics. Whether you need help with a specific question or just want to have a conversation about a particular topic, Assistant is here to assist.
+
+TOOLS:
+------
+
+Assistant has access to the following tools:
+
+{tools}
+
+To use a tool, please use the following format:
+
+```
+Thought: Do I need to use a tool? Yes
+Action: the action to take, should be one of [{tool_names}]
+Action Input: the input to the action
+Observation: the result of the action
+```
+
+When you have a response to say to the Human, or if you do not need to use a tool, you MUST use the format:
+
+```
+Thought: Do I need to use a tool? No
+Final Answer: [your response here]
+```
+
+Begin!
+
+Previous conversation history:
+{chat_history}
+
+New input: {input}
+{agent_scratchpad}"""
+
+REFRESHED_TEMPLATE_PATH = os.path.join(".cache", "react_chat_prompt.txt")
+_REQUIRED_VARIABLES = {"tools", "tool_names", "chat_history", "input", "agent_scratchpad"}
+
+
+def _load_refreshed_template():
+    """Return a template saved by an earlier hub refresh, or None."""
+    try:
+        with open(REFRESHED_TEMPLATE_PATH, encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def get_react_prompt() -> PromptTemplate:
+    """Return the ReAct chat prompt without touching the network."""
+    template = _load_refreshed_template()
+    if template is not None:
+        try:
+            prompt = PromptTemplate.from_template(template)
+            if _REQUIRED_VARIABLES <= set(prompt.input_variables):
+                return prompt
+        except Exception:
+            pass
+        logger.warning("Ignoring unusable refreshed prompt %s", REFRESHED_TEMPLATE_PATH)
+    return PromptTemplate.from_template(REACT_CHAT_TEMPLATE)
+
+
+def react_prompt_version(prompt: PromptTemplate) -> str:
+    """Return the version tag of a ReAct prompt; refreshed templates add their hash."""
+    if prompt.template == REACT_CHAT_TEMPLATE:
+        return REACT_CHAT_VERSION
+    return f"{REACT_CHAT_VERSION}+{prompt_version(prompt.template)}"
+
+
+_refresh_started = threading.Event()
+
+
+def refresh_react_prompt_in_background() -> None:
+    """If enabled, fetch the hub prompt in a daemon thread and save it if it changed.
+
+    Runs at most once per process, however often the agent is (re)built.
+    """
+    if not st.secrets.get("REACT_PROMPT_HUB_REFRESH", False) or _refresh_started.is_set():
+        return
+    _refresh_started.set()
+
+    def refresh():
+        try:
+            from langchain import hub
+
+            template = hub.pull(REACT_CHAT_HUB_NAME).template
+        except Exception as e:
+            logger.info("Hub refresh of %s skipped: %s", REACT_CHAT_HUB_NAME, e)
+            return
+        if template == (_load_refreshed_template() or REACT_CHAT_TEMPLATE):
+            return
+        try:
+            os.makedirs(os.path.dirname(REFRESHED_TEMPLATE_PATH), exist_ok=True)
+            with open(REFRESHED_TEMPLATE_PATH, "w", encoding="utf-8") as f:
+                f.write(template)
+            logger.info("Saved updated %s prompt; it is used from the next agent build", REACT_CHAT_HUB_NAME)
+        except OSError as e:
+            logger.warning("Could not save refreshed prompt: %s", e)
+
+    threading.Thread(target=refresh, name="react-prompt-refresh", daemon=True).start()
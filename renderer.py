@@ -0,0 +1,95 @@
+"""Frame-budgeted rendering of the assistant chat bubble.
+
+Every `container.markdown()` call re-sends the whole bubble to the browser,
+so rendering once per character (or per token) costs O(n²) in the answer
+length. `BubbleRenderer` buffers incoming text and redraws the bubble at
+most `max_fps` times per second, and only when the text actually changed.
+It is used for streamed answers (`feed`) as well as for replaying a
+finished answer (`replay`).
+"""
+
+import time
+from typing import Callable, Iterable, Optional
+
+
+class BubbleRenderer:
+    """Render text into a Streamlit placeholder under a frame budget.
+
+    `container` is anything with a `markdown(body, unsafe_allow_html=...)`
+    method, typically the result of `st.empty()`.
+    """
+
+    def __init__(
+        self,
+        container,
+        css_class: str = "chat-bubble-assistant",
+        max_fps: float = 15.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.container = container
+        self.css_class = css_class
+        self.frame_interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        self.clock = clock
+        self.text = ""
+        self.updates = 0
+        self.bytes_sent = 0
+        self._rendered: Optional[str] = None
+        self._last_frame = float("-inf")
+
+    def _html(self, text: str) -> str:
+        return f'<div class="{self.css_class}">{text}</div>'
+
+    def flush(self, force: bool = False) -> bool:
+        """Redraw the bubble if the text changed and the frame budget allows.
+
+        Returns True when the container was updated.
+        """
+        if self.text == self._rendered:
+            return False
+        now = self.clock()
+        if not force and now - self._last_frame < self.frame_interval:
+            return False
+        body = self._html(self.text)
+        self.container.markdown(body, unsafe_allow_html=True)
+        self._rendered = self.text
+        self._last_frame = now
+        self.updates += 1
+        self.bytes_sent += len(body.encode("utf-8"))
+        return True
+
+    def feed(self, chunk: str) -> None:
+        """Append a streamed chunk; the bubble is redrawn only when a frame is due."""
+        if not chunk:
+            return
+        self.text += chunk
+        self.flush()
+
+    def stream(self, chunks: Iterable[str]) -> str:
+        """Render every chunk of `chunks` and return the complete text."""
+        for chunk in chunks:
+            self.feed(chunk)
+        self.close()
+        return self.text
+
+    def replay(self, text: str, chars_per_sec: Optional[float] = None) -> str:
+        """Show an already complete `text`.
+
+        Without `chars_per_sec` the text is drawn in a single update. With it,
+        the text is revealed at that pace, one frame-sized chunk at a time.
+        """
+        if not chars_per_sec or self.frame_interval == 0:
+            self.text += text
+            self.close()
+            return self.text
+
+        step = max(1, int(chars_per_sec * self.frame_interval))
+        for start in range(0, len(text), step):
+            self.text += text[start:start + step]
+            self.flush(force=True)
+            time.sleep(self.frame_interval)
+        self.close()
+        return self.text
+
+    def close(self) -> None:
+        """Draw whatever is still buffered, regardless of the frame budget."""
+        self.flush(force=True)
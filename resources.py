@@ -0,0 +1,121 @@
+"""Lazy, process-wide registry for heavy shared objects.
+
+The LLM client, the sentence-transformers model, the Neo4j clients and the
+agent are expensive to create. Modules register a factory with `@resource`
+instead of building them at import time; the object is created the first
+time it is requested, exactly once per process, and shared by every
+Streamlit session. Each initialization is timed so start-up cost can be
+attributed per resource (see `timings()`).
+
+`warm_up()` creates resources in a background thread, so the first page
+paint does not wait on model loading or network handshakes.
+
+Factories return None when their dependency is unavailable (Neo4j down,
+feature disabled). None is cached for `NONE_RETRY_SECONDS` only, so a
+dependency that was down at start-up is picked up again without a restart.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Seconds before a factory that returned None is called again
+NONE_RETRY_SECONDS = 60.0
+
+
+class ResourceRegistry:
+    """Create named resources on first use, once per process."""
+
+    def __init__(self):
+        self._factories: Dict[str, Callable] = {}
+        self._values: Dict[str, object] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._timings: Dict[str, float] = {}
+        # name -> time.monotonic() of the creation that returned None
+        self._none_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._warm_thread: Optional[threading.Thread] = None
+
+    def register(self, name: str, factory: Callable) -> None:
+        with self._lock:
+            self._factories[name] = factory
+            self._locks.setdefault(name, threading.Lock())
+
+    def _needs_create(self, name: str) -> bool:
+        if name not in self._values:
+            return True
+        return self._values[name] is None and time.monotonic() - self._none_at[name] >= NONE_RETRY_SECONDS
+
+    def get(self, name: str):
+        """Return resource `name`, creating it if this is the first request.
+
+        A factory that raises is retried on the next request; one that
+        returned None is retried after `NONE_RETRY_SECONDS`.
+        """
+        if not self._needs_create(name):
+            return self._values[name]
+        with self._locks[name]:
+            if self._needs_create(name):
+                start = time.perf_counter()
+                value = self._factories[name]()
+                elapsed = time.perf_counter() - start
+                self._timings[name] = elapsed
+                if value is None:
+                    self._none_at[name] = time.monotonic()
+                    logger.info("Resource %r unavailable (%.2fs); retrying in %.0fs", name, elapsed, NONE_RETRY_SECONDS)
+                else:
+                    logger.info("Initialized resource %r in %.2fs", name, elapsed)
+                self._values[name] = value
+        return self._values[name]
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._values
+
+    def timings(self) -> Dict[str, float]:
+        """Return seconds spent initializing each resource created so far."""
+        return dict(self._timings)
+
+    def warm_up(self, names: Optional[Iterable[str]] = None) -> threading.Thread:
+        """Create `names` (default: all registered resources) in a background thread.
+
+        Only the first call per process starts a thread; later calls return it.
+        """
+        with self._lock:
+            if self._warm_thread is not None:
+                return self._warm_thread
+            names = list(names if names is not None else self._factories)
+
+            def run():
+                for name in names:
+                    try:
+                        self.get(name)
+                    except Exception as e:
+                        logger.warning("Warm-up of resource %r failed: %s", name, e)
+                report = ", ".join(f"{name} {secs:.2f}s" for name, secs in self.timings().items())
+                logger.info("Resource warm-up finished: %s", report or "nothing to load")
+
+            self._warm_thread = threading.Thread(target=run, name="resource-warm-up", daemon=True)
+            self._warm_thread.start()
+            return self._warm_thread
+
+
+registry = ResourceRegistry()
+
+
+def resource(name: str):
+    """Decorator: register the decorated factory and return a getter for it."""
+
+    def decorator(factory: Callable) -> Callable[[], object]:
+        registry.register(name, factory)
+
+        def getter():
+            return registry.get(name)
+
+        getter.__name__ = factory.__name__
+        getter.__doc__ = factory.__doc__
+        return getter
+
+    return decorator
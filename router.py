@@ -0,0 +1,173 @@
+"""Embedding-based question router in front of the ReAct agent.
+
+Every ReAct step is a full LLM call, and the first one usually only
+decides something obvious: a plot question goes to the vector index, a
+question about cast, crew or ratings goes to Cypher, anything else is
+small talk. `QuestionRouter` makes that decision with the local embeddings
+model instead: the question is compared with labeled exemplars and, when
+one route wins clearly, `agent.stream_response` calls that tool directly.
+Anything ambiguous, or that refers back to the conversation, still goes
+through the agent.
+
+`benchmarks/bench_router.py` measures routing accuracy on held-out
+questions; `QuestionRouter.stats()` tracks coverage and the latency saved
+in production.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ROUTE_EXEMPLARS: Dict[str, List[str]] = {
+    "movie_chat": [
+        "Hi there!",
+        "Hello, how are you?",
+        "Thanks, that was helpful",
+        "What can you do?",
+        "Who are you?",
+        "Can you recommend a good movie for tonight?",
+        "What makes a film a classic?",
+        "What is film noir?",
+        "Why do people love superhero movies?",
+        "Tell me something interesting about cinema",
+        "What is your favourite genre?",
+        "Goodbye",
+    ],
+    "kg_qa": [
+        "What is the plot of The Matrix?",
+        "What happens in Inception?",
+        "Find a movie about a heist that goes wrong",
+        "Movies about time travel",
+        "Which film is about a robot falling in love?",
+        "I'm looking for a movie where a shark attacks a beach town",
+        "Recommend a film about a con artist in the 1920s",
+        "What is Heat about?",
+        "Describe the story of Toy Story",
+        "A movie where a man is stranded on a deserted island",
+        "Films about friendship and coming of age",
+        "What is the storyline of Jurassic Park?",
+    ],
+    "cypher_qa": [
+        "Who directed The Matrix?",
+        "Who acted in Heat?",
+        "Which actors starred in Toy Story?",
+        "What movies has Tom Hanks acted in?",
+        "How many movies did Steven Spielberg direct?",
+        "What role did Keanu Reeves play in The Matrix?",
+        "What is the IMDb rating of Casino?",
+        "Which genres is Jumanji in?",
+        "What year was Goodfellas released?",
+        "Which movies did Al Pacino and Robert De Niro both act in?",
+        "How many users rated Forrest Gump?",
+        "List movies directed by Christopher Nolan",
+    ],
+}
+
+
+def _normalize(vectors) -> np.ndarray:
+    v = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(v, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return v / norms
+
+
+class QuestionRouter:
+    """Nearest-exemplar classifier over question embeddings.
+
+    A route's score is the mean cosine similarity of the question to that
+    route's `top` closest exemplars. The best route is returned only if its
+    score reaches `threshold` and beats the runner-up by `margin`.
+    """
+
+    def __init__(
+        self,
+        embeddings,
+        exemplars: Optional[Dict[str, List[str]]] = None,
+        threshold: float = 0.55,
+        margin: float = 0.05,
+        top: int = 3,
+    ):
+        self.embeddings = embeddings
+        self.exemplars = exemplars or ROUTE_EXEMPLARS
+        self.threshold = threshold
+        self.margin = margin
+        self.top = top
+
+        self.routed: Dict[str, int] = {label: 0 for label in self.exemplars}
+        self.fallbacks = 0
+        self.routing_seconds = 0.0
+        self._latency = {"direct": [0, 0.0], "agent": [0, 0.0]}
+        self._lock = threading.Lock()
+        self._labels: Optional[np.ndarray] = None
+        self._matrix: Optional[np.ndarray] = None
+
+    def _ensure_exemplars(self) -> None:
+        if self._matrix is None:
+            labels, texts = [], []
+            for label, questions in self.exemplars.items():
+                labels += [label] * len(questions)
+                texts += questions
+            self._matrix = _normalize(self.embeddings.embed_documents(texts))
+            self._labels = np.asarray(labels)
+
+    def scores(self, vector) -> Dict[str, float]:
+        """Return each route's score for a question embedding."""
+        self._ensure_exemplars()
+        similarities = self._matrix @ _normalize(vector)[0]
+        result = {}
+        for label in self.exemplars:
+            own = np.sort(similarities[self._labels == label])[::-1][:self.top]
+            result[label] = float(own.mean()) if len(own) else -1.0
+        return result
+
+    def classify(self, question: str, vector=None) -> Tuple[str, float, float]:
+        """Return (best route, its score, margin over the runner-up)."""
+        if vector is None:
+            vector = self.embeddings.embed_query(question)
+        ranked = sorted(self.scores(vector).items(), key=lambda item: item[1], reverse=True)
+        best, score = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else -1.0
+        return best, score, score - runner_up
+
+    def route(self, question: str, vector=None) -> Optional[str]:
+        """Return the route to dispatch `question` to, or None to use the agent."""
+        start = time.perf_counter()
+        label, score, margin = self.classify(question, vector)
+        confident = score >= self.threshold and margin >= self.margin
+        with self._lock:
+            self.routing_seconds += time.perf_counter() - start
+            if confident:
+                self.routed[label] += 1
+            else:
+                self.fallbacks += 1
+        logger.debug("Router: %r -> %s (%.3f, margin %.3f)%s", question, label, score, margin, "" if confident else ", using agent")
+        return label if confident else None
+
+    def record(self, path: str, seconds: float) -> None:
+        """Record the end-to-end latency of a "direct" or "agent" answer."""
+        with self._lock:
+            self._latency[path][0] += 1
+            self._latency[path][1] += seconds
+
+    def stats(self) -> dict:
+        """Return routing coverage and the estimated agent time saved."""
+        with self._lock:
+            routed = sum(self.routed.values())
+            total = routed + self.fallbacks
+            means = {path: (t / n if n else 0.0) for path, (n, t) in self._latency.items()}
+            # Only meaningful once both paths have been observed
+            saved_each = means["agent"] - means["direct"] if all(n for n, _ in self._latency.values()) else 0.0
+            return {
+                "routed": dict(self.routed),
+                "fallbacks": self.fallbacks,
+                "coverage": routed / total if total else 0.0,
+                "routing_ms_mean": self.routing_seconds * 1000 / total if total else 0.0,
+                "direct_seconds_mean": means["direct"],
+                "agent_seconds_mean": means["agent"],
+                "latency_saved_seconds": saved_each * self._latency["direct"][0],
+            }
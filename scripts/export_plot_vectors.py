@@ -0,0 +1,76 @@
+"""Export Movie plot embeddings from Neo4j into a local plot index.
+
+Run from the repository root with the Neo4j credentials in
+`.streamlit/secrets.toml`:
+
+    python scripts/export_plot_vectors.py [--out .cache/plot_index] [--page-size 5000]
+
+The output directory is what `PLOT_INDEX_PATH` should point at (see
+`tools/vector.py`). Metadata matches the `retrieval_query` used by the
+Neo4jVector retriever, so documents look the same to `kg_qa`.
+"""
+
+import argparse
+from itertools import islice
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from graph import get_graph, neo4j_connections  # noqa: E402
+from tools.plot_index import PlotIndex, normalize_rows  # noqa: E402
+from tools.vector import RETRIEVAL_METADATA  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+EXPORT_QUERY = f"""
+MATCH (node:Movie)
+WHERE node.plotEmbedding IS NOT NULL
+RETURN
+    node.plot AS text,
+    node.plotEmbedding AS embedding,
+    {RETRIEVAL_METADATA} AS metadata
+"""
+
+
+def export(connections, page_size: int):
+    """Stream every embedded Movie over one cursor; return (float32 matrix, documents)."""
+    rows = connections.stream(EXPORT_QUERY, fetch_size=page_size)
+    vectors, documents = [], []
+    while True:
+        page = list(islice(rows, page_size))
+        if not page:
+            break
+        for row in page:
+            vectors.append(np.asarray(row["embedding"], dtype=np.float32))
+            documents.append({"text": row["text"] or "", "metadata": row["metadata"]})
+        logger.info("Exported %d movies", len(documents))
+    if not vectors:
+        return np.empty((0, 0), dtype=np.float32), documents
+    return normalize_rows(np.stack(vectors)), documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", default=os.path.join(".cache", "plot_index"))
+    parser.add_argument("--page-size", type=int, default=5000)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    graph = get_graph()
+    if graph is None:
+        sys.exit("Neo4j is not configured or not reachable; check .streamlit/secrets.toml")
+
+    start = time.perf_counter()
+    vectors, documents = export(neo4j_connections, args.page_size)
+    PlotIndex(vectors, documents).save(args.out)
+    print(f"Wrote {len(documents)} vectors ({vectors.nbytes / 1e6:.1f} MB) to {args.out} "
+          f"in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Bulk, resumable (re-)embedding of Movie.plot into Movie.plotEmbedding.
+
+Run from the repository root with the Neo4j credentials in
+`.streamlit/secrets.toml`:
+
+    python scripts/ingest_plot_embeddings.py [--page-size 2000] [--batch-size 256] [--workers N]
+
+Movies are streamed over a single read cursor and handled in pages. Each
+page is embedded in batches across a process pool (one
+sentence-transformers model per worker) and written back in a single
+batched `UNWIND` transaction. Every movie also gets `plotEmbeddingHash`, a
+hash of the model name and plot text; movies whose hash already matches
+are skipped, so re-running after an interruption, or with an unchanged
+model, only embeds what is still missing or changed.
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+from itertools import islice
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from graph import get_graph, neo4j_connections  # noqa: E402
+from llm import EMBEDDING_MODEL  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+READ_QUERY = """
+MATCH (m:Movie)
+WHERE m.plot IS NOT NULL
+RETURN elementId(m) AS id, m.plot AS plot, m.plotEmbeddingHash AS hash
+"""
+
+WRITE_QUERY = """
+UNWIND $rows AS row
+MATCH (m:Movie) WHERE elementId(m) = row.id
+SET m.plotEmbedding = row.embedding, m.plotEmbeddingHash = row.hash
+"""
+
+_model = None
+
+
+def _init_worker(model_name: str) -> None:
+    global _model
+    from sentence_transformers import SentenceTransformer
+
+    _model = SentenceTransformer(model_name)
+
+
+def _embed(texts):
+    return _model.encode(texts, batch_size=len(texts), show_progress_bar=False).tolist()
+
+
+def content_hash(model_name: str, plot: str) -> str:
+    return hashlib.sha256(f"{model_name}\x1f{plot}".encode("utf-8")).hexdigest()
+
+
+def ingest(graph, connections, pool, model_name: str, page_size: int, batch_size: int):
+    stream = connections.stream(READ_QUERY, fetch_size=page_size)
+    embedded = skipped = 0
+
+    start = time.perf_counter()
+    while True:
+        rows = list(islice(stream, page_size))
+        if not rows:
+            break
+
+        todo = []
+        for row in rows:
+            digest = content_hash(model_name, row["plot"])
+            if row["hash"] == digest:
+                skipped += 1
+            else:
+                todo.append((row["id"], row["plot"], digest))
+
+        if todo:
+            batches = [todo[i:i + batch_size] for i in range(0, len(todo), batch_size)]
+            vectors = pool.map(_embed, [[plot for _, plot, _ in batch] for batch in batches])
+            updates = [
+                {"id": movie_id, "embedding": vector, "hash": digest}
+                for batch, batch_vectors in zip(batches, vectors)
+                for (movie_id, _, digest), vector in zip(batch, batch_vectors)
+            ]
+            graph.query(WRITE_QUERY, {"rows": updates})
+            embedded += len(updates)
+
+        elapsed = time.perf_counter() - start
+        logger.info(
+            "embedded %d, skipped %d (%.1f plots/sec)",
+            embedded, skipped, embedded / elapsed if elapsed else 0.0,
+        )
+
+    return embedded, skipped, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=EMBEDDING_MODEL)
+    parser.add_argument("--page-size", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    graph = get_graph()
+    if graph is None:
+        sys.exit("Neo4j is not configured or not reachable; check .streamlit/secrets.toml")
+
+    with ProcessPoolExecutor(args.workers, initializer=_init_worker, initargs=(args.model,)) as pool:
+        embedded, skipped, elapsed = ingest(graph, neo4j_connections, pool, args.model, args.page_size, args.batch_size)
+    rate = embedded / elapsed if elapsed else 0.0
+    print(f"Embedded {embedded} plots, skipped {skipped} unchanged, {rate:.1f} plots/sec over {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
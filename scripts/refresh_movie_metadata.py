@@ -0,0 +1,93 @@
+"""Refresh the precomputed retrieval metadata stored on every Movie.
+
+Run from the repository root with the Neo4j credentials in
+`.streamlit/secrets.toml`, after loading data and whenever casts or crews
+change:
+
+    python scripts/refresh_movie_metadata.py [--page-size 1000] [--max-cast 20]
+
+For each movie it writes flat list properties that the `kg_qa`
+retrieval query reads instead of expanding relationships per hit:
+
+    directorNames         names of (person)-[:DIRECTED]->(movie)
+    castNames, castRoles  parallel lists of the top `--max-cast` actors and
+                          their roles, most prolific actors first
+    metadataRefreshedAt   when this movie was last projected
+
+Movie ids are streamed over a single read cursor and refreshed in pages,
+one write transaction per page.
+"""
+
+import argparse
+from itertools import islice
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from graph import get_graph, neo4j_connections  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+ID_QUERY = """
+MATCH (m:Movie)
+RETURN elementId(m) AS id
+"""
+
+REFRESH_QUERY = """
+UNWIND $ids AS id
+MATCH (m:Movie) WHERE elementId(m) = id
+CALL {
+    WITH m
+    MATCH (person)-[:DIRECTED]->(m)
+    WITH person ORDER BY person.name
+    RETURN collect(person.name) AS directors
+}
+CALL {
+    WITH m
+    MATCH (person)-[r:ACTED_IN]->(m)
+    WITH person, r ORDER BY size([ (person)-[:ACTED_IN]->() | 1 ]) DESC, person.name
+    LIMIT $max_cast
+    RETURN collect(person.name) AS names, collect(coalesce(r.role, '')) AS roles
+}
+SET m.directorNames = directors,
+    m.castNames = names,
+    m.castRoles = roles,
+    m.metadataRefreshedAt = datetime()
+RETURN count(m) AS refreshed
+"""
+
+
+def refresh(graph, connections, page_size: int, max_cast: int):
+    rows = connections.stream(ID_QUERY, fetch_size=page_size)
+    refreshed = 0
+    start = time.perf_counter()
+    while True:
+        ids = [row["id"] for row in islice(rows, page_size)]
+        if not ids:
+            break
+        result = graph.query(REFRESH_QUERY, {"ids": ids, "max_cast": max_cast})
+        refreshed += result[0]["refreshed"] if result else 0
+        logger.info("Refreshed %d movies", refreshed)
+    return refreshed, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--max-cast", type=int, default=20, help="actors stored per movie")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    graph = get_graph()
+    if graph is None:
+        sys.exit("Neo4j is not configured or not reachable; check .streamlit/secrets.toml")
+
+    refreshed, elapsed = refresh(graph, neo4j_connections, args.page_size, args.max_cast)
+    print(f"Refreshed metadata for {refreshed} movies in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,98 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import logging
+import time
+
 # tag::importtool[]
 from langchain.tools import Tool
 # end::importtool[]
+from langchain.prompts.prompt import PromptTemplate
 from langchain.agents import AgentExecutor, create_react_agent
-from langchain import hub
 # tag::importmemory[]
 from langchain.chains.conversation.memory import ConversationBufferWindowMemory
 # end::importmemory[]
 
 from solutions.llm import llm
+from prompts import get_react_prompt
 
 # Use the Chains built in the previous lessons
 from solutions.tools.vector import kg_qa
 # from solutions.tools.fewshot import cypher_qa
 from solutions.tools.finetuned import cypher_qa
 
+logger = logging.getLogger(__name__)
+
+# tag::parallel[]
+# Seconds each branch may take before the answer is synthesized without it
+BRANCH_TIMEOUTS = {"plots": 15.0, "facts": 20.0}
+
+SYNTHESIS_TEMPLATE = """
+You are a movie expert. Answer the question using the information below.
+If a source is marked unavailable, answer from the other one.
+
+Plot search:
+{plots}
+
+Graph facts:
+{facts}
+
+Question:
+{question}
+
+Answer:
+"""
+
+synthesis_prompt = PromptTemplate.from_template(SYNTHESIS_TEMPLATE)
+
+# Shared by all requests; two workers per question
+_branch_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="retrieval")
+
+
+def _timed(chain, question):
+    start = time.perf_counter()
+    result = chain.invoke({"query": question})["result"]
+    return result, time.perf_counter() - start
+
+
+def parallel_retrieval(question):
+    """
+    Run the plot search and the Cypher QA chain concurrently,
+    then fuse both results in a single LLM call.
+
+    Wall-clock is roughly the slower branch plus the synthesis call,
+    instead of the sum of both pipelines.
+    """
+    start = time.perf_counter()
+    futures = {
+        "plots": _branch_pool.submit(_timed, kg_qa, question),
+        "facts": _branch_pool.submit(_timed, cypher_qa, question),
+    }
+
+    results, branch_seconds = {}, {}
+    for name, future in futures.items():
+        # Both branches started together, so each deadline counts from `start`
+        remaining = start + BRANCH_TIMEOUTS[name] - time.perf_counter()
+        try:
+            results[name], branch_seconds[name] = future.result(timeout=max(0.0, remaining))
+        except FutureTimeoutError:
+            # The branch keeps running in its worker; its result is ignored
+            logger.warning("%s branch timed out after %.1fs", name, BRANCH_TIMEOUTS[name])
+            results[name] = "unavailable (timed out)"
+        except Exception as e:
+            logger.warning("%s branch failed: %s", name, e)
+            results[name] = "unavailable"
+
+    retrieved = time.perf_counter() - start
+    logger.info(
+        "Parallel retrieval %.2fs (branches: %s, sequential would be %.2fs)",
+        retrieved,
+        ", ".join(f"{name} {seconds:.2f}s" for name, seconds in branch_seconds.items()),
+        sum(branch_seconds.values()),
+    )
+
+    response = llm.invoke(synthesis_prompt.format(question=question, **results))
+    return response.content if hasattr(response, "content") else str(response)
+# end::parallel[]
+
 # tag::tools[]
 tools = [
     Tool.from_function(
@@ -33,6 +112,12 @@ tools = [
         description="Provides information about movie plots using Vector Search",
         func = kg_qa,
         return_direct=True
+    ),
+    Tool.from_function(
+        name="Plot and Graph Facts",
+        description="For questions that need both movie plots and facts about actors, directors or ratings",
+        func = parallel_retrieval,
+        return_direct=True
     )
 ]
 # end::tools[]
@@ -47,7 +132,7 @@ memory = ConversationBufferWindowMemory(
 # end::memory[]
 
 # tag::agent[]
-agent_prompt = hub.pull("hwchase17/react-chat")
+agent_prompt = get_react_prompt()
 agent = create_react_agent(llm, tools, agent_prompt)
 agent_executor = AgentExecutor(
     agent=agent,
@@ -5,6 +5,7 @@ from langchain.prompts.prompt import PromptTemplate
 
 from solutions.llm import llm
 from solutions.graph import graph
+from caching.cypher import cypher_cache
 
 # tag::prompt[]
 CYPHER_GENERATION_TEMPLATE = """
@@ -41,4 +42,7 @@ cypher_qa = GraphCypherQAChain.from_llm(
     verbose=True,
     cypher_prompt=cypher_prompt
 )
-# tag::cypher-qa[]
\ No newline at end of file
+# tag::cypher-qa[]
+
+# Reuse Cypher generated for earlier identical questions (keyed by schema + template)
+cypher_cache.wrap(cypher_qa, CYPHER_GENERATION_TEMPLATE)
\ No newline at end of file
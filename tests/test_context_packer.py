@@ -0,0 +1,34 @@
+from langchain_core.documents import Document
+
+from tokens import count_tokens
+from tools.context import ContextPacker
+
+
+def movie(title, plot, score):
+    return Document(
+        page_content=plot,
+        metadata={"title": title, "directors": ["Someone"], "actors": [["A", "B"]] * 8, "score": score},
+    )
+
+
+def test_packed_context_never_exceeds_the_unpacked_plots():
+    documents = [movie(f"Movie {i}", f"A plot about heist number {i} in a city. " * 5, i / 10) for i in range(4)]
+    # The duplicate's plot tokens are what the metadata can be spent on
+    documents.append(movie("Movie 3", "The same heist movie again. " * 5, 0.2))
+    packed = ContextPacker(max_tokens=10000).pack(documents)
+
+    plots = sum(count_tokens(d.page_content) for d in documents)
+    assert sum(count_tokens(d.page_content) for d in packed) <= plots
+    # Best retrieval score first, and metadata only where it fit
+    assert packed[0].metadata["title"] == "Movie 3"
+    assert packed[0].page_content.startswith("Title: Movie 3")
+    assert len(packed) == 4 and not packed[-1].page_content.startswith("Title:")
+
+
+def test_stats_measure_against_the_plots_alone():
+    packer = ContextPacker(max_tokens=10000)
+    documents = [movie("Heat", "Cops chase robbers.", 0.9)]
+    packed = packer.pack(documents)
+
+    assert packer.stats()["tokens_before"] == count_tokens("Cops chase robbers.")
+    assert packed[0].page_content == "Cops chase robbers."
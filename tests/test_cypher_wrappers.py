@@ -0,0 +1,103 @@
+"""Drive wrapped Cypher generation the way langchain_neo4j's GraphCypherQAChain calls it."""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("langchain_neo4j")
+
+from langchain_core.language_models.fake import FakeListLLM  # noqa: E402
+from langchain_core.prompts import PromptTemplate  # noqa: E402
+from langchain_neo4j import GraphCypherQAChain  # noqa: E402
+
+from caching.cypher import CypherCache  # noqa: E402
+
+TEMPLATE = "Schema:\n{schema}\nQuestion:\n{question}\nCypher Query:"
+
+
+class FakeGraph:
+    def __init__(self):
+        self.queries = []
+
+    @property
+    def get_schema(self) -> str:
+        return "Node properties:\nMovie {title: STRING}"
+
+    @property
+    def get_structured_schema(self) -> dict:
+        return {"node_props": {"Movie": [{"property": "title", "type": "STRING"}]}, "rel_props": {}, "relationships": []}
+
+    def query(self, query: str, params: dict = {}) -> list:
+        self.queries.append(query)
+        return [{"title": "Heat"}]
+
+    def refresh_schema(self) -> None:
+        pass
+
+    def add_graph_documents(self, graph_documents, include_source: bool = False) -> None:
+        pass
+
+
+def build_chain(responses):
+    graph = FakeGraph()
+    chain = GraphCypherQAChain.from_llm(
+        FakeListLLM(responses=responses),
+        graph=graph,
+        cypher_prompt=PromptTemplate.from_template(TEMPLATE),
+        allow_dangerous_requests=True,
+    )
+    return chain, graph
+
+
+def test_cypher_cache_wrap_serves_repeated_questions():
+    cache = CypherCache()
+    chain, graph = build_chain(["MATCH (m:Movie) RETURN m.title", "Heat", "Heat again"])
+    cache.wrap(chain, TEMPLATE)
+
+    assert chain.invoke({"query": "Which movies are there?"})["result"] == "Heat"
+    assert chain.invoke({"query": "which movies are there"})["result"] == "Heat again"
+    assert graph.queries == ["MATCH (m:Movie) RETURN m.title"] * 2
+    assert cache.stats()["hits"] == 1
+
+
+def test_cypher_cache_wrap_async():
+    cache = CypherCache()
+    chain, graph = build_chain(["MATCH (m:Movie) RETURN m.title", "Heat"])
+    cache.wrap(chain, TEMPLATE)
+
+    assert asyncio.run(chain.ainvoke({"query": "Which movies are there?"}))["result"] == "Heat"
+    assert graph.queries == ["MATCH (m:Movie) RETURN m.title"]
+
+
+def test_schema_selector_wrap_prunes_on_top_of_the_cache():
+    np = pytest.importorskip("numpy")
+    from tools.schema import SchemaSelector
+
+    class KeywordEmbeddings:
+        def embed_documents(self, texts):
+            return [self.embed_query(t) for t in texts]
+
+        def embed_query(self, text):
+            return np.array([float("movie" in text.lower()), float("genre" in text.lower()), 1e-3])
+
+    schema = {
+        "node_props": {
+            "Movie": [{"property": "title", "type": "STRING"}],
+            "Genre": [{"property": "name", "type": "STRING"}],
+        },
+        "rel_props": {},
+        "relationships": [{"start": "Movie", "type": "IN_GENRE", "end": "Genre"}],
+    }
+    chain, graph = build_chain(["MATCH (m:Movie) RETURN m.title", "Heat"])
+    prompts = []
+    chain.cypher_generation_chain = chain.cypher_generation_chain.with_listeners(
+        on_start=lambda run: prompts.append(run.inputs["schema"])
+    )
+    CypherCache().wrap(chain, TEMPLATE)
+    selector = SchemaSelector(KeywordEmbeddings(), schema, threshold=0.9)
+    selector.wrap(chain)
+
+    assert chain.invoke({"query": "Which movie is it?"})["result"] == "Heat"
+    assert asyncio.run(chain.ainvoke({"query": "Which movie was it?"}))["result"] == "Heat"
+    assert prompts and "Genre" not in prompts[0] and "Movie {title: STRING}" in prompts[0]
+    assert selector.stats()["calls"] == 2
@@ -0,0 +1,89 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+import history
+from history import WindowedChatHistory, WriteBehindBuffer
+
+
+class FakeDriver:
+    """Stores flushed messages per session and answers the window read."""
+
+    def __init__(self):
+        self.down = False
+        self.stored = {}
+        self.seq = {}
+        self.summaries = {}
+
+    def execute_query(self, query, params=None):
+        if self.down:
+            raise ConnectionError("Neo4j is unreachable")
+        if query is history.FLUSH_QUERY:
+            records = []
+            for batch in params["batches"]:
+                stored = self.stored.setdefault(batch["session_id"], [])
+                stored.extend(batch["messages"])
+                self.seq[batch["session_id"]] = batch["seq"]
+                summarized = self.summaries.get(batch["session_id"], (None, 0))[1]
+                records.append({"session_id": batch["session_id"], "total": len(stored), "summarized": summarized})
+            return records, None, None
+        if query is history.SAVE_SUMMARY_QUERY:
+            if self.summaries.get(params["session_id"], (None, 0))[1] == params["previous"]:
+                self.summaries[params["session_id"]] = (params["summary"], params["summarized"])
+            return [], None, None
+        if "LAST_MESSAGE]->(last)" in query:
+            session_id = params["session_id"]
+            if session_id not in self.stored:
+                return [], None, None
+            summary, summarized = self.summaries.get(session_id, (None, 0))
+            record = {
+                "summary": summary,
+                "flushed_seq": self.seq[session_id],
+                "total": len(self.stored[session_id]),
+                "summarized": summarized,
+                "messages": list(reversed(self.stored[session_id]))[: int(query.split("*0..")[1].split("]")[0]) + 1],
+            }
+            return [record], None, None
+        return [], None, None
+
+
+def test_outage_serves_the_last_window_and_buffered_messages():
+    driver = FakeDriver()
+    buffer = WriteBehindBuffer(driver, flush_interval=3600)
+    memory = WindowedChatHistory("s", None, driver, buffer)
+    memory.add_messages([HumanMessage("Who directed Heat?"), AIMessage("Michael Mann.")])
+    buffer.flush()
+    assert [m.content for m in memory.messages] == ["Who directed Heat?", "Michael Mann."]
+
+    driver.down = True
+    memory.add_messages([HumanMessage("And Alien?")])
+    assert [m.content for m in memory.messages] == ["Who directed Heat?", "Michael Mann.", "And Alien?"]
+    driver.down = False
+    buffer.close()
+
+
+class EchoLLM:
+    def __init__(self):
+        self.prompts = []
+
+    def invoke(self, prompt):
+        self.prompts.append(prompt)
+        return AIMessage(f"summary {len(self.prompts)}")
+
+
+def test_summary_uses_the_count_read_with_the_window():
+    driver = FakeDriver()
+    buffer = WriteBehindBuffer(driver, flush_interval=3600)
+    memory = WindowedChatHistory("s", None, driver, buffer, window=2)
+    memory.add_messages([HumanMessage(f"q{i}") for i in range(4)])
+    buffer.flush()
+    # Another flush lands before the summarizer, triggered at total=4, runs
+    memory.add_messages([HumanMessage("q4"), HumanMessage("q5")])
+    buffer.flush()
+
+    memory.llm = EchoLLM()
+    memory._summarize()
+    assert driver.summaries["s"] == ("summary 1", 4)
+    assert all(f"q{i}" in memory.llm.prompts[0] for i in range(4)) and "q4" not in memory.llm.prompts[0]
+
+    memory._summarize()
+    assert len(memory.llm.prompts) == 1
+    buffer.close()
@@ -0,0 +1,69 @@
+"""Indexes derived from a plot export are rebuilt when the export changes."""
+
+import os
+
+import numpy as np
+
+from tools.ann_index import IVFIndex
+from tools.plot_index import PlotIndex, normalize_rows
+from tools.quantized_index import QuantizedPlotIndex
+
+
+def export(path, rows, dim, seed=0):
+    vectors = normalize_rows(np.random.default_rng(seed).normal(size=(rows, dim)))
+    PlotIndex(vectors, [{"text": str(i), "metadata": {}} for i in range(rows)]).save(str(path))
+    # Make sure the re-export gets a new mtime even on coarse-grained filesystems
+    stamp = 1_000_000_000 + seed
+    for name in os.listdir(path):
+        os.utime(os.path.join(path, name), (stamp, stamp))
+    return vectors
+
+
+def test_quantized_index_is_rebuilt_after_a_reexport(tmp_path):
+    export(tmp_path, 300, 16, seed=1)
+    for dtype in ("int8", "float16"):
+        assert QuantizedPlotIndex.load_or_build(str(tmp_path), dtype).codes.shape == (300, 16)
+
+    vectors = export(tmp_path, 100, 8, seed=2)
+    for dtype in ("int8", "float16"):
+        index = QuantizedPlotIndex.load_or_build(str(tmp_path), dtype)
+        assert index.codes.shape == (100, 8)
+        _, ids = index.search(vectors[:5], 3)
+        assert list(ids[:, 0]) == [0, 1, 2, 3, 4]
+
+
+def test_ivf_index_is_rebuilt_when_stale_or_truncated(tmp_path):
+    export(tmp_path, 300, 16, seed=1)
+    assert len(IVFIndex.load_or_build(str(tmp_path), nlist=8)) == 300
+
+    vectors = export(tmp_path, 100, 8, seed=2)
+    index = IVFIndex.load_or_build(str(tmp_path), nlist=8, nprobe=8)
+    assert (len(index), index.dim) == (100, 8)
+    _, ids = index.search(vectors[:5], 3)
+    assert list(ids[:, 0]) == [0, 1, 2, 3, 4]
+
+    with open(tmp_path / "ivf.npz", "r+b") as f:
+        f.truncate(100)
+    assert len(IVFIndex.load_or_build(str(tmp_path), nlist=8)) == 100
+
+
+def test_ivf_index_is_rebuilt_when_nlist_changes(tmp_path):
+    export(tmp_path, 300, 16, seed=1)
+    assert IVFIndex.load_or_build(str(tmp_path), nlist=8).nlist == 8
+    assert IVFIndex.load_or_build(str(tmp_path), nlist=4).nlist == 4
+    assert IVFIndex.load_or_build(str(tmp_path), nlist=4).requested_nlist == 4
+
+
+def test_untrained_ivf_index_searches_exactly():
+    vectors = normalize_rows(np.random.default_rng(3).normal(size=(50, 8)))
+    index = IVFIndex(8, nlist=4)
+    scores, ids = index.search(vectors[:2], 3)
+    assert (ids == -1).all()
+
+    index.add(vectors, [{"text": str(i)} for i in range(50)])
+    _, ids = index.search(vectors[:5], 3)
+    assert list(ids[:, 0]) == [0, 1, 2, 3, 4]
+
+    index.train(vectors)
+    _, ids = index.search(vectors[:5], 3, nprobe=4)
+    assert list(ids[:, 0]) == [0, 1, 2, 3, 4]
@@ -0,0 +1,28 @@
+import pytest
+
+from caching.results import is_read_only
+
+
+@pytest.mark.parametrize("query", [
+    "MATCH (m:Movie {title: $title}) RETURN m.year",
+    "CALL db.index.vector.queryNodes('moviePlots', 4, $embedding) YIELD node, score RETURN node.title",
+    "CALL db.labels() YIELD label RETURN collect(label)",
+    "MATCH (m:Movie) CALL { WITH m MATCH (m)<-[:ACTED_IN]-(p) RETURN count(p) AS n } RETURN m.title, n",
+    "MATCH (m:Movie {title: 'CALL dbms.killQuery'}) RETURN m",
+])
+def test_reads_are_cacheable(query):
+    assert is_read_only(query)
+
+
+@pytest.mark.parametrize("query", [
+    "MATCH (m:Movie) SET m.seen = true",
+    "CALL db.index.fulltext.createNodeIndex('titles', ['Movie'], ['title'])",
+    "MATCH (m:Movie) CALL db.create.setNodeVectorProperty(m, 'plotEmbedding', $v)",
+    "CALL gds.pageRank.write('movies', {writeProperty: 'rank'})",
+    "CALL gds.louvain.mutate('movies', {mutateProperty: 'community'})",
+    "CALL dbms.setConfigValue('db.logs.query.enabled', 'OFF')",
+    "CALL `db`.labels()",
+    "CALL apoc.cypher.runWrite('CREATE (n)', {})",
+])
+def test_writes_and_unknown_procedures_are_not(query):
+    assert not is_read_only(query)
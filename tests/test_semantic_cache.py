@@ -0,0 +1,70 @@
+import pytest
+
+from caching.semantic import SemanticCache, is_session_dependent
+
+
+FOLLOW_UPS = [
+    "Who directed that movie?",
+    "Tell me more about it",
+    "What else did he direct?",
+    "That sounds great, any others?",
+    "What did you say earlier?",
+]
+
+
+@pytest.mark.parametrize("question", FOLLOW_UPS)
+def test_follow_ups_are_session_dependent(question):
+    assert is_session_dependent(question)
+
+
+@pytest.mark.parametrize("question", FOLLOW_UPS + [
+    "Tell me more",
+    "And the director?",
+    "What year?",
+    "Any similar ones?",
+    "Who played the villain?",
+    "Give me more examples",
+    "How about one from the 90s?",
+])
+def test_follow_ups_are_not_served_after_another_exchange(question):
+    np = pytest.importorskip("numpy")
+    cache = SemanticCache(embeddings=None)
+    vector = np.array([1.0, 0.0], dtype=np.float32)
+    heat = "User: Who directed Heat?\nAssistant: Michael Mann."
+    cache.put(question, "Heat (1995) is a crime thriller...", vector, context=heat)
+
+    assert cache.get(question, vector, context="User: Who directed Alien?\nAssistant: Ridley Scott.") is None
+    assert cache.get(question, vector) is None
+    if not is_session_dependent(question):
+        assert cache.get(question, vector, context=heat) == "Heat (1995) is a crime thriller..."
+
+
+@pytest.mark.parametrize("question", [
+    "What is that movie with Keanu about?",
+    "Also, who directed Heat?",
+    "Recommend another movie like Heat",
+    "Movies released before 1990",
+    "Movies similar to Heat",
+])
+def test_self_contained_questions_can_be_cached(question):
+    assert not is_session_dependent(question)
+
+
+def test_bypass_is_counted_once_per_question():
+    cache = SemanticCache(embeddings=None)
+    assert cache.bypass("What else did he direct?")
+    assert not cache.bypass("Who directed Heat?")
+    assert cache.stats()["bypasses"] == 1
+
+
+def test_new_prompt_version_drops_cached_answers():
+    np = pytest.importorskip("numpy")
+    cache = SemanticCache(embeddings=None, version="react-chat-1")
+    vector = np.array([1.0, 0.0], dtype=np.float32)
+    cache.put("Who directed Heat?", "Michael Mann", vector)
+
+    cache.set_version("react-chat-1")
+    assert cache.get("Who directed Heat?", vector) == "Michael Mann"
+    cache.set_version("react-chat-1+0123456789ab")
+    assert cache.get("Who directed Heat?", vector) is None
+    assert cache.stats()["version"] == "react-chat-1+0123456789ab"
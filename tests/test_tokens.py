@@ -0,0 +1,11 @@
+import tokens
+
+
+def test_encoding_is_not_downloaded_when_not_cached(monkeypatch, tmp_path):
+    monkeypatch.setenv("TIKTOKEN_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(tokens, "_encoding", None)
+    monkeypatch.setattr(tokens, "_encoding_loaded", False)
+
+    assert not tokens._cached_locally()
+    assert tokens.count_tokens("Who directed Heat?") > 0
+    assert tokens._encoding is None and tokens._encoding_loaded
@@ -0,0 +1,64 @@
+"""Cheap token counting for prompt budgeting.
+
+Exact counts would need the Groq model's own tokenizer. For budgeting a
+prompt, an estimate that is consistent and fast is enough: `tiktoken`'s
+cl100k encoding when it is installed, otherwise a characters-and-words
+heuristic that tends to over-count slightly for English text.
+
+tiktoken downloads the encoding on first use, with no timeout. It is only
+loaded, on the first count, when its file is already in tiktoken's cache
+(`TIKTOKEN_CACHE_DIR`, or the default under the temp directory), so
+importing the app never touches the network; prime the cache at build time
+to use it.
+"""
+
+import hashlib
+import math
+import os
+import tempfile
+import threading
+
+_CL100K_URL = "https://openaipublic.blob.core.windows.net/encodings/cl100k_base.tiktoken"
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+
+def _cached_locally() -> bool:
+    """Whether tiktoken can load cl100k from its cache (same lookup as tiktoken.load)."""
+    if "TIKTOKEN_CACHE_DIR" in os.environ:
+        cache_dir = os.environ["TIKTOKEN_CACHE_DIR"]
+    elif "DATA_GYM_CACHE_DIR" in os.environ:
+        cache_dir = os.environ["DATA_GYM_CACHE_DIR"]
+    else:
+        cache_dir = os.path.join(tempfile.gettempdir(), "data-gym-cache")
+    if not cache_dir:
+        return False
+    return os.path.isfile(os.path.join(cache_dir, hashlib.sha1(_CL100K_URL.encode()).hexdigest()))
+
+
+def _get_encoding():
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        with _encoding_lock:
+            if not _encoding_loaded:
+                try:
+                    if _cached_locally():
+                        import tiktoken
+
+                        _encoding = tiktoken.get_encoding("cl100k_base")
+                except Exception:
+                    _encoding = None
+                _encoding_loaded = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Approximate number of LLM tokens in `text`."""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return max(math.ceil(len(text) / 4), math.ceil(len(text.split()) * 4 / 3))
@@ -0,0 +1,248 @@
+"""Approximate nearest-neighbour plot index (inverted file, IVF).
+
+Exact scoring in `tools.plot_index.PlotIndex` touches every vector per
+query, which stops scaling once the catalog grows past a few hundred
+thousand movies. `IVFIndex` clusters the normalized vectors with spherical
+k-means into `nlist` cells and, per query, only scores the vectors in the
+`nprobe` closest cells. The two knobs trade recall for latency:
+
+    nlist   more cells -> smaller cells -> faster, but more probes needed
+    nprobe  more probes -> higher recall, proportionally slower
+
+Vectors can be added after training (they go to their nearest cell); ones
+added before are searched exactly until `train` files them into cells. The
+index is saved next to an exported plot index as `ivf.npz` plus its own
+document list, so it is only built once; it records the export's
+fingerprint and its `nlist`, and is rebuilt when either changes. It has the same
+`search(queries, k)` / `documents` interface as `PlotIndex` and plugs into
+`PlotIndexRetriever`.
+"""
+
+import json
+import logging
+import os
+import zipfile
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from tools.plot_index import PlotIndex, normalize_rows, source_fingerprint, top_k, write_atomically
+
+logger = logging.getLogger(__name__)
+
+IVF_FILE = "ivf.npz"
+# Kept apart from the exact index's documents.json, which incremental adds would invalidate
+IVF_DOCUMENTS_FILE = "ivf_documents.json"
+
+# Rows per block when assigning vectors to cells, to bound temporary memory
+_ASSIGN_BLOCK = 32768
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Return the index of the closest centroid for every row of `vectors`."""
+    out = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), _ASSIGN_BLOCK):
+        block = np.asarray(vectors[start:start + _ASSIGN_BLOCK])
+        out[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return out
+
+
+class _Cell:
+    """Growable storage for the vectors and ids of one inverted list."""
+
+    def __init__(self, dim: int):
+        self.vectors = np.empty((0, dim), dtype=np.float32)
+        self.ids = np.empty(0, dtype=np.int64)
+        self.size = 0
+
+    def extend(self, vectors: np.ndarray, ids: np.ndarray) -> None:
+        needed = self.size + len(ids)
+        if needed > len(self.ids):
+            capacity = max(needed, 2 * len(self.ids), 16)
+            grown = np.empty((capacity, self.vectors.shape[1]), dtype=np.float32)
+            grown[:self.size] = self.vectors[:self.size]
+            grown_ids = np.empty(capacity, dtype=np.int64)
+            grown_ids[:self.size] = self.ids[:self.size]
+            self.vectors, self.ids = grown, grown_ids
+        self.vectors[self.size:needed] = vectors
+        self.ids[self.size:needed] = ids
+        self.size = needed
+
+
+class IVFIndex:
+    """Inverted-file ANN index over L2-normalized vectors (cosine similarity)."""
+
+    def __init__(self, dim: int, nlist: int = 1024, nprobe: int = 16):
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        # As configured; training caps `nlist` at the number of vectors
+        self.requested_nlist = nlist
+        self.centroids: Optional[np.ndarray] = None
+        self.documents: List[dict] = []
+        self._cells: List[_Cell] = []
+        # Vectors added before training, scored exactly
+        self._flat = _Cell(dim)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def train(self, vectors, iterations: int = 10, sample: int = 100000, seed: int = 0) -> None:
+        """Learn `nlist` cell centroids with spherical k-means on a sample of `vectors`."""
+        rng = np.random.default_rng(seed)
+        vectors = np.asarray(vectors)
+        if len(vectors) > sample:
+            vectors = vectors[np.sort(rng.choice(len(vectors), sample, replace=False))]
+        data = normalize_rows(vectors)
+        self.nlist = min(self.nlist, len(data))
+        centroids = data[rng.choice(len(data), self.nlist, replace=False)].copy()
+
+        for _ in range(iterations):
+            labels = _assign(data, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, data)
+            counts = np.bincount(labels, minlength=self.nlist)
+            empty = counts == 0
+            # Re-seed empty cells with random points so every cell stays in use
+            sums[empty] = data[rng.choice(len(data), int(empty.sum()))]
+            centroids = normalize_rows(sums)
+
+        self.centroids = centroids
+        self._cells = [_Cell(self.dim) for _ in range(self.nlist)]
+        if self._flat.size:
+            self._insert(self._flat.vectors[:self._flat.size], self._flat.ids[:self._flat.size])
+            self._flat = _Cell(self.dim)
+
+    def add(self, vectors, documents: List[dict]) -> None:
+        """Insert vectors (with their documents) into their nearest cells."""
+        if len(vectors) != len(documents):
+            raise ValueError(f"{len(vectors)} vectors but {len(documents)} documents")
+        vectors = normalize_rows(vectors)
+        first_id = len(self.documents)
+        ids = np.arange(first_id, first_id + len(vectors), dtype=np.int64)
+        if self.is_trained:
+            self._insert(vectors, ids)
+        else:
+            self._flat.extend(vectors, ids)
+        self.documents.extend(documents)
+
+    def _insert(self, vectors: np.ndarray, ids: np.ndarray) -> None:
+        labels = _assign(vectors, self.centroids)
+        order = np.argsort(labels, kind="stable")
+        bounds = np.searchsorted(labels[order], np.arange(self.nlist + 1))
+        for cell, (lo, hi) in enumerate(zip(bounds[:-1], bounds[1:])):
+            if hi > lo:
+                rows = order[lo:hi]
+                self._cells[cell].extend(vectors[rows], ids[rows])
+
+    def search(self, queries, k: int = 4, nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (scores, ids) of the approximate top `k` for each query (exact before training)."""
+        queries = normalize_rows(queries)
+        scores_out = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        ids_out = np.full((len(queries), k), -1, dtype=np.int64)
+        if not self.is_trained:
+            if self._flat.size:
+                scores, cols = top_k(queries @ self._flat.vectors[:self._flat.size].T, k)
+                n = scores.shape[1]
+                scores_out[:, :n] = scores
+                ids_out[:, :n] = self._flat.ids[cols]
+            return scores_out, ids_out
+
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        _, probes = top_k(queries @ self.centroids.T, nprobe)
+        for row, (query, cells) in enumerate(zip(queries, probes)):
+            cells = [self._cells[c] for c in cells if self._cells[c].size]
+            if not cells:
+                continue
+            candidates = np.concatenate([c.vectors[:c.size] for c in cells])
+            candidate_ids = np.concatenate([c.ids[:c.size] for c in cells])
+            scores, cols = top_k((candidates @ query)[None, :], k)
+            n = scores.shape[1]
+            scores_out[row, :n] = scores[0]
+            ids_out[row, :n] = candidate_ids[cols[0]]
+        return scores_out, ids_out
+
+    def save(self, path: str, source: str = "") -> None:
+        """Write the index to `path`; `source` is the fingerprint of the export it was built from."""
+        if not self.is_trained:
+            raise RuntimeError("IVFIndex must be trained before it is saved")
+        os.makedirs(path, exist_ok=True)
+        sizes = np.array([c.size for c in self._cells], dtype=np.int64)
+        # Documents first: a crash before the index is replaced leaves a count mismatch, which forces a rebuild
+        write_atomically(
+            os.path.join(path, IVF_DOCUMENTS_FILE), lambda f: f.write(json.dumps(self.documents).encode("utf-8"))
+        )
+        write_atomically(os.path.join(path, IVF_FILE), lambda f: np.savez(
+            f,
+            centroids=self.centroids,
+            nprobe=np.int64(self.nprobe),
+            nlist=np.int64(self.requested_nlist),
+            sizes=sizes,
+            vectors=np.concatenate([c.vectors[:c.size] for c in self._cells]),
+            ids=np.concatenate([c.ids[:c.size] for c in self._cells]),
+            source=np.str_(source),
+        ))
+
+    @classmethod
+    def load(cls, path: str, nprobe: Optional[int] = None) -> "IVFIndex":
+        with np.load(os.path.join(path, IVF_FILE)) as data:
+            return cls._from_arrays(path, data, nprobe)
+
+    @classmethod
+    def _from_arrays(cls, path: str, data, nprobe: Optional[int]) -> "IVFIndex":
+        centroids = data["centroids"]
+        index = cls(centroids.shape[1], nlist=len(centroids), nprobe=int(nprobe or data["nprobe"]))
+        index.centroids = centroids
+        if "nlist" in data.files:
+            index.requested_nlist = int(data["nlist"])
+        index._cells = [_Cell(index.dim) for _ in range(index.nlist)]
+        offsets = np.concatenate([[0], np.cumsum(data["sizes"])])
+        vectors, ids = data["vectors"], data["ids"]
+        for cell, (lo, hi) in enumerate(zip(offsets[:-1], offsets[1:])):
+            if hi > lo:
+                index._cells[cell].extend(vectors[lo:hi], ids[lo:hi])
+        with open(os.path.join(path, IVF_DOCUMENTS_FILE), encoding="utf-8") as f:
+            index.documents = json.load(f)
+        return index
+
+    @classmethod
+    def _load_current(
+        cls, path: str, fingerprint: str, rows: int, dim: int, nlist: int, nprobe: int
+    ) -> Optional["IVFIndex"]:
+        """Return the saved index if it was built from this export with this `nlist`, else None."""
+        try:
+            with np.load(os.path.join(path, IVF_FILE)) as data:
+                if "source" not in data.files or str(data["source"]) != fingerprint:
+                    return None
+                if "nlist" not in data.files or int(data["nlist"]) != nlist:
+                    return None
+                index = cls._from_arrays(path, data, nprobe)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+            logger.warning("Ignoring unreadable IVF index in %s: %s", path, e)
+            return None
+        # Vectors added after the build only ever grow the index
+        cells_total = sum(c.size for c in index._cells)
+        if index.dim != dim or len(index) < rows or cells_total != len(index):
+            return None
+        return index
+
+    @classmethod
+    def load_or_build(cls, path: str, nlist: int = 1024, nprobe: int = 16) -> "IVFIndex":
+        """Load `ivf.npz` from `path`, or (re)build it from the exported exact index if missing or stale."""
+        fingerprint = source_fingerprint(path)
+        exact = PlotIndex.load(path)
+        index = cls._load_current(path, fingerprint, len(exact), exact.vectors.shape[1], nlist, nprobe)
+        if index is not None:
+            return index
+        logger.info("Building IVF index (nlist=%d) over %d plot vectors", nlist, len(exact))
+        index = cls(exact.vectors.shape[1], nlist=nlist, nprobe=nprobe)
+        index.train(exact.vectors)
+        index.add(exact.vectors, exact.documents)
+        index.save(path, fingerprint)
+        return index
@@ -0,0 +1,194 @@
+"""Token-budgeted context packing for the `kg_qa` "stuff" chain.
+
+The "stuff" chain pastes the `page_content` of whatever the retriever
+returns into one prompt, and prompt length is what Groq latency tracks most
+closely. `PackingRetriever` sits between the retriever and the chain and
+hands it documents that:
+
+- have duplicates removed (same movie, or near-identical plots),
+- fit a token budget (`max_tokens`, and never more than the plots the
+  chain would have pasted unpacked), spent in retrieval-score order: plots
+  are cut at a sentence boundary, and documents that no longer fit are
+  dropped,
+- carry their metadata as compact text (title, directors, top actors) when
+  the budget left over after the plots allows it, best-scoring first.
+
+Each request logs the tokens the unpacked plots would have cost against
+what was packed; `ContextPacker.stats()` keeps the totals.
+"""
+
+import logging
+import re
+import threading
+from typing import Any, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"\w+")
+
+
+def _words(text: str) -> set:
+    return set(_WORD.findall(text.lower()))
+
+
+def _format_actor(actor) -> str:
+    if isinstance(actor, (list, tuple)):
+        name, role = (list(actor) + [None, None])[:2]
+        return f"{name} ({role})" if role else str(name)
+    return str(actor)
+
+
+def render(document: Document, actor_limit: Optional[int] = None, plot: Optional[str] = None) -> str:
+    """Render a retrieved plot and its metadata as prompt text."""
+    metadata = document.metadata or {}
+    lines = []
+    if metadata.get("title"):
+        lines.append(f"Title: {metadata['title']}")
+    if metadata.get("directors"):
+        lines.append("Directors: " + ", ".join(str(d) for d in metadata["directors"]))
+    actors = list(metadata.get("actors") or [])
+    if actor_limit is not None:
+        actors = actors[:actor_limit]
+    if actors:
+        lines.append("Actors: " + ", ".join(_format_actor(a) for a in actors))
+    lines.append(f"Plot: {document.page_content if plot is None else plot}")
+    return "\n".join(lines)
+
+
+def truncate(text: str, max_tokens: int) -> str:
+    """Cut `text` to at most `max_tokens`, preferring a sentence boundary."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    words = text.split()
+    keep = max(0, len(words) * max_tokens // max(1, count_tokens(text)))
+    while keep and count_tokens(" ".join(words[:keep]) + " ...") > max_tokens:
+        keep -= 1
+    cut = " ".join(words[:keep])
+    sentences = _SENTENCE_END.split(cut)
+    if len(sentences) > 1:
+        whole = " ".join(sentences[:-1])
+        # Only fall back to whole sentences if that keeps most of the text
+        if len(whole) >= len(cut) // 2:
+            return whole
+    return f"{cut} ..." if cut else ""
+
+
+class ContextPacker:
+    """Dedupe, order by score and trim retrieved documents to a token budget."""
+
+    def __init__(
+        self,
+        max_tokens: int = 1500,
+        actor_limit: int = 5,
+        min_plot_tokens: int = 40,
+        duplicate_overlap: float = 0.8,
+    ):
+        self.max_tokens = max_tokens
+        self.actor_limit = actor_limit
+        self.min_plot_tokens = min_plot_tokens
+        self.duplicate_overlap = duplicate_overlap
+
+        self.requests = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def _dedupe(self, documents: List[Document]) -> List[Document]:
+        kept, seen_ids, seen_words = [], set(), []
+        for doc in documents:
+            metadata = doc.metadata or {}
+            movie_id = metadata.get("tmdbId") or metadata.get("title")
+            if movie_id is not None and movie_id in seen_ids:
+                continue
+            words = _words(doc.page_content)
+            if words and any(
+                len(words & other) / len(words | other) >= self.duplicate_overlap for other in seen_words
+            ):
+                continue
+            if movie_id is not None:
+                seen_ids.add(movie_id)
+            seen_words.append(words)
+            kept.append(doc)
+        return kept
+
+    def pack(self, documents: List[Document]) -> List[Document]:
+        """Return documents fitting within `max_tokens`, and within the unpacked plots, in total."""
+        # What the chain pastes without packing: the plots alone
+        before = sum(count_tokens(d.page_content) for d in documents)
+        ranked = sorted(documents, key=lambda d: (d.metadata or {}).get("score", 0.0), reverse=True)
+
+        # Plots first, in score order
+        plots, remaining = [], min(self.max_tokens, before)
+        for doc in self._dedupe(ranked):
+            plot = doc.page_content
+            cost = count_tokens(plot)
+            if cost > remaining:
+                if remaining < self.min_plot_tokens:
+                    continue
+                plot = truncate(plot, remaining)
+                cost = count_tokens(plot)
+            plots.append((doc, plot, cost))
+            remaining -= cost
+
+        # Then metadata, wherever the rest of the budget allows
+        packed = []
+        for doc, plot, cost in plots:
+            text = plot
+            for actor_limit in (None, self.actor_limit):
+                rendered = render(doc, actor_limit, plot=plot)
+                extra = count_tokens(rendered) - cost
+                if extra <= remaining:
+                    text = rendered
+                    remaining -= extra
+                    break
+            packed.append(Document(page_content=text, metadata=doc.metadata))
+
+        after = sum(count_tokens(d.page_content) for d in packed)
+        with self._lock:
+            self.requests += 1
+            self.tokens_before += before
+            self.tokens_after += after
+            self.dropped += len(documents) - len(packed)
+        logger.info(
+            "kg_qa context: %d -> %d tokens (%d saved), %d of %d documents kept",
+            before, after, before - after, len(packed), len(documents),
+        )
+        return packed
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "tokens_before": self.tokens_before,
+                "tokens_after": self.tokens_after,
+                "tokens_saved": self.tokens_before - self.tokens_after,
+                "saved_per_request": (self.tokens_before - self.tokens_after) / self.requests if self.requests else 0.0,
+                "documents_dropped": self.dropped,
+            }
+
+
+class PackingRetriever(BaseRetriever):
+    """Wrap another retriever and pack its documents with a `ContextPacker`."""
+
+    retriever: Any
+    packer: Any
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        documents = self.retriever.invoke(query, config={"callbacks": run_manager.get_child()})
+        return self.packer.pack(documents)
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        documents = await self.retriever.ainvoke(query, config={"callbacks": run_manager.get_child()})
+        return self.packer.pack(documents)
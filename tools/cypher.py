@@ -1,37 +1,25 @@
-from langchain.chains import GraphCypherQAChain
+import asyncio
+import logging
 
-from llm import llm
-from graph import graph
+import streamlit as st
+from langchain.prompts.prompt import PromptTemplate
 
-from tools.cypher import cypher_qa
+# GraphCypherQAChain moved to langchain_neo4j; fall back to the older location
+try:
+    from langchain_neo4j import GraphCypherQAChain
+except Exception:
+    from langchain.chains import GraphCypherQAChain
 
-from langchain.prompts.prompt import PromptTemplate
+from llm import get_llm, get_embeddings
+from graph import get_graph, schema_snapshot
+from caching.answers import acached, cached
+from caching.keys import prompt_version
+from caching.cypher import cypher_cache
+from resources import resource
+from utils import secret_flag
+from tools.schema import SchemaSelector
 
-cypher_qa = GraphCypherQAChain.from_llm(
-    llm,          # (1)
-    graph=graph,  # (2)
-)
-
-tools = [
-    Tool.from_function(
-        name="General Chat",
-        description="For general chat not covered by other tools",
-        func=llm.invoke,
-        return_direct=True
-        ),
-    Tool.from_function(
-        name="Vector Search Index",
-        description="Provides information about movie plots using Vector Search",
-        func = kg_qa,
-        return_direct=True
-    ),
-    Tool.from_function(
-        name="Graph Cypher QA Chain",  # (1)
-        description="Provides information about Movies including their Actors, Directors and User reviews", # (2)
-        func = cypher_qa, # (3)
-        return_direct=True
-    ),
-]
+logger = logging.getLogger(__name__)
 
 CYPHER_GENERATION_TEMPLATE = """
 You are an expert Neo4j Developer translating user questions into Cypher to answer questions about movies and provide recommendations.
@@ -56,9 +44,71 @@ Cypher Query:
 
 cypher_prompt = PromptTemplate.from_template(CYPHER_GENERATION_TEMPLATE)
 
-cypher_qa = GraphCypherQAChain.from_llm(
-    llm,
-    graph=graph,
-    verbose=True,
-    cypher_prompt=cypher_prompt
-)
\ No newline at end of file
+# Pass only the part of the schema each question needs to the Cypher prompt
+SCHEMA_PRUNING = secret_flag("SCHEMA_PRUNING", True)
+
+
+@resource("schema_selector")
+def get_schema_selector():
+    """Return the schema selector, or None if disabled with SCHEMA_PRUNING = false."""
+    if not SCHEMA_PRUNING:
+        return None
+    return SchemaSelector(
+        get_embeddings(),
+        threshold=float(st.secrets.get("SCHEMA_PRUNING_THRESHOLD", 0.4)),
+        property_threshold=float(st.secrets.get("SCHEMA_PRUNING_PROPERTY_THRESHOLD", 0.45)),
+    )
+
+
+@resource("cypher_qa")
+def get_cypher_qa():
+    """Return the GraphCypherQAChain, or None if Neo4j is disabled or unreachable."""
+    graph = get_graph()
+    if graph is None:
+        return None
+    try:
+        cypher_qa = GraphCypherQAChain.from_llm(
+            get_llm(),
+            graph=graph,
+            verbose=True,
+            cypher_prompt=cypher_prompt,
+            allow_dangerous_requests=True,
+        )
+    except Exception as e:
+        logger.warning("Could not initialize GraphCypherQAChain: %s", e)
+        return None
+    cypher_cache.wrap(cypher_qa, CYPHER_GENERATION_TEMPLATE)
+    selector = get_schema_selector()
+    if selector is not None:
+        selector.update(graph.get_structured_schema)
+        selector.wrap(cypher_qa)
+
+    def _update_schema(refreshed_graph):
+        # from_llm copies the schema into the chain; keep it in step with the snapshot
+        cypher_qa.graph_schema = refreshed_graph.get_schema
+        if selector is not None:
+            selector.update(refreshed_graph.get_structured_schema)
+
+    schema_snapshot.on_refresh(_update_schema)
+    return cypher_qa
+
+
+def _run_cypher_qa(question: str) -> str:
+    cypher_qa = get_cypher_qa()
+    if cypher_qa is None:
+        raise RuntimeError("The Graph Cypher QA chain is not available")
+    response = cypher_qa.invoke({"query": question})
+    return response["result"]
+
+
+async def _arun_cypher_qa(question: str) -> str:
+    # The first call may build the chain; keep that off the event loop
+    cypher_qa = await asyncio.to_thread(get_cypher_qa)
+    if cypher_qa is None:
+        raise RuntimeError("The Graph Cypher QA chain is not available")
+    response = await cypher_qa.ainvoke({"query": question})
+    return response["result"]
+
+
+run_cypher_qa = cached("cypher_qa", _run_cypher_qa, prompt_version(f"{CYPHER_GENERATION_TEMPLATE}{SCHEMA_PRUNING}"))
+arun_cypher_qa = acached("cypher_qa", _arun_cypher_qa, prompt_version(f"{CYPHER_GENERATION_TEMPLATE}{SCHEMA_PRUNING}"))
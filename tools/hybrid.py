@@ -0,0 +1,141 @@
+"""Hybrid full-text + vector plot retrieval fused in one Cypher call.
+
+Pure vector search misses title- and name-heavy questions ("plot of Heat
+1995"), and every bad retrieval costs the agent another LLM step.
+`HybridRetriever` sends a single query that runs the `moviePlots` vector
+index and a Lucene full-text index over titles and plots, then merges the
+two rankings with reciprocal rank fusion (RRF):
+
+    score(movie) = sum over both lists of 1 / (rrf_k + rank)
+
+The result rows use the same `retrieval_query` as the Neo4jVector
+retriever, so `kg_qa` sees identical documents.
+"""
+
+import re
+from typing import Any, List
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from tools.vector import RETRIEVAL_QUERY
+
+FULLTEXT_INDEX = "movieTitlesPlots"
+
+CREATE_FULLTEXT_INDEX = f"""
+CREATE FULLTEXT INDEX {FULLTEXT_INDEX} IF NOT EXISTS
+FOR (m:Movie) ON EACH [m.title, m.plot]
+"""
+
+# Fails if the index is not ONLINE within $timeout seconds (or failed to populate)
+AWAIT_INDEX = "CALL db.awaitIndex($name, $timeout)"
+
+# Ranks are 0-based in the list, so the best hit contributes 1 / (rrf_k + 1)
+FUSION_QUERY = """
+CALL {
+    CALL db.index.vector.queryNodes($vector_index, $candidates, $embedding) YIELD node
+    WITH collect(node) AS nodes
+    UNWIND range(0, size(nodes) - 1) AS rank
+    RETURN nodes[rank] AS node, 1.0 / ($rrf_k + rank + 1) AS rrf
+    UNION ALL
+    CALL db.index.fulltext.queryNodes($fulltext_index, $text, {limit: $candidates}) YIELD node
+    WITH collect(node) AS nodes
+    UNWIND range(0, size(nodes) - 1) AS rank
+    RETURN nodes[rank] AS node, 1.0 / ($rrf_k + rank + 1) AS rrf
+}
+WITH node, sum(rrf) AS score
+ORDER BY score DESC
+LIMIT $k
+"""
+
+HYBRID_QUERY = FUSION_QUERY + RETRIEVAL_QUERY
+
+_LUCENE_SPECIAL = re.compile(r'[+\-&|!(){}\[\]^"~*?:\\/]')
+_LUCENE_OPERATORS = re.compile(r"\b(AND|OR|NOT)\b")
+
+
+def lucene_query(text: str) -> str:
+    """Turn free text into a safe Lucene query (terms OR-ed, no operators)."""
+    text = _LUCENE_SPECIAL.sub(" ", text)
+    text = _LUCENE_OPERATORS.sub(lambda m: m.group(0).lower(), text)
+    return " ".join(text.split())
+
+
+def ensure_fulltext_index(graph, timeout: float = 300.0) -> None:
+    """Create the title/plot full-text index if it does not exist yet, and wait until it is online.
+
+    A new index is populated in the background; queries against it fail until
+    then, so this raises if it is not online within `timeout` seconds.
+    """
+    graph.query(CREATE_FULLTEXT_INDEX)
+    graph.query(AWAIT_INDEX, {"name": FULLTEXT_INDEX, "timeout": int(timeout)})
+
+
+def _to_documents(rows) -> List[Document]:
+    return [
+        Document(page_content=row["text"] or "", metadata=dict(row["metadata"] or {}, score=row["score"]))
+        for row in rows
+    ]
+
+
+class HybridRetriever(BaseRetriever):
+    """Vector + full-text retriever over Movie plots with reciprocal rank fusion."""
+
+    graph: Any
+    embeddings: Any
+    k: int = 4
+    candidates: int = 20
+    rrf_k: int = 60
+    vector_index: str = "moviePlots"
+    fulltext_index: str = FULLTEXT_INDEX
+
+    def _params(self, query: str) -> dict:
+        return {
+            "embedding": self.embeddings.embed_query(query),
+            "text": lucene_query(query) or query,
+            "candidates": self.candidates,
+            "rrf_k": self.rrf_k,
+            "k": self.k,
+            "vector_index": self.vector_index,
+            "fulltext_index": self.fulltext_index,
+        }
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return _to_documents(self.graph.query(HYBRID_QUERY, self._params(query)))
+
+
+# Two round trips, fused client-side; kept for comparison in benchmarks/bench_hybrid_retrieval.py
+_VECTOR_ONLY = """
+CALL db.index.vector.queryNodes($vector_index, $candidates, $embedding) YIELD node, score
+RETURN elementId(node) AS id
+"""
+
+_FULLTEXT_ONLY = """
+CALL db.index.fulltext.queryNodes($fulltext_index, $text, {limit: $candidates}) YIELD node, score
+RETURN elementId(node) AS id
+"""
+
+_FETCH = """
+UNWIND $ids AS id
+MATCH (node) WHERE elementId(node) = id.id
+WITH node, id.score AS score
+ORDER BY score DESC
+""" + RETRIEVAL_QUERY
+
+
+def two_step_search(graph, params: dict) -> List[Document]:
+    """Run both index queries separately, fuse client-side, then fetch metadata.
+
+    `params` are `HybridRetriever._params(...)`; the reads bypass the result cache.
+    """
+    run = getattr(graph, "query_uncached", graph.query)
+    scores = {}
+    for statement in (_VECTOR_ONLY, _FULLTEXT_ONLY):
+        for rank, row in enumerate(run(statement, params)):
+            scores[row["id"]] = scores.get(row["id"], 0.0) + 1.0 / (params["rrf_k"] + rank + 1)
+    best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:params["k"]]
+    rows = run(_FETCH, {"ids": [{"id": i, "score": s} for i, s in best]})
+    return _to_documents(rows)
@@ -0,0 +1,156 @@
+"""In-process exact vector index over movie plot embeddings.
+
+The whole plot corpus (tens of thousands of 384-dim vectors) fits in RAM,
+so `kg_qa` can score it locally instead of making a round trip to the
+`moviePlots` index in Neo4j for every question. `scripts/export_plot_vectors.py`
+dumps the vectors and metadata to a directory:
+
+    vectors.npy      float32 matrix, one L2-normalized row per movie
+    documents.json   [{"text": plot, "metadata": {...}}, ...] in row order
+
+`PlotIndex.load()` memory-maps the matrix, so several Streamlit workers on
+one host share the same pages. `PlotIndexRetriever` wraps any index with a
+`search(queries, k)` method as a LangChain retriever.
+"""
+
+import json
+import os
+from typing import Any, BinaryIO, Callable, List, Tuple
+
+import numpy as np
+
+try:
+    from langchain_core.callbacks import CallbackManagerForRetrieverRun
+    from langchain_core.documents import Document
+    from langchain_core.retrievers import BaseRetriever
+except Exception:
+    BaseRetriever = None
+
+VECTORS_FILE = "vectors.npy"
+DOCUMENTS_FILE = "documents.json"
+
+# Rows scored per block, to bound the temporary score matrix for large batches
+_BLOCK_ROWS = 65536
+
+
+def normalize_rows(vectors) -> np.ndarray:
+    """Return `vectors` as float32 with every row scaled to unit length."""
+    v = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(v, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return v / norms
+
+
+def top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Return (scores, column ids) of the `k` best columns of each row, best first."""
+    k = min(k, scores.shape[1])
+    if k == 0:
+        empty = np.empty((scores.shape[0], 0))
+        return empty.astype(np.float32), empty.astype(np.int64)
+    ids = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    part = np.take_along_axis(scores, ids, axis=1)
+    order = np.argsort(-part, axis=1)
+    return np.take_along_axis(part, order, axis=1), np.take_along_axis(ids, order, axis=1)
+
+
+def source_fingerprint(path: str) -> str:
+    """Identify the export in `path` by the size and mtime of its files.
+
+    Indexes derived from the export store this and are rebuilt when it changes.
+    """
+    parts = []
+    for name in (VECTORS_FILE, DOCUMENTS_FILE):
+        stat = os.stat(os.path.join(path, name))
+        parts.append(f"{name}:{stat.st_size}:{stat.st_mtime_ns}")
+    return "|".join(parts)
+
+
+def write_atomically(file_path: str, write: Callable[[BinaryIO], None]) -> None:
+    """Call `write` on a temporary file and rename it over `file_path`.
+
+    Readers (and a crash mid-write) never see a partially written file.
+    """
+    tmp = f"{file_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            write(f)
+        os.replace(tmp, file_path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def load_documents(path: str) -> List[dict]:
+    with open(os.path.join(path, DOCUMENTS_FILE), encoding="utf-8") as f:
+        return json.load(f)
+
+
+class PlotIndex:
+    """Exact cosine-similarity search over normalized plot vectors."""
+
+    def __init__(self, vectors: np.ndarray, documents: List[dict]):
+        if len(vectors) != len(documents):
+            raise ValueError(f"{len(vectors)} vectors but {len(documents)} documents")
+        self.vectors = vectors
+        self.documents = documents
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "PlotIndex":
+        vectors = np.load(os.path.join(path, VECTORS_FILE), mmap_mode="r" if mmap else None)
+        return cls(vectors, load_documents(path))
+
+    def save(self, path: str) -> None:
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, VECTORS_FILE), np.asarray(self.vectors, dtype=np.float32))
+        with open(os.path.join(path, DOCUMENTS_FILE), "w", encoding="utf-8") as f:
+            json.dump(self.documents, f)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def search(self, queries, k: int = 4) -> Tuple[np.ndarray, np.ndarray]:
+        """Score a batch of query vectors against every row and keep the top `k`.
+
+        Returns (scores, ids), each of shape (len(queries), k).
+        """
+        queries = normalize_rows(queries)
+        best_scores, best_ids = None, None
+        for start in range(0, len(self.vectors), _BLOCK_ROWS):
+            block = np.asarray(self.vectors[start:start + _BLOCK_ROWS])
+            scores, ids = top_k(queries @ block.T, k)
+            ids += start
+            if best_scores is None:
+                best_scores, best_ids = scores, ids
+            else:
+                merged_scores = np.concatenate([best_scores, scores], axis=1)
+                merged_ids = np.concatenate([best_ids, ids], axis=1)
+                best_scores, cols = top_k(merged_scores, k)
+                best_ids = np.take_along_axis(merged_ids, cols, axis=1)
+        if best_scores is None:
+            return top_k(np.empty((len(queries), 0), dtype=np.float32), k)
+        return best_scores, best_ids
+
+
+if BaseRetriever is not None:
+
+    class PlotIndexRetriever(BaseRetriever):
+        """LangChain retriever over a local plot index (drop-in for `Neo4jVector.as_retriever()`)."""
+
+        index: Any
+        embeddings: Any
+        k: int = 4
+
+        def _get_relevant_documents(
+            self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+        ) -> List[Document]:
+            vector = self.embeddings.embed_query(query)
+            scores, ids = self.index.search([vector], self.k)
+            documents = []
+            for score, i in zip(scores[0], ids[0]):
+                if i < 0:
+                    # Approximate indexes pad with -1 when they find fewer than k
+                    continue
+                doc = self.index.documents[int(i)]
+                metadata = dict(doc.get("metadata") or {}, score=float(score))
+                documents.append(Document(page_content=doc.get("text") or "", metadata=metadata))
+            return documents
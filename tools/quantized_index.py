@@ -0,0 +1,171 @@
+"""Quantized plot index: search compact vectors, re-rank with exact ones.
+
+Every Streamlit worker that holds the float32 plot matrix pays
+4 bytes x 384 dims per movie. `QuantizedPlotIndex` keeps only a compact
+copy resident:
+
+    int8     one signed byte per dim plus a float32 scale per vector (~4x smaller)
+    float16  two bytes per dim (2x smaller)
+
+A query scores the compact matrix, takes the best `k * rerank_factor`
+candidates and re-scores just those rows against the exact float32 vectors,
+which stay memory-mapped on disk (`vectors.npy` from the export) so only
+the re-ranked rows are ever paged in. The compact arrays are written next
+to the export on first use, together with the export's fingerprint, and
+rebuilt when the export changes.
+"""
+
+import json
+import logging
+import os
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from tools.plot_index import (
+    VECTORS_FILE, PlotIndex, load_documents, normalize_rows, source_fingerprint, top_k, write_atomically,
+)
+
+logger = logging.getLogger(__name__)
+
+INT8_FILE = "vectors.int8.npy"
+INT8_SCALES_FILE = "scales.npy"
+FLOAT16_FILE = "vectors.f16.npy"
+# {dtype: fingerprint of the export the compact arrays were built from}
+QUANTIZED_META_FILE = "quantized.json"
+
+# Rows dequantized per block while scoring, to bound temporary memory
+_BLOCK_ROWS = 8192
+
+
+def quantize_int8(vectors) -> Tuple[np.ndarray, np.ndarray]:
+    """Scalar-quantize rows to int8 with a per-row scale; returns (codes, scales)."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def _read_meta(path: str) -> dict:
+    try:
+        with open(os.path.join(path, QUANTIZED_META_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+class QuantizedPlotIndex:
+    """Plot index that searches int8 or float16 vectors and re-ranks exactly."""
+
+    def __init__(self, exact: np.ndarray, documents: List[dict], dtype: str = "int8", rerank_factor: int = 4):
+        if dtype not in ("int8", "float16"):
+            raise ValueError(f"unsupported dtype {dtype!r}")
+        if len(exact) != len(documents):
+            raise ValueError(f"{len(exact)} vectors but {len(documents)} documents")
+        self.exact = exact
+        self.documents = documents
+        self.dtype = dtype
+        self.rerank_factor = rerank_factor
+        self.scales = None
+        if dtype == "int8":
+            self.codes, self.scales = quantize_int8(exact)
+        else:
+            self.codes = np.asarray(exact, dtype=np.float16)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    @property
+    def nbytes(self) -> int:
+        """Resident bytes of the compact representation."""
+        return self.codes.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def _approximate_scores(self, queries: np.ndarray, start: int, stop: int) -> np.ndarray:
+        block = self.codes[start:stop].astype(np.float32)
+        scores = queries @ block.T
+        if self.scales is not None:
+            scores *= self.scales[start:stop]
+        return scores
+
+    def search(self, queries, k: int = 4) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (scores, ids) of the top `k` per query, with exact scores."""
+        queries = normalize_rows(queries)
+        candidates = min(len(self), max(k, k * self.rerank_factor))
+
+        best_scores, best_ids = None, None
+        for start in range(0, len(self), _BLOCK_ROWS):
+            stop = min(len(self), start + _BLOCK_ROWS)
+            scores, ids = top_k(self._approximate_scores(queries, start, stop), candidates)
+            ids += start
+            if best_scores is None:
+                best_scores, best_ids = scores, ids
+            else:
+                merged_ids = np.concatenate([best_ids, ids], axis=1)
+                best_scores, cols = top_k(np.concatenate([best_scores, scores], axis=1), candidates)
+                best_ids = np.take_along_axis(merged_ids, cols, axis=1)
+
+        out_scores = np.empty((len(queries), min(k, candidates)), dtype=np.float32)
+        out_ids = np.empty_like(out_scores, dtype=np.int64)
+        for row, (query, ids) in enumerate(zip(queries, best_ids)):
+            # Fancy indexing a memory map reads only these rows
+            order = np.sort(ids)
+            exact_scores = np.asarray(self.exact[order]) @ query
+            scores, cols = top_k(exact_scores[None, :], k)
+            out_scores[row] = scores[0]
+            out_ids[row] = order[cols[0]]
+        return out_scores, out_ids
+
+    def save(self, path: str, fingerprint: Optional[str] = None) -> None:
+        """Write the compact arrays next to the export, tagged with `fingerprint`."""
+        if self.dtype == "int8":
+            write_atomically(os.path.join(path, INT8_FILE), lambda f: np.save(f, self.codes))
+            write_atomically(os.path.join(path, INT8_SCALES_FILE), lambda f: np.save(f, self.scales))
+        else:
+            write_atomically(os.path.join(path, FLOAT16_FILE), lambda f: np.save(f, self.codes))
+        # Written last: arrays without a matching entry are rebuilt
+        meta = _read_meta(path)
+        meta[self.dtype] = fingerprint or source_fingerprint(path)
+        write_atomically(os.path.join(path, QUANTIZED_META_FILE), lambda f: f.write(json.dumps(meta).encode("utf-8")))
+
+    @classmethod
+    def _load(cls, path: str, fingerprint: str, exact: np.ndarray, documents: List[dict], dtype: str, rerank_factor: int):
+        """Return the saved compact index, or None if it is missing or was built from another export."""
+        compact_file = INT8_FILE if dtype == "int8" else FLOAT16_FILE
+        if _read_meta(path).get(dtype) != fingerprint:
+            return None
+        try:
+            codes = np.load(os.path.join(path, compact_file))
+            scales = np.load(os.path.join(path, INT8_SCALES_FILE)) if dtype == "int8" else None
+        except (OSError, ValueError):
+            return None
+        if codes.shape != exact.shape or (scales is not None and scales.shape != (len(exact),)):
+            return None
+
+        index = cls.__new__(cls)
+        index.exact = exact
+        index.documents = documents
+        index.dtype = dtype
+        index.rerank_factor = rerank_factor
+        index.codes = codes
+        index.scales = scales
+        return index
+
+    @classmethod
+    def load_or_build(cls, path: str, dtype: str = "int8", rerank_factor: int = 4) -> "QuantizedPlotIndex":
+        """Load the compact arrays saved next to an export, (re)building them if missing or stale."""
+        fingerprint = source_fingerprint(path)
+        exact = np.load(os.path.join(path, VECTORS_FILE), mmap_mode="r")
+        documents = load_documents(path)
+        if len(exact) != len(documents):
+            raise ValueError(f"{len(exact)} vectors but {len(documents)} documents")
+        index = cls._load(path, fingerprint, exact, documents, dtype, rerank_factor)
+        if index is None:
+            logger.info("Building %s plot index over %d vectors", dtype, len(exact))
+            index = cls(exact, documents, dtype, rerank_factor)
+            index.save(path, fingerprint)
+        return index
+
+    @classmethod
+    def from_plot_index(cls, index: PlotIndex, dtype: str = "int8", rerank_factor: int = 4) -> "QuantizedPlotIndex":
+        return cls(index.vectors, index.documents, dtype, rerank_factor)
@@ -0,0 +1,296 @@
+"""Question-aware schema pruning for the Cypher generation prompt.
+
+`GraphCypherQAChain` pastes the whole graph schema into every Cypher
+generation call, although a question usually touches one or two labels
+and the relationships between them. `SchemaSelector` indexes every node
+label, relationship type and property of the structured schema, both as
+embeddings and as keywords (names split on case and underscores), and for
+each question keeps:
+
+- the labels, relationship types and properties that score above
+  `threshold` (cosine similarity, plus `keyword_boost` when the question
+  mentions the name), and always the best-scoring label,
+- the labels at both ends of every selected relationship type,
+- the shortest relationship paths joining the selected labels, so the
+  pruned schema is connected and the query can still traverse it,
+- each kept label's identifying properties (`KEY_PROPERTIES`).
+
+`SchemaSelector.wrap(chain)` applies this to the schema the chain passes to
+its Cypher prompt; each call logs the prompt tokens saved, and `stats()`
+keeps the totals. `benchmarks/bench_schema_pruning.py` measures the
+reduction and generated-query accuracy on a fixed question set.
+"""
+
+import logging
+import re
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from langchain_core.runnables import RunnableLambda
+
+from tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+# Properties questions name things by; kept on every selected label that has them
+KEY_PROPERTIES = ("name", "title")
+
+_CAMEL = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "the", "and", "for", "with", "who", "what", "which", "how", "many", "much",
+    "did", "does", "has", "have", "was", "were", "are", "that", "this", "from",
+    "movie", "movies", "film", "films",
+}
+
+
+def _name_words(name: str) -> List[str]:
+    """Split a schema name into lowercase words: "imdbRating" -> ["imdb", "rating"]."""
+    return _WORD.findall(_CAMEL.sub(" ", name).replace("_", " ").lower())
+
+
+def _keywords(text: str) -> Set[str]:
+    return {w for w in _WORD.findall(text.lower()) if len(w) >= 3 and w not in _STOPWORDS}
+
+
+def _matches(word: str, keyword: str) -> bool:
+    # "directed" matches "director", "rating" matches "ratings", "act" matches "actor"
+    shortest = min(len(word), len(keyword))
+    return word[:min(shortest, 5)] == keyword[:min(shortest, 5)] and shortest >= 3
+
+
+def _normalize(vectors) -> np.ndarray:
+    v = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(v, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return v / norms
+
+
+def render(structured_schema: dict) -> str:
+    """Render a structured schema as the schema text Neo4jGraph produces."""
+
+    def props(entries):
+        return ", ".join(f"{p['property']}: {p['type']}" for p in entries)
+
+    lines = ["Node properties:"]
+    lines += [f"{label} {{{props(entries)}}}" for label, entries in structured_schema.get("node_props", {}).items()]
+    lines.append("Relationship properties:")
+    lines += [f"{rel} {{{props(entries)}}}" for rel, entries in structured_schema.get("rel_props", {}).items()]
+    lines.append("The relationships:")
+    lines += [f"(:{r['start']})-[:{r['type']}]->(:{r['end']})" for r in structured_schema.get("relationships", [])]
+    return "\n".join(lines)
+
+
+class SchemaSelector:
+    """Select the part of a graph schema relevant to a question."""
+
+    def __init__(
+        self,
+        embeddings,
+        structured_schema: Optional[dict] = None,
+        threshold: float = 0.4,
+        property_threshold: float = 0.45,
+        keyword_boost: float = 0.3,
+    ):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.property_threshold = property_threshold
+        self.keyword_boost = keyword_boost
+
+        self.calls = 0
+        self.full_tokens = 0
+        self.pruned_tokens = 0
+        self._lock = threading.Lock()
+        self._schema: dict = {}
+        self._full_tokens = 0
+        # (kind, label or type, property or None) per indexed element, with its keywords
+        self._elements: List[Tuple[str, str, Optional[str]]] = []
+        self._element_words: List[List[str]] = []
+        self._matrix: Optional[np.ndarray] = None
+        if structured_schema is not None:
+            self.update(structured_schema)
+
+    def update(self, structured_schema: dict) -> None:
+        """Use a new structured schema; it is re-indexed on the next selection."""
+        with self._lock:
+            self._schema = structured_schema or {}
+            self._full_tokens = count_tokens(render(self._schema))
+            self._elements = []
+            self._element_words = []
+            self._matrix = None
+
+    def _ensure_index(self) -> None:
+        with self._lock:
+            if self._matrix is not None or not self._schema:
+                return
+            elements, texts, words = [], [], []
+            for label, entries in self._schema.get("node_props", {}).items():
+                elements.append(("label", label, None))
+                words.append(_name_words(label))
+                texts.append(" ".join(words[-1]) + ": " + ", ".join(" ".join(_name_words(p["property"])) for p in entries))
+                for p in entries:
+                    elements.append(("property", label, p["property"]))
+                    words.append(_name_words(p["property"]))
+                    texts.append(" ".join(_name_words(label) + words[-1]))
+            # Labels without properties still appear in relationships
+            for r in self._schema.get("relationships", []):
+                for label in (r["start"], r["end"]):
+                    if ("label", label, None) not in elements:
+                        elements.append(("label", label, None))
+                        words.append(_name_words(label))
+                        texts.append(" ".join(words[-1]))
+            for rel_type in dict.fromkeys(r["type"] for r in self._schema.get("relationships", [])):
+                ends = [r for r in self._schema["relationships"] if r["type"] == rel_type]
+                elements.append(("relationship", rel_type, None))
+                words.append(_name_words(rel_type))
+                texts.append(" ".join(
+                    f"{' '.join(_name_words(r['start']))} {' '.join(words[-1])} {' '.join(_name_words(r['end']))}" for r in ends[:3]
+                ))
+            for rel_type, entries in self._schema.get("rel_props", {}).items():
+                for p in entries:
+                    elements.append(("property", rel_type, p["property"]))
+                    words.append(_name_words(p["property"]))
+                    texts.append(" ".join(_name_words(rel_type) + words[-1]))
+            self._elements = elements
+            self._element_words = words
+            self._matrix = _normalize(self.embeddings.embed_documents(texts))
+
+    def scores(self, question: str, vector=None) -> Dict[Tuple[str, str, Optional[str]], float]:
+        """Return each schema element's relevance to `question`."""
+        self._ensure_index()
+        if self._matrix is None:
+            return {}
+        if vector is None:
+            vector = self.embeddings.embed_query(question)
+        similarities = self._matrix @ _normalize(vector)[0]
+        keywords = _keywords(question)
+        result = {}
+        for element, words, similarity in zip(self._elements, self._element_words, similarities):
+            hit = any(_matches(w, k) for w in words if w not in _STOPWORDS for k in keywords)
+            result[element] = float(similarity) + (self.keyword_boost if hit else 0.0)
+        return result
+
+    def _connect(self, labels: List[str]) -> List[dict]:
+        """Return relationships joining `labels` along shortest paths from the first one."""
+        relationships = self._schema.get("relationships", [])
+        neighbours: Dict[str, List[Tuple[str, dict]]] = {}
+        for r in relationships:
+            neighbours.setdefault(r["start"], []).append((r["end"], r))
+            neighbours.setdefault(r["end"], []).append((r["start"], r))
+
+        connected = {labels[0]}
+        path_rels: List[dict] = []
+        for target in labels[1:]:
+            if target in connected:
+                continue
+            # Breadth-first from the component built so far, ignoring direction
+            previous: Dict[str, Tuple[str, dict]] = {}
+            queue = deque(connected)
+            seen = set(connected)
+            while queue and target not in seen:
+                node = queue.popleft()
+                for other, r in neighbours.get(node, []):
+                    if other not in seen:
+                        seen.add(other)
+                        previous[other] = (node, r)
+                        queue.append(other)
+            if target not in seen:
+                connected.add(target)
+                continue
+            node = target
+            while node not in connected:
+                connected.add(node)
+                node, r = previous[node]
+                path_rels.append(r)
+        return path_rels
+
+    def select(self, question: str, vector=None) -> dict:
+        """Return the structured schema pruned to what `question` needs."""
+        scores = self.scores(question, vector)
+        if not scores:
+            return self._schema
+
+        labels = [e[1] for e, s in sorted(scores.items(), key=lambda item: item[1], reverse=True) if e[0] == "label"]
+        chosen = [label for label in labels if scores[("label", label, None)] >= self.threshold] or labels[:1]
+        rel_types = {e[1] for e, s in scores.items() if e[0] == "relationship" and s >= self.threshold}
+        # A property that matches on its own brings its label along
+        for (kind, owner, prop), s in scores.items():
+            if kind == "property" and prop and s >= self.property_threshold and owner in self._schema.get("node_props", {}):
+                if owner not in chosen:
+                    chosen.append(owner)
+
+        relationships = self._schema.get("relationships", [])
+        for r in relationships:
+            if r["type"] in rel_types:
+                chosen += [label for label in (r["start"], r["end"]) if label not in chosen]
+        path_rels = self._connect(chosen)
+        kept_labels = set(chosen) | {label for r in path_rels for label in (r["start"], r["end"])}
+        kept_rels = [
+            r for r in relationships
+            if r in path_rels or (r["type"] in rel_types and r["start"] in kept_labels and r["end"] in kept_labels)
+        ]
+        kept_types = {r["type"] for r in kept_rels}
+
+        node_props = {}
+        for label, entries in self._schema.get("node_props", {}).items():
+            if label not in kept_labels:
+                continue
+            wanted = [
+                p for p in entries
+                if p["property"] in KEY_PROPERTIES or scores.get(("property", label, p["property"]), 0.0) >= self.property_threshold
+            ]
+            node_props[label] = wanted or entries
+        rel_props = {rel: entries for rel, entries in self._schema.get("rel_props", {}).items() if rel in kept_types}
+        return {"node_props": node_props, "rel_props": rel_props, "relationships": kept_rels}
+
+    def prune(self, question: str, vector=None) -> str:
+        """Return the pruned schema text for `question`, recording the tokens saved."""
+        schema = render(self.select(question, vector))
+        tokens = count_tokens(schema)
+        with self._lock:
+            self.calls += 1
+            self.full_tokens += self._full_tokens
+            self.pruned_tokens += tokens
+        logger.info(
+            "Schema pruned for %r: %d -> %d tokens (%.0f%% smaller)",
+            question, self._full_tokens, tokens, 100 * (1 - tokens / self._full_tokens) if self._full_tokens else 0.0,
+        )
+        return schema
+
+    def wrap(self, chain):
+        """Replace the schema `chain` passes to its Cypher prompt with the pruned one.
+
+        Wrap after `cypher_cache.wrap` so generated Cypher is cached per
+        pruned schema. Chains without a runnable `cypher_generation_chain`
+        are returned unchanged.
+        """
+        generation = getattr(chain, "cypher_generation_chain", None)
+        if generation is None or not hasattr(generation, "invoke"):
+            logger.info("Chain has no runnable cypher_generation_chain; schema pruning disabled")
+            return chain
+
+        # Like `CypherCache.wrap`: the chain calls `invoke(args, callbacks=...)`
+        def generate(inputs: dict, config=None, **kwargs) -> str:
+            try:
+                inputs = {**inputs, "schema": self.prune(inputs.get("question", ""))}
+            except Exception as e:
+                logger.warning("Schema pruning failed, using the full schema: %s", e)
+            return generation.invoke(inputs, config, **kwargs)
+
+        try:
+            chain.cypher_generation_chain = RunnableLambda(generate)
+        except Exception as e:
+            logger.info("Could not wrap cypher_generation_chain; schema pruning disabled: %s", e)
+        return chain
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "full_tokens_mean": self.full_tokens / self.calls if self.calls else 0.0,
+                "pruned_tokens_mean": self.pruned_tokens / self.calls if self.calls else 0.0,
+                "reduction": 1 - self.pruned_tokens / self.full_tokens if self.full_tokens else 0.0,
+            }
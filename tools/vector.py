@@ -1,51 +1,199 @@
+import asyncio
+import logging
+import os
+
 import streamlit as st
-from langchain_community.vectorstores.neo4j_vector import Neo4jVector
-from llm import llm, embeddings
-from langchain.chains import RetrievalQA
-from tools.vector import kg_qa
-
-neo4jvector = Neo4jVector.from_existing_index(
-    embeddings,                              # (1)
-    url=st.secrets[3.238.38.175],             # (2)
-    username=st.secrets["neo4j"],   # (3)
-    password=st.secrets["drills-ammonia-solvent"],   # (4)
-    index_name="moviePlots",                 # (5)
-    node_label="Movie",                      # (6)
-    text_node_property="plot",               # (7)
-    embedding_node_property="plotEmbedding", # (8)
-    retrieval_query=
-RETURN
-    node.plot AS text,
-    score,
-    {
+
+from llm import get_llm, get_embeddings
+from graph import get_graph, neo4j_connections, NEO4J_CONFIGURED, NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD
+from caching.answers import acached, cached
+from caching.keys import prompt_version
+from resources import resource
+
+logger = logging.getLogger(__name__)
+
+# Cast entries returned per movie; the refresh job stores up to its own --max-cast
+RETRIEVAL_CAST_LIMIT = int(st.secrets.get("RETRIEVAL_CAST_LIMIT", 10))
+
+# Expands DIRECTED/ACTED_IN on every hit; large casts dominate query time and payload
+TRAVERSED_METADATA = f"""{{
         title: node.title,
         directors: [ (person)-[:DIRECTED]->(node) | person.name ],
-        actors: [ (person)-[r:ACTED_IN]->(node) | [person.name, r.role] ],
+        actors: [ (person)-[r:ACTED_IN]->(node) | [person.name, r.role] ][..{RETRIEVAL_CAST_LIMIT}],
+        tmdbId: node.tmdbId,
+        source: 'https://www.themoviedb.org/movie/'+ node.tmdbId,
+        score: score
+    }}"""
+
+# Reads the per-movie projection written by scripts/refresh_movie_metadata.py
+PROJECTED_METADATA = f"""{{
+        title: node.title,
+        directors: node.directorNames,
+        actors: [ i IN range(0, size(node.castNames) - 1)[..{RETRIEVAL_CAST_LIMIT}] | [node.castNames[i], node.castRoles[i]] ],
         tmdbId: node.tmdbId,
-        source: 'https://www.themoviedb.org/movie/'+ node.tmdbId
-    } AS metadata
-
-)
-
-retriever = neo4jvector.as_retriever()
-
-kg_qa = RetrievalQA.from_chain_type(
-    llm,                  # (1)
-    chain_type="stuff",   # (2)
-    retriever=retriever,  # (3)
-)
-
-tools = [
-    Tool.from_function(
-        name="General Chat",
-        description="For general chat not covered by other tools",
-        func=llm.invoke,
-        return_direct=True
-        ),
-    Tool.from_function(
-        name="Vector Search Index",  # (1)
-        description="Provides information about movie plots using Vector Search", # (2)
-        func = kg_qa, # (3)
-        return_direct=True
+        source: 'https://www.themoviedb.org/movie/'+ node.tmdbId,
+        score: score
+    }}"""
+
+# Movies the refresh job has not reached yet fall back to the traversal
+RETRIEVAL_METADATA = f"""CASE WHEN node.metadataRefreshedAt IS NULL
+        THEN {TRAVERSED_METADATA}
+        ELSE {PROJECTED_METADATA}
+    END"""
+
+# `score` is repeated inside metadata: the retriever drops the column, ContextPacker ranks by it
+RETRIEVAL_QUERY = f"""
+RETURN
+    node.plot AS text,
+    score,
+    {RETRIEVAL_METADATA} AS metadata
+"""
+
+
+@resource("neo4jvector")
+def get_neo4jvector():
+    """Return the moviePlots vector store, or None if Neo4j is disabled or unreachable."""
+    # get_graph() is None when Neo4j credentials are missing; skip the vector index in that case too.
+    if not NEO4J_CONFIGURED or get_graph() is None:
+        return None
+    try:
+        from langchain_community.vectorstores.neo4j_vector import Neo4jVector
+
+        neo4jvector = Neo4jVector.from_existing_index(
+            get_embeddings(),                        # (1)
+            url=NEO4J_URI,                           # (2)
+            username=NEO4J_USERNAME,                 # (3)
+            password=NEO4J_PASSWORD,                 # (4)
+            index_name="moviePlots",                 # (5)
+            node_label="Movie",                      # (6)
+            text_node_property="plot",               # (7)
+            embedding_node_property="plotEmbedding", # (8)
+            retrieval_query=RETRIEVAL_QUERY,
+        )
+        # Share the process-wide pool instead of the driver the store opened for itself
+        return neo4j_connections.adopt(neo4jvector)
+    except Exception as e:
+        logger.warning("Could not initialize the moviePlots vector index: %s", e)
+        return None
+
+
+# Directory written by scripts/export_plot_vectors.py; when present, plots are searched in-process
+PLOT_INDEX_PATH = st.secrets.get("PLOT_INDEX_PATH", "")
+# "exact" scores every vector; "ivf" searches an approximate index built from the export;
+# "int8"/"float16" search a quantized copy and re-rank the best candidates exactly
+PLOT_INDEX_TYPE = st.secrets.get("PLOT_INDEX_TYPE", "exact")
+# "vector" uses the moviePlots index alone; "hybrid" fuses it with a title/plot full-text index
+PLOT_SEARCH = st.secrets.get("PLOT_SEARCH", "vector")
+
+
+def _load_plot_index():
+    if PLOT_INDEX_TYPE in ("int8", "float16"):
+        from tools.quantized_index import QuantizedPlotIndex
+
+        return QuantizedPlotIndex.load_or_build(
+            PLOT_INDEX_PATH,
+            dtype=PLOT_INDEX_TYPE,
+            rerank_factor=int(st.secrets.get("PLOT_INDEX_RERANK_FACTOR", 4)),
+        )
+
+    if PLOT_INDEX_TYPE == "ivf":
+        from tools.ann_index import IVFIndex
+
+        return IVFIndex.load_or_build(
+            PLOT_INDEX_PATH,
+            nlist=int(st.secrets.get("PLOT_INDEX_NLIST", 1024)),
+            nprobe=int(st.secrets.get("PLOT_INDEX_NPROBE", 16)),
+        )
+
+    from tools.plot_index import PlotIndex
+
+    return PlotIndex.load(PLOT_INDEX_PATH)
+
+
+@resource("plot_retriever")
+def get_plot_retriever():
+    """Return the retriever for `kg_qa`: the local plot index if exported, else a Neo4j retriever."""
+    if PLOT_INDEX_PATH and os.path.isdir(PLOT_INDEX_PATH):
+        try:
+            from tools.plot_index import PlotIndexRetriever
+
+            index = _load_plot_index()
+            logger.info("Using %s plot index with %d movies from %s", PLOT_INDEX_TYPE, len(index), PLOT_INDEX_PATH)
+            return PlotIndexRetriever(index=index, embeddings=get_embeddings())
+        except Exception as e:
+            logger.warning("Could not load local plot index %s, using Neo4jVector: %s", PLOT_INDEX_PATH, e)
+
+    if PLOT_SEARCH == "hybrid" and NEO4J_CONFIGURED and get_graph() is not None:
+        try:
+            from tools.hybrid import HybridRetriever, ensure_fulltext_index
+
+            # Populating the index on a cold deploy can take a while; until then use the vector index
+            ensure_fulltext_index(get_graph(), float(st.secrets.get("HYBRID_INDEX_TIMEOUT", 300)))
+            return HybridRetriever(
+                graph=get_graph(),
+                embeddings=get_embeddings(),
+                candidates=int(st.secrets.get("HYBRID_CANDIDATES", 20)),
+                rrf_k=int(st.secrets.get("HYBRID_RRF_K", 60)),
+            )
+        except Exception as e:
+            logger.warning("Could not set up hybrid plot search, using Neo4jVector: %s", e)
+
+    neo4jvector = get_neo4jvector()
+    if neo4jvector is None:
+        return None
+    return neo4jvector.as_retriever()
+
+
+# Token budget for the plots and metadata pasted into the kg_qa prompt; 0 disables packing
+KG_QA_CONTEXT_TOKENS = int(st.secrets.get("KG_QA_CONTEXT_TOKENS", 1500))
+
+
+@resource("context_packer")
+def get_context_packer():
+    from tools.context import ContextPacker
+
+    return ContextPacker(
+        max_tokens=KG_QA_CONTEXT_TOKENS,
+        actor_limit=int(st.secrets.get("KG_QA_CONTEXT_ACTORS", 5)),
     )
-]
\ No newline at end of file
+
+
+@resource("kg_qa")
+def get_kg_qa():
+    """Return the RetrievalQA chain over movie plots, or None without a retriever."""
+    retriever = get_plot_retriever()
+    if retriever is None:
+        return None
+    if KG_QA_CONTEXT_TOKENS > 0:
+        from tools.context import PackingRetriever
+
+        retriever = PackingRetriever(retriever=retriever, packer=get_context_packer())
+
+    from langchain.chains import RetrievalQA
+
+    return RetrievalQA.from_chain_type(
+        get_llm(),            # (1)
+        chain_type="stuff",   # (2)
+        retriever=retriever,  # (3)
+    )
+
+
+def _run_kg_qa(question: str) -> str:
+    kg_qa = get_kg_qa()
+    if kg_qa is None:
+        raise RuntimeError("The moviePlots vector index is not available")
+    response = kg_qa.invoke({"query": question})
+    return response["result"]
+
+
+async def _arun_kg_qa(question: str) -> str:
+    # The first call may build the chain; keep that off the event loop
+    kg_qa = await asyncio.to_thread(get_kg_qa)
+    if kg_qa is None:
+        raise RuntimeError("The moviePlots vector index is not available")
+    response = await kg_qa.ainvoke({"query": question})
+    return response["result"]
+
+
+run_kg_qa = cached("kg_qa", _run_kg_qa, prompt_version(f"{RETRIEVAL_QUERY}{PLOT_SEARCH}{KG_QA_CONTEXT_TOKENS}"))
+arun_kg_qa = acached("kg_qa", _arun_kg_qa, prompt_version(f"{RETRIEVAL_QUERY}{PLOT_SEARCH}{KG_QA_CONTEXT_TOKENS}"))
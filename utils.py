@@ -1,5 +1,14 @@
 import streamlit as st
 
+
+def secret_flag(name: str, default: bool) -> bool:
+    """Read a boolean from Streamlit secrets; strings like "false" or "0" count as False."""
+    value = st.secrets.get(name, default)
+    if isinstance(value, str):
+        return value.strip().lower() not in ("", "0", "false", "no", "off")
+    return bool(value)
+
+
 # tag::write_message[]
 def write_message(role, content, save = True):
     """